@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+"""Professional Background Remover Pro v2.1 — Command-line interface.
+
+Runs background removal without a display (tkinter is never imported)
+and prints a JSON summary on stdout; logs go to stderr.
+
+Usage:
+    python cli.py batch photos/ "shoots/**/*.jpg" -o out/ --preset web
+    python cli.py watch inbox/ -o out/ --format webp
+    python cli.py serve --port 8080 --workers 2
+    python cli.py queue jobs.db photos/ -o out/ --processes 4
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from core.backends import BACKEND_REMBG, backend_names
+from core.export_manager import EXPORT_PRESETS, ExportManager
+from core.image_processor import DEFAULT_INFERENCE_BATCH_SIZE, DEFAULT_MODEL, BatchResult, ImageProcessor
+from core.job_store import DEFAULT_MAX_ATTEMPTS, STORE_FAILED, JobStore, run_store_workers
+from core.manifest import BuildManifest, settings_key
+from core.mask_cache import DEFAULT_CACHE_DIR, MaskCache
+from core.model_registry import TIERS, ModelRegistry
+from core.service import (
+    DEFAULT_HOST, DEFAULT_MAX_BODY_BYTES, DEFAULT_PORT, DEFAULT_QUEUE_SIZE, DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_SERVICE_WORKERS, BackgroundRemovalService, WorkerPool,
+)
+from core.timing import TimingStats
+from core.watcher import DEFAULT_POLL_INTERVAL, DEFAULT_STABLE_POLLS, FolderWatcher
+from utils.helpers import IMAGE_EXTENSIONS
+from utils.logger import configure_console, setup_logger
+
+logger = setup_logger("bgremover.cli")
+
+# Output formats accepted by --format
+OUTPUT_FORMATS = ("png", "jpeg", "webp", "bmp")
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_INTERRUPTED = 130
+
+
+# ==================== INPUTS ====================
+
+def _image_files(directory: str, recursive: bool) -> List[str]:
+    """Return the image files of a directory, sorted by path."""
+    found: List[str] = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        found.extend(
+            os.path.join(root, name) for name in sorted(files)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not recursive:
+            break
+    return found
+
+
+def collect_inputs(patterns: List[str], recursive: bool = False) -> List[str]:
+    """Expand files, glob patterns and directories into input paths.
+
+    Directories contribute their image files (including subdirectories
+    with ``recursive``); glob patterns support ``**``. Plain paths are
+    kept as given so missing files are reported as failures. Duplicates
+    are dropped, keeping the first occurrence.
+
+    Args:
+        patterns: Files, glob patterns or directories.
+        recursive: Descend into subdirectories of directory inputs.
+
+    Returns:
+        Input file paths in argument order.
+    """
+    paths: List[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(_image_files(pattern, recursive))
+        elif glob.has_magic(pattern):
+            paths.extend(p for p in sorted(glob.glob(pattern, recursive=True)) if os.path.isfile(p))
+        else:
+            paths.append(pattern)
+    return list(dict.fromkeys(os.path.abspath(p) for p in paths))
+
+
+# ==================== OUTPUT ====================
+
+def output_format(args: argparse.Namespace) -> str:
+    """Return the output format selected by --preset or --format."""
+    return EXPORT_PRESETS[args.preset]["format"] if args.preset else args.format
+
+
+def output_path_for(output_dir: str, input_path: str, file_format: str) -> str:
+    """Return the ``<name>_nobg.<format>`` output path of an input."""
+    return os.path.join(output_dir, ExportManager.generate_output_filename(input_path, file_format=file_format))
+
+
+def make_writer(
+    output_dir: str,
+    exporter: ExportManager,
+    file_format: str = "png",
+    quality: int = 90,
+    preset: Optional[str] = None,
+) -> Callable[[Image.Image, str], str]:
+    """Build the output writer used in the pipeline's encode stage.
+
+    Args:
+        output_dir: Output directory.
+        exporter: Export manager doing the actual save.
+        file_format: Output format (ignored with a preset).
+        quality: JPEG/WEBP quality (ignored with a preset).
+        preset: Export preset name (see :data:`EXPORT_PRESETS`).
+
+    Returns:
+        ``writer(image, input_path) -> output_path``; raises ``OSError``
+        if the export fails.
+    """
+    if preset:
+        file_format = EXPORT_PRESETS[preset]["format"]
+
+    def write(image: Image.Image, input_path: str) -> str:
+        out_path = output_path_for(output_dir, input_path, file_format)
+        if preset:
+            ok = exporter.save_with_preset(image, out_path, preset)
+        else:
+            ok = exporter.save(image, out_path, file_format, quality)
+        if not ok:
+            raise OSError(f"Export failed: {out_path}")
+        return out_path
+
+    return write
+
+
+def write_summary(summary: Dict[str, Any], path: Optional[str] = None) -> None:
+    """Print the summary as JSON on stdout, or write it to ``path``."""
+    text = json.dumps(summary, indent=2, ensure_ascii=False)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+        sys.stdout.flush()
+
+
+# ==================== COMMANDS ====================
+
+def build_mask_cache(args: argparse.Namespace) -> Optional[MaskCache]:
+    """Create the mask cache from the command-line options (None if disabled)."""
+    if args.no_cache:
+        return None
+    return MaskCache(args.cache_dir, max_disk_bytes=args.cache_max_mb * 1024 * 1024)
+
+
+def build_registry(args: argparse.Namespace) -> ModelRegistry:
+    """Create the local model registry from the command-line options."""
+    return ModelRegistry(args.model_dir, local_only=args.local_models)
+
+
+def build_processor(args: argparse.Namespace) -> ImageProcessor:
+    """Create the processor (and mask cache) from the command-line options."""
+    return ImageProcessor(args.model, mask_cache=build_mask_cache(args), registry=build_registry(args))
+
+
+def uses_processes(args: argparse.Namespace) -> bool:
+    """Whether ``batch`` runs on isolated worker processes instead of the threaded pipeline."""
+    return any(
+        option is not None
+        for option in (args.processes, args.task_timeout, args.max_tasks_per_worker, args.memory_limit_mb)
+    )
+
+
+def _base_summary(args: argparse.Namespace, command: str) -> Dict[str, Any]:
+    return {
+        "command": command,
+        "model": args.model,
+        "output_dir": os.path.abspath(args.output),
+        "format": output_format(args),
+        "preset": args.preset,
+    }
+
+
+def run_batch(args: argparse.Namespace, inputs: List[str]) -> Tuple[Dict[str, Any], int]:
+    """Process the inputs once and return ``(summary, exit_code)``."""
+    summary = _base_summary(args, "batch")
+    total = len(inputs)
+    manifest = None
+    settings = ""
+    processor = build_processor(args)
+    if args.incremental or args.dry_run:
+        file_format = output_format(args)
+        manifest = BuildManifest.for_directory(args.output, args.content_hash)
+        settings = settings_key(processor.batch_settings(
+            args.model, args.max_side, args.tile_size, args.backend, args.triage,
+            format=file_format,
+            preset=args.preset,
+            quality=None if args.preset else args.quality,
+        ))
+        plan = manifest.plan(((p, output_path_for(args.output, p, file_format)) for p in inputs), settings)
+        summary["incremental"] = plan.to_dict()
+        if args.dry_run:
+            processor.close()
+            summary.update(dry_run=True, total=total, to_process=plan.todo)
+            return summary, EXIT_OK
+        inputs = plan.todo
+
+    os.makedirs(args.output, exist_ok=True)
+    files: List[Dict[str, Any]] = []
+    interrupted = False
+    memory_budget = args.memory_budget_mb * 1024 * 1024 if args.memory_budget_mb else None
+
+    def on_result(result: BatchResult) -> None:
+        files.append(result.to_dict())
+        if not result.ok:
+            logger.error("Failed: %s — %s", result.input_path, result.error)
+        elif manifest is not None:
+            manifest.record(result.input_path, result.output_path, settings, sum(result.timings.values()))
+
+    try:
+        if uses_processes(args):
+            # Worker processes load their own models, so there is nothing to warm up here
+            started = time.perf_counter()
+            handle = processor.batch_process(
+                inputs, args.output,
+                use_processes=True,
+                workers=args.processes,
+                task_timeout=args.task_timeout,
+                max_tasks_per_worker=args.max_tasks_per_worker,
+                memory_limit_mb=args.memory_limit_mb,
+                memory_budget=memory_budget,
+                max_inference_side=args.max_side,
+                tile_size=args.tile_size,
+                use_triage=args.triage,
+                backend=args.backend,
+                on_result=on_result,
+            )
+            try:
+                handle.result()
+            except KeyboardInterrupt:
+                interrupted = True
+                # In-flight files are drained and reported before the job ends
+                handle.cancel()
+                handle.wait()
+            elapsed = time.perf_counter() - started
+        else:
+            started = time.perf_counter()
+            processor.warm_up([args.model], backend=args.backend)
+            summary["warm_up"] = round(time.perf_counter() - started, 4)
+
+            started = time.perf_counter()
+            results = processor.iter_process(
+                inputs, args.output,
+                max_inference_side=args.max_side,
+                tile_size=args.tile_size,
+                decode_workers=args.decode_workers,
+                encode_workers=args.workers,
+                inference_batch_size=args.batch_size,
+                writer=make_writer(args.output, ExportManager(), args.format, args.quality, args.preset),
+                memory_budget=memory_budget,
+                use_triage=args.triage,
+                backend=args.backend,
+            )
+            try:
+                for result in results:
+                    on_result(result)
+            except KeyboardInterrupt:
+                interrupted = True
+                results.close()
+            elapsed = time.perf_counter() - started
+    finally:
+        processor.close()
+        if manifest is not None:
+            manifest.save()
+
+    succeeded = sum(1 for f in files if f["error"] is None)
+    summary.update(
+        backend=args.backend,
+        total=total,
+        succeeded=succeeded,
+        failed=len(files) - succeeded,
+        unfinished=len(inputs) - len(files),
+        interrupted=interrupted,
+        elapsed=round(elapsed, 4),
+        throughput=round(succeeded / elapsed, 3) if elapsed > 0 else 0.0,
+        stages={name: stats.to_dict() for name, stats in processor.last_batch_stats.items()},
+        timing=processor.last_batch_timing.to_dict() if processor.last_batch_timing else None,
+        cache=processor.mask_cache.stats() if processor.mask_cache else None,
+        admission=processor.last_admission_stats,
+        triage=processor.last_triage_counts,
+        files=files,
+    )
+    if interrupted:
+        return summary, EXIT_INTERRUPTED
+    return summary, EXIT_FAILURES if summary["failed"] else EXIT_OK
+
+
+def run_watch(args: argparse.Namespace) -> Tuple[Dict[str, Any], int]:
+    """Watch a directory until interrupted and return ``(summary, exit_code)``."""
+    processor = build_processor(args)
+    writer = make_writer(args.output, ExportManager(), args.format, args.quality, args.preset)
+    files: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    # The watcher streams every file through one long-running pipeline; the
+    # percentiles cover a bounded window of the most recent files
+    timing = TimingStats()
+
+    def on_result(result: BatchResult) -> None:
+        with lock:
+            files.append(result.to_dict())
+        if result.ok:
+            timing.add(result.timing)
+
+    watcher = FolderWatcher(
+        processor, args.input_dir, args.output,
+        poll_interval=args.poll_interval,
+        stable_polls=args.stable_polls,
+        process_existing=not args.skip_existing,
+        max_inference_side=args.max_side,
+        tile_size=args.tile_size,
+        inference_batch_size=args.batch_size,
+        on_result=on_result,
+        writer=writer,
+    )
+    started = time.perf_counter()
+    thread = watcher.start()
+    code = EXIT_FAILURES  # The watcher only ends on its own if it crashed
+    try:
+        while thread.is_alive():
+            thread.join(0.5)
+    except KeyboardInterrupt:
+        logger.info("Stopping watcher — finishing queued files...")
+        watcher.stop()
+        code = EXIT_INTERRUPTED
+    finally:
+        processor.close()
+
+    summary = _base_summary(args, "watch")
+    summary["input_dir"] = watcher.input_dir
+    summary["elapsed"] = round(time.perf_counter() - started, 4)
+    summary.update(watcher.stats())
+    summary["timing"] = timing.to_dict()
+    summary["files"] = files
+    return summary, code
+
+
+def run_serve(args: argparse.Namespace) -> Tuple[Dict[str, Any], int]:
+    """Serve HTTP requests until interrupted and return ``(summary, exit_code)``."""
+    mask_cache = build_mask_cache(args)
+    registry = build_registry(args)
+    pool = WorkerPool(
+        args.workers, args.queue_size,
+        processor_factory=lambda: ImageProcessor(args.model, mask_cache=mask_cache, registry=registry),
+    )
+    service = BackgroundRemovalService(
+        args.host, args.port, pool,
+        max_body_bytes=args.max_upload_mb * 1024 * 1024,
+        request_timeout=args.timeout,
+    )
+    thread = service.start()
+    code = EXIT_FAILURES  # The server only ends on its own if it crashed
+    try:
+        while thread.is_alive():
+            thread.join(0.5)
+    except KeyboardInterrupt:
+        code = EXIT_INTERRUPTED
+    finally:
+        service.shutdown()
+
+    summary: Dict[str, Any] = {"command": "serve", "model": args.model, "url": service.url}
+    summary.update(service.metrics())
+    return summary, code
+
+
+def run_queue(args: argparse.Namespace, inputs: List[str]) -> Tuple[Dict[str, Any], int]:
+    """Queue inputs in a job store, drain it and return ``(summary, exit_code)``."""
+    store = JobStore(args.store, max_attempts=args.max_attempts)
+    summary: Dict[str, Any] = {
+        "command": "queue", "model": args.model, "backend": args.backend, "store": os.path.abspath(args.store),
+    }
+    try:
+        summary["added"] = store.add(inputs, args.output) if inputs else 0
+        if args.retry_failed:
+            summary["requeued"] = store.retry_failed()
+    finally:
+        store.close()
+
+    code = EXIT_OK
+    if not args.no_work:
+        started = time.perf_counter()
+        try:
+            summary["worked"] = run_store_workers(
+                args.store, args.processes, args.model,
+                store_options={"max_attempts": args.max_attempts},
+                registry=build_registry(args),
+                max_inference_side=args.max_side,
+                tile_size=args.tile_size,
+                inference_batch_size=args.batch_size,
+                use_triage=args.triage,
+                backend=args.backend,
+            )
+        except KeyboardInterrupt:
+            logger.info("Interrupted — unfinished jobs stay queued for the next run")
+            code = EXIT_INTERRUPTED
+        summary["elapsed"] = round(time.perf_counter() - started, 4)
+
+    store = JobStore(args.store, max_attempts=args.max_attempts)
+    try:
+        summary.update(store.stats())
+    finally:
+        store.close()
+    if code == EXIT_OK and summary[STORE_FAILED]:
+        code = EXIT_FAILURES
+    return summary, code
+
+
+# ==================== ARGUMENTS ====================
+
+def _add_common_options(parser: argparse.ArgumentParser) -> None:
+    """Options shared by every command."""
+    parser.add_argument("--model", default=DEFAULT_MODEL,
+                        help=f"rembg model or speed/quality tier ({', '.join(TIERS)}) (default: {DEFAULT_MODEL}).")
+    parser.add_argument("--model-dir", help="Directory of the model files (default: $U2NET_HOME or ~/.u2net).")
+    parser.add_argument("--local-models", action="store_true",
+                        help="Load models only from files in --model-dir; never download.")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the mask cache.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Mask cache directory.")
+    parser.add_argument("--cache-max-mb", type=int, default=1024, help="Mask cache disk limit in MB (default: 1024).")
+    parser.add_argument("--summary", metavar="FILE", help="Write the JSON summary to FILE instead of stdout.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only log warnings and errors.")
+
+
+def _add_processing_options(parser: argparse.ArgumentParser) -> None:
+    """Options of the commands that write files."""
+    parser.add_argument("-o", "--output", required=True, help="Output directory.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="png", help="Output format (default: png).")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG/WEBP quality, 1-100 (default: 90).")
+    parser.add_argument("--preset", choices=sorted(EXPORT_PRESETS), help="Export preset (overrides --format/--quality).")
+    parser.add_argument("--max-side", type=int, help="Longest side of the images fed to the model.")
+    parser.add_argument("--tile-size", type=int, help="Tile edge for tiled inference of large images.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_INFERENCE_BATCH_SIZE,
+                        help="Images per model call (default: %(default)s).")
+    _add_common_options(parser)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the command-line parser."""
+    parser = argparse.ArgumentParser(
+        prog="bgremover",
+        description="Remove image backgrounds without the GUI.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Process files, glob patterns and directories once.")
+    batch.add_argument("inputs", nargs="+", help="Input files, glob patterns or directories.")
+    batch.add_argument("-r", "--recursive", action="store_true", help="Include subdirectories of directory inputs.")
+    batch.add_argument("--workers", type=int, default=2, help="Encode/write threads of the threaded pipeline (default: 2).")
+    batch.add_argument("--decode-workers", type=int, default=1, help="Read/decode threads (default: 1).")
+    batch.add_argument("--incremental", action="store_true",
+                       help="Skip inputs whose output is up to date for the same settings.")
+    batch.add_argument("--content-hash", action="store_true",
+                       help="With --incremental, also compare content hashes of touched inputs.")
+    batch.add_argument("--dry-run", action="store_true",
+                       help="Only report what --incremental would process and the time it saves.")
+    batch.add_argument("--triage", action="store_true",
+                       help="Keep existing transparency and colour-key flat backgrounds without the model.")
+    batch.add_argument("--backend", choices=backend_names(), default=BACKEND_REMBG,
+                       help="Mask backend: the rembg model, colour keying of solid/chroma-key backgrounds, "
+                            "or a deterministic fake for testing (default: %(default)s).")
+    batch.add_argument("--memory-budget-mb", type=int,
+                       help="Only start images while their estimated memory in flight fits in this many MB.")
+    batch.add_argument("--processes", type=int,
+                       help="Run on this many isolated worker processes, each with its own model "
+                            "(PNG output only; default: one per 4 cores when a worker limit is set).")
+    batch.add_argument("--task-timeout", type=float,
+                       help="Seconds a worker process may spend on one image before it is replaced.")
+    batch.add_argument("--max-tasks-per-worker", type=int,
+                       help="Images after which a worker process is replaced, bounding memory growth.")
+    batch.add_argument("--memory-limit-mb", type=int,
+                       help="Address-space limit per worker process in MB (POSIX only).")
+    _add_processing_options(batch)
+
+    watch = commands.add_parser("watch", help="Process images dropped into a directory until interrupted.")
+    watch.add_argument("input_dir", help="Directory to watch.")
+    watch.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                       help="Seconds between scans (default: %(default)s).")
+    watch.add_argument("--stable-polls", type=int, default=DEFAULT_STABLE_POLLS,
+                       help="Unchanged scans before a file is processed (default: %(default)s).")
+    watch.add_argument("--skip-existing", action="store_true", help="Ignore files present at start.")
+    _add_processing_options(watch)
+
+    serve = commands.add_parser("serve", help="Serve background removal over HTTP until interrupted.")
+    serve.add_argument("--host", default=DEFAULT_HOST, help="Listen address (default: %(default)s).")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help="Listen port (default: %(default)s).")
+    serve.add_argument("--workers", type=int, default=DEFAULT_SERVICE_WORKERS,
+                       help="Warm model workers (default: %(default)s).")
+    serve.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                       help="Requests allowed to wait for a worker before answering 429 (default: %(default)s).")
+    serve.add_argument("--max-upload-mb", type=int, default=DEFAULT_MAX_BODY_BYTES // (1024 * 1024),
+                       help="Largest accepted upload in MB (default: %(default)s).")
+    serve.add_argument("--timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT,
+                       help="Seconds before a request is answered 504 (default: %(default)s).")
+    _add_common_options(serve)
+
+    queue = commands.add_parser("queue", help="Queue inputs in a job store and process it with worker processes.")
+    queue.add_argument("store", help="Job store database (created if missing).")
+    queue.add_argument("inputs", nargs="*", help="Input files, glob patterns or directories to add.")
+    queue.add_argument("-o", "--output", help="Output directory of the added inputs.")
+    queue.add_argument("-r", "--recursive", action="store_true", help="Include subdirectories of directory inputs.")
+    queue.add_argument("--processes", type=int, default=1, help="Worker processes (default: 1).")
+    queue.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                       help="Attempts before a job is marked failed (default: %(default)s).")
+    queue.add_argument("--retry-failed", action="store_true", help="Re-queue failed jobs before working.")
+    queue.add_argument("--no-work", action="store_true", help="Only add jobs and report the store status.")
+    queue.add_argument("--max-side", type=int, help="Longest side of the images fed to the model.")
+    queue.add_argument("--tile-size", type=int, help="Tile edge for tiled inference of large images.")
+    queue.add_argument("--batch-size", type=int, default=DEFAULT_INFERENCE_BATCH_SIZE,
+                       help="Images per model call (default: %(default)s).")
+    queue.add_argument("--triage", action="store_true",
+                       help="Keep existing transparency and colour-key flat backgrounds without the model.")
+    queue.add_argument("--backend", choices=backend_names(), default=BACKEND_REMBG,
+                       help="Mask backend (default: %(default)s).")
+    queue.add_argument("--model", default=DEFAULT_MODEL,
+                       help=f"rembg model or speed/quality tier ({', '.join(TIERS)}) (default: {DEFAULT_MODEL}).")
+    queue.add_argument("--model-dir", help="Directory of the model files (default: $U2NET_HOME or ~/.u2net).")
+    queue.add_argument("--local-models", action="store_true",
+                       help="Load models only from files in --model-dir; never download.")
+    queue.add_argument("--summary", metavar="FILE", help="Write the JSON summary to FILE instead of stdout.")
+    queue.add_argument("-q", "--quiet", action="store_true", help="Only log warnings and errors.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command-line interface.
+
+    Returns:
+        Exit code: 0 on success, 1 if any file failed, 130 if interrupted.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command in ("batch", "watch") and not 1 <= args.quality <= 100:
+        parser.error("--quality must be between 1 and 100")
+    if args.command != "serve":
+        if args.batch_size < 1:
+            parser.error("--batch-size must be at least 1")
+    if args.command == "batch":
+        for name in ("memory_budget_mb", "processes", "task_timeout", "max_tasks_per_worker", "memory_limit_mb"):
+            value = getattr(args, name)
+            if value is not None and value <= 0:
+                parser.error(f"--{name.replace('_', '-')} must be positive")
+        if uses_processes(args) and (args.preset or args.format != "png"):
+            parser.error("worker processes write plain PNG only; drop --format/--preset")
+
+    # stdout carries the summary only
+    configure_console(sys.stderr, logging.WARNING if args.quiet else logging.INFO)
+
+    if args.command == "batch":
+        inputs = collect_inputs(args.inputs, args.recursive)
+        if not inputs:
+            parser.error("no input images found")
+        summary, code = run_batch(args, inputs)
+    elif args.command == "serve":
+        summary, code = run_serve(args)
+    elif args.command == "queue":
+        inputs = collect_inputs(args.inputs, args.recursive) if args.inputs else []
+        if args.inputs and not inputs:
+            parser.error("no input images found")
+        if inputs and not args.output:
+            parser.error("--output is required when adding inputs")
+        summary, code = run_queue(args, inputs)
+    else:
+        if not os.path.isdir(args.input_dir):
+            parser.error(f"not a directory: {args.input_dir}")
+        summary, code = run_watch(args)
+
+    write_summary(summary, args.summary)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,10 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "default_zoom": 1.0,
     "last_export_preset": "web",
     "window_geometry": None,
+    "mask_cache_enabled": True,
+    "mask_cache_max_mb": 1024,
+    "inference_batch_size": 1,
+    "warm_up_on_start": False,
 }
 
 
@@ -155,6 +159,22 @@ class ConfigManager:
         if not isinstance(undo_limit, int) or undo_limit < 1:
             self._config["undo_limit"] = 20
 
+        # Mask cache
+        if not isinstance(self._config.get("mask_cache_enabled"), bool):
+            self._config["mask_cache_enabled"] = True
+        cache_mb = self._config.get("mask_cache_max_mb", 1024)
+        if not isinstance(cache_mb, int) or cache_mb < 1:
+            self._config["mask_cache_max_mb"] = 1024
+
+        # Images per model call in batch runs
+        batch_size = self._config.get("inference_batch_size", 1)
+        if not isinstance(batch_size, int) or not 1 <= batch_size <= 64:
+            self._config["inference_batch_size"] = 1
+
+        # Background model warm-up (opt-in)
+        if not isinstance(self._config.get("warm_up_on_start"), bool):
+            self._config["warm_up_on_start"] = False
+
     def to_dict(self) -> Dict[str, Any]:
         """Return all settings as a dictionary."""
         return self._config.copy()
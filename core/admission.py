@@ -0,0 +1,159 @@
+"""Memory admission control — header-only size estimates and a byte budget."""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Bytes per pixel of Pillow's in-memory storage (multi-band modes use 32-bit pixels)
+_MODE_BYTES = {"1": 1, "L": 1, "P": 1, "I;16": 2, "I;16B": 2, "I;16L": 2, "I": 4, "F": 4}
+_DEFAULT_MODE_BYTES = 4
+
+# Fixed per-image overhead on top of the pixel buffers (model tensors, temporaries)
+IMAGE_OVERHEAD_BYTES = 16 * 1024 * 1024
+
+# How often a blocked admission re-checks its cancel event (seconds)
+_CANCEL_POLL = 0.1
+
+
+def estimate_memory(
+    path: str,
+    max_inference_side: Optional[int] = None,
+    tile_size: Optional[int] = None,
+) -> int:
+    """Estimate the peak memory of processing one image from its header.
+
+    The file is opened without decoding its pixels. The estimate covers
+    the decoded image, its RGBA working copy and cut-out, the mask and
+    the array fed to the model (the downscaled image, or one tile).
+
+    Args:
+        path: Image file path.
+        max_inference_side: Longest side of the images fed to the model.
+        tile_size: Tile edge for tiled inference.
+
+    Returns:
+        Estimated bytes; 0 if the header cannot be read (the file then
+        fails quickly in the decode stage).
+    """
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            mode = image.mode
+    except Exception:
+        return 0
+    pixels = width * height
+    decoded = pixels * _MODE_BYTES.get(mode, _DEFAULT_MODE_BYTES)
+    # RGBA conversion + RGBA result + full-size mask
+    composite = pixels * (4 + 4 + 1)
+    inference_side = max(width, height)
+    if max_inference_side:
+        inference_side = min(inference_side, max_inference_side)
+    if tile_size and max(width, height) > tile_size:
+        inference_side = min(inference_side, tile_size)
+    scale = inference_side / max(width, height, 1)
+    inference = int(pixels * scale * scale) * 4
+    return decoded + composite + inference + IMAGE_OVERHEAD_BYTES
+
+
+class MemoryBudget:
+    """Byte budget shared by the jobs of a batch.
+
+    Jobs reserve their estimated memory before they start and release
+    it when they finish. A reservation that does not fit waits until
+    enough is released; a single job larger than the whole budget is
+    admitted alone, so nothing waits forever.
+
+    Attributes:
+        budget: Budget in bytes.
+        in_use: Currently reserved bytes.
+        peak: Highest reserved total so far.
+        admitted: Number of admitted reservations.
+        waits: Reservations that had to wait.
+        wait_time: Total seconds spent waiting for admission.
+        max_wait: Longest single wait (seconds).
+    """
+
+    def __init__(self, budget: int) -> None:
+        if budget <= 0:
+            raise ValueError(f"Memory budget must be positive, got {budget}")
+        self.budget = budget
+        self.in_use = 0
+        self.peak = 0
+        self.admitted = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self._blocked_since: Optional[float] = None
+        self._condition = threading.Condition()
+
+    def _fits(self, nbytes: int) -> bool:
+        return self.in_use == 0 or self.in_use + nbytes <= self.budget
+
+    def _admit(self, nbytes: int, waited: float) -> None:
+        """Record an admission (condition lock held)."""
+        self.in_use += nbytes
+        self.peak = max(self.peak, self.in_use)
+        self.admitted += 1
+        if waited > 0:
+            self.waits += 1
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def acquire(self, nbytes: int, cancel_event: Optional[threading.Event] = None) -> bool:
+        """Reserve ``nbytes``, blocking until they fit in the budget.
+
+        Returns:
+            True once reserved; False if ``cancel_event`` was set first.
+        """
+        started = time.perf_counter()
+        blocked = False
+        with self._condition:
+            while not self._fits(nbytes):
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+                blocked = True
+                self._condition.wait(_CANCEL_POLL)
+            self._admit(nbytes, time.perf_counter() - started if blocked else 0.0)
+            return True
+
+    def try_acquire(self, nbytes: int) -> bool:
+        """Reserve ``nbytes`` if they fit now.
+
+        For callers that poll (one pending reservation at a time): the
+        time between the first refusal and the admission counts as a wait.
+        """
+        with self._condition:
+            now = time.perf_counter()
+            if not self._fits(nbytes):
+                if self._blocked_since is None:
+                    self._blocked_since = now
+                return False
+            waited = now - self._blocked_since if self._blocked_since is not None else 0.0
+            self._blocked_since = None
+            self._admit(nbytes, waited)
+            return True
+
+    def release(self, nbytes: int) -> None:
+        """Return a reservation to the budget."""
+        with self._condition:
+            self.in_use = max(0, self.in_use - nbytes)
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return budget usage and admission waits."""
+        with self._condition:
+            return {
+                "budget": self.budget,
+                "in_use": self.in_use,
+                "peak": self.peak,
+                "admitted": self.admitted,
+                "waits": self.waits,
+                "wait_time": round(self.wait_time, 4),
+                "max_wait": round(self.max_wait, 4),
+            }
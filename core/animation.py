@@ -0,0 +1,155 @@
+"""Animated images — frame reading, mask reuse planning and animated export."""
+
+import os
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Mean absolute difference (0-255 grayscale, on a small thumbnail) below
+# which a frame reuses the mask of its keyframe
+DEFAULT_REUSE_THRESHOLD = 2.0
+
+# Longest side of the thumbnails compared between frames
+_SIGNATURE_SIDE = 64
+
+# Output formats that keep full alpha in animations
+ANIMATED_FORMATS = {".png": "PNG", ".apng": "PNG", ".webp": "WEBP"}
+
+# Frame duration used when the source does not specify one (ms)
+_DEFAULT_DURATION = 100
+
+
+def is_animated(image: Image.Image) -> bool:
+    """Check whether an image has more than one frame."""
+    return bool(getattr(image, "is_animated", False)) and getattr(image, "n_frames", 1) > 1
+
+
+def read_frames(image: Image.Image) -> Tuple[List[Image.Image], List[int]]:
+    """Return every frame of an (animated) image and its duration.
+
+    Pillow resolves GIF/APNG disposal and blending while seeking, so each
+    returned frame is the complete RGBA picture shown at that point.
+
+    Returns:
+        ``(frames, durations)`` with durations in milliseconds.
+    """
+    default = image.info.get("duration") or _DEFAULT_DURATION
+    frames: List[Image.Image] = []
+    durations: List[int] = []
+    for frame in ImageSequence.Iterator(image):
+        frames.append(frame.convert("RGBA"))
+        durations.append(int(frame.info.get("duration") or default))
+    image.seek(0)
+    return frames, durations
+
+
+def frame_signature(frame: Image.Image) -> np.ndarray:
+    """Return a small grayscale thumbnail used to compare frames cheaply."""
+    thumb = frame.convert("L")
+    thumb.thumbnail((_SIGNATURE_SIDE, _SIGNATURE_SIDE), Image.BILINEAR)
+    return np.asarray(thumb, dtype=np.float32)
+
+
+def plan_keyframes(signatures: List[np.ndarray], threshold: float = DEFAULT_REUSE_THRESHOLD) -> List[int]:
+    """Map every frame to the keyframe whose mask it uses.
+
+    A frame becomes a keyframe when its mean absolute difference to the
+    current keyframe exceeds ``threshold``. Comparing against the
+    keyframe rather than the previous frame keeps slow drifts from
+    reusing an increasingly stale mask.
+
+    Args:
+        signatures: Frame signatures from :func:`frame_signature`.
+        threshold: Reuse threshold (0 = infer every frame).
+
+    Returns:
+        For each frame, the index of its keyframe (keyframes map to themselves).
+    """
+    sources: List[int] = []
+    key = -1
+    for index, signature in enumerate(signatures):
+        if key < 0 or signatures[key].shape != signature.shape or \
+                float(np.abs(signature - signatures[key]).mean()) > threshold:
+            key = index
+        sources.append(key)
+    return sources
+
+
+class AnimatedCutout:
+    """Background-removed animation.
+
+    Attributes:
+        frames: Cut-out frames (RGBA).
+        durations: Display duration of each frame (milliseconds).
+        loop: Loop count of the source (0 = forever).
+        inferred_frames: Number of frames that ran through the model.
+        reused_frames: Number of frames that reused a keyframe's mask.
+    """
+
+    __slots__ = ("frames", "durations", "loop", "inferred_frames", "reused_frames")
+
+    def __init__(
+        self,
+        frames: List[Image.Image],
+        durations: List[int],
+        loop: int = 0,
+        inferred_frames: int = 0,
+        reused_frames: int = 0,
+    ) -> None:
+        self.frames = frames
+        self.durations = durations
+        self.loop = loop
+        self.inferred_frames = inferred_frames
+        self.reused_frames = reused_frames
+
+    def save(self, path: str, lossless: bool = True) -> str:
+        """Write the animation as a transparent APNG or animated WebP.
+
+        Args:
+            path: Output path; the extension selects the format
+                (``.png``/``.apng`` or ``.webp``).
+            lossless: Use lossless WebP compression.
+
+        Returns:
+            The output path.
+
+        Raises:
+            ValueError: If the extension is not an animated alpha format.
+        """
+        ext = os.path.splitext(path)[1].lower()
+        file_format = ANIMATED_FORMATS.get(ext)
+        if file_format is None:
+            raise ValueError(f"Unsupported animation format: {ext or path}")
+
+        options: Dict[str, Any] = {
+            "save_all": True,
+            "append_images": self.frames[1:],
+            "duration": self.durations,
+            "loop": self.loop,
+        }
+        if file_format == "PNG":
+            # Clear each frame before drawing the next so transparency doesn't accumulate
+            options.update(disposal=1, blend=0)
+        else:
+            # Keyframes only: cropped sub-frames can drop the alpha flag when
+            # every frame's visible area is fully opaque (hard-edged masks)
+            options.update(lossless=lossless, kmin=1, kmax=1)
+        self.frames[0].save(path, file_format, **options)
+        logger.info("Animation saved: %s (%d frames)", path, len(self.frames))
+        return path
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return frame statistics as a dictionary."""
+        return {
+            "frames": len(self.frames),
+            "inferred_frames": self.inferred_frames,
+            "reused_frames": self.reused_frames,
+        }
+
+    def __repr__(self) -> str:
+        return f"AnimatedCutout(frames={len(self.frames)}, inferred={self.inferred_frames})"
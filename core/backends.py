@@ -0,0 +1,372 @@
+"""Mask backends — rembg models, colour keying and a deterministic fake behind one interface."""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from core.keying import ChromaKeyer
+from core.model_registry import DEFAULT_MODEL, FAMILY_ISNET, FAMILY_U2NET, ModelRegistry
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Names of the built-in backends
+BACKEND_REMBG = "rembg"
+BACKEND_KEYING = "keying"
+BACKEND_FAKE = "fake"
+
+# Input normalization (mean, std, model input size) per model family, for
+# sessions that feed a single image tensor: several images can then share
+# one batched ONNX call when the graph has a dynamic batch axis
+_IMAGENET_320 = ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320))
+_ISNET_1024 = ((0.5, 0.5, 0.5), (1.0, 1.0, 1.0), (1024, 1024))
+_ONNX_BATCH_NORMALIZATION = {FAMILY_U2NET: _IMAGENET_320, FAMILY_ISNET: _ISNET_1024}
+
+# Lazy import — only load rembg when first needed
+_rembg_remove = None
+_rembg_new_session = None
+
+# rembg reads its model directory from U2NET_HOME; held while it is overridden
+_model_home_lock = threading.Lock()
+
+
+def _get_rembg_remove():
+    """Lazy import — loads the rembg module on first use."""
+    global _rembg_remove
+    if _rembg_remove is None:
+        from rembg import remove
+        _rembg_remove = remove
+        logger.info("rembg module loaded.")
+    return _rembg_remove
+
+
+def _get_rembg_new_session():
+    """Lazy import — loads the rembg session factory on first use."""
+    global _rembg_new_session
+    if _rembg_new_session is None:
+        from rembg import new_session
+        _rembg_new_session = new_session
+    return _rembg_new_session
+
+
+def _new_session_in(model_dir: str, session_name: str, **options: Any) -> Any:
+    """Create a rembg session with ``model_dir`` as rembg's model directory.
+
+    Built-in models are looked up (and downloaded) there, and custom
+    sessions only accept a ``model_path`` inside it. rembg only takes the
+    directory from ``U2NET_HOME``, so the variable is overridden for the
+    duration of the call and restored afterwards.
+    """
+    with _model_home_lock:
+        previous = os.environ.get("U2NET_HOME")
+        os.environ["U2NET_HOME"] = model_dir
+        try:
+            return _get_rembg_new_session()(session_name, **options)
+        finally:
+            if previous is None:
+                del os.environ["U2NET_HOME"]
+            else:
+                os.environ["U2NET_HOME"] = previous
+
+
+def mask_from_output(output: Any) -> np.ndarray:
+    """Normalize a backend output to an 8-bit (H, W) mask.
+
+    Bare masks pass through; for a cut-out (H, W, 4) the alpha channel
+    is the mask, for other multi-channel outputs the first channel.
+    """
+    mask = np.asarray(output)
+    if mask.ndim == 3:
+        mask = mask[..., 3] if mask.shape[2] == 4 else mask[..., 0]
+    return mask.astype(np.uint8, copy=False)
+
+
+class MaskBackend:
+    """Interface of the mask backends.
+
+    A backend turns image arrays (uint8 RGB or RGBA) into 8-bit masks
+    of the same size, 255 = foreground. Model backends receive the
+    arrays the processor prepared — downscaled to the inference size,
+    or single tiles — and their masks are cached. Full-resolution
+    backends always see the whole image and are neither tiled nor
+    cached.
+
+    Subclasses implement :meth:`predict_mask` and, when several images
+    per call are cheaper, :meth:`predict_masks`.
+
+    Attributes:
+        name: Name the backend is registered under.
+        supports_batch: :meth:`predict_masks` runs several arrays in
+            fewer calls than one each.
+        only_mask: Masks come straight from the backend rather than
+            being extracted from a cut-out.
+        full_resolution: Works on full-resolution images only (no
+            downscaled or tiled inference, no mask cache).
+        needs_model: Loads model weights, so a warm-up is worthwhile.
+    """
+
+    name = ""
+    supports_batch = False
+    only_mask = True
+    full_resolution = False
+    needs_model = False
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+    def capabilities(self) -> Dict[str, bool]:
+        """Return the backend's capability flags."""
+        return {
+            "supports_batch": self.supports_batch,
+            "only_mask": self.only_mask,
+            "full_resolution": self.full_resolution,
+            "needs_model": self.needs_model,
+        }
+
+    def predict_mask(self, array: np.ndarray, model_name: Optional[str] = None) -> np.ndarray:
+        """Return the 8-bit mask of one image array."""
+        raise NotImplementedError
+
+    def predict_masks(self, arrays: List[np.ndarray], model_name: Optional[str] = None) -> List[np.ndarray]:
+        """Return the masks of several image arrays, in input order."""
+        return [self.predict_mask(array, model_name) for array in arrays]
+
+    def finish(self, image: Image.Image, mask: Image.Image) -> Image.Image:
+        """Adjust the source image before it is composited with its mask (default: unchanged)."""
+        return image
+
+    def warm_up(self, model_names: List[str], dummy_inference: bool = False) -> None:
+        """Load what the first request would otherwise wait for (default: nothing)."""
+
+    def close(self) -> None:
+        """Release held resources (default: nothing)."""
+
+
+class RembgBackend(MaskBackend):
+    """rembg segmentation models, one long-lived session per model.
+
+    Models are resolved through a :class:`~core.model_registry.ModelRegistry`,
+    so jobs can name a speed/quality tier instead of a model and local
+    model files are loaded without a download.
+
+    Attributes:
+        registry: Registry the models are loaded from.
+    """
+
+    name = BACKEND_REMBG
+    supports_batch = True
+    needs_model = True
+
+    def __init__(self, registry: Optional[ModelRegistry] = None) -> None:
+        self.registry = registry or ModelRegistry()
+        self._sessions: Dict[str, Any] = {}
+        self._session_lock = threading.Lock()
+
+    def get_session(self, model_name: Optional[str] = None) -> Any:
+        """Return the pooled session for a model (or tier), creating it on first use."""
+        name = self.registry.resolve(model_name or DEFAULT_MODEL)
+        with self._session_lock:
+            session = self._sessions.get(name)
+            if session is None:
+                start_time = time.time()
+                session_name, options = self.registry.session_args(name)
+                # rembg refuses model files outside its model directory, so a
+                # file loaded by path gets its own directory as that directory
+                model_path = options.get("model_path")
+                model_dir = os.path.dirname(model_path) if model_path else self.registry.model_dir
+                session = _new_session_in(model_dir, session_name, **options)
+                self._sessions[name] = session
+                logger.info("Model session created: %s (%.2fs)", name, time.time() - start_time)
+            return session
+
+    @property
+    def loaded_models(self) -> List[str]:
+        """Return the names of models with a live session."""
+        with self._session_lock:
+            return list(self._sessions)
+
+    def warm_up(self, model_names: List[str], dummy_inference: bool = False) -> None:
+        """Load rembg and create the sessions of ``model_names``."""
+        _get_rembg_remove()
+        for name in model_names:
+            self.get_session(name)
+            if dummy_inference:
+                self.predict_mask(np.full((32, 32, 3), 128, dtype=np.uint8), name)
+
+    def close(self) -> None:
+        """Release all pooled sessions."""
+        with self._session_lock:
+            names = list(self._sessions)
+            self._sessions.clear()
+        if names:
+            logger.info("Model sessions released: %s", ", ".join(names))
+
+    def predict_mask(self, array: np.ndarray, model_name: Optional[str] = None) -> np.ndarray:
+        """Run the model on a prepared array and return its 8-bit mask."""
+        remove_fn = _get_rembg_remove()
+        return mask_from_output(remove_fn(array, session=self.get_session(model_name), only_mask=True))
+
+    def predict_masks(self, arrays: List[np.ndarray], model_name: Optional[str] = None) -> List[np.ndarray]:
+        """Run the model on several prepared arrays, batching when the session allows it."""
+        mode = self._batch_mode(model_name) if len(arrays) > 1 else None
+        if mode == "hook":
+            return self._predict_masks_hook(arrays, model_name)
+        if mode == "onnx":
+            return self._predict_masks_onnx(arrays, model_name)
+        return [self.predict_mask(arr, model_name) for arr in arrays]
+
+    def _normalization(self, model_name: Optional[str]) -> Optional[Tuple]:
+        """Return the input normalization of a known model (None if unknown)."""
+        spec = self.registry.spec(model_name or DEFAULT_MODEL)
+        return _ONNX_BATCH_NORMALIZATION.get(spec.family) if spec is not None else None
+
+    def _batch_mode(self, model_name: Optional[str]) -> Optional[str]:
+        """Return how a model's session can run several images per call.
+
+        Returns:
+            ``"hook"`` if the session has a ``predict_batch`` method,
+            ``"onnx"`` for a known rembg model whose ONNX input has a
+            dynamic batch axis, or None (one image per call).
+        """
+        session = self.get_session(model_name)
+        if callable(getattr(session, "predict_batch", None)):
+            return "hook"
+        inner = getattr(session, "inner_session", None)
+        if inner is None or self._normalization(model_name) is None:
+            return None
+        try:
+            batch_dim = inner.get_inputs()[0].shape[0]
+        except Exception:
+            return None
+        return None if isinstance(batch_dim, int) else "onnx"
+
+    def _predict_masks_hook(self, arrays: List[np.ndarray], model_name: Optional[str]) -> List[np.ndarray]:
+        """Batch through the session's ``predict_batch``, one call per input shape."""
+        session = self.get_session(model_name)
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        for index, arr in enumerate(arrays):
+            groups.setdefault(arr.shape, []).append(index)
+
+        masks: List[Optional[np.ndarray]] = [None] * len(arrays)
+        for indices in groups.values():
+            outputs = session.predict_batch([arrays[i] for i in indices])
+            for index, mask in zip(indices, outputs):
+                masks[index] = mask_from_output(mask)
+        return masks
+
+    def _predict_masks_onnx(self, arrays: List[np.ndarray], model_name: Optional[str]) -> List[np.ndarray]:
+        """Run a rembg session's ONNX graph once over a stacked input tensor.
+
+        Mirrors the session's own ``predict``: every image is normalized
+        to the model input size, so inputs of any size share the batch,
+        and each prediction is min-max scaled and resized back.
+        """
+        session = self.get_session(model_name)
+        mean, std, size = self._normalization(model_name)
+        images = [Image.fromarray(arr) for arr in arrays]
+        feeds = [session.normalize(img, mean, std, size) for img in images]
+        input_name = next(iter(feeds[0]))
+        outputs = session.inner_session.run(
+            None, {input_name: np.concatenate([feed[input_name] for feed in feeds])},
+        )
+
+        masks = []
+        for img, pred in zip(images, outputs[0][:, 0, :, :]):
+            low, high = float(pred.min()), float(pred.max())
+            pred = (pred - low) / (high - low) if high > low else np.zeros_like(pred)
+            mask = Image.fromarray((pred * 255).astype(np.uint8), "L").resize(img.size, Image.LANCZOS)
+            masks.append(np.asarray(mask))
+        return masks
+
+
+class KeyingBackend(MaskBackend):
+    """Colour keying of solid and chroma-key backgrounds (see :mod:`core.keying`).
+
+    Attributes:
+        keyer: The keying engine.
+    """
+
+    name = BACKEND_KEYING
+    full_resolution = True
+
+    def __init__(self, keyer: Optional[ChromaKeyer] = None) -> None:
+        self.keyer = keyer or ChromaKeyer()
+
+    def predict_mask(self, array: np.ndarray, model_name: Optional[str] = None) -> np.ndarray:
+        return np.asarray(self.keyer.compute_mask(Image.fromarray(array)))
+
+    def finish(self, image: Image.Image, mask: Image.Image) -> Image.Image:
+        """Suppress the key colour's spill on the foreground."""
+        return self.keyer.suppress_spill(image, mask)
+
+
+class FakeBackend(MaskBackend):
+    """Deterministic stand-in for tests and dry runs: bright pixels are foreground.
+
+    Attributes:
+        threshold: Mean channel value above which a pixel is foreground.
+        calls: Number of :meth:`predict_masks` calls.
+        input_shapes: Shapes of every array received.
+    """
+
+    name = BACKEND_FAKE
+    supports_batch = True
+
+    def __init__(self, threshold: int = 127) -> None:
+        self.threshold = threshold
+        self.calls = 0
+        self.input_shapes: List[Tuple[int, ...]] = []
+        self._lock = threading.Lock()
+
+    def predict_mask(self, array: np.ndarray, model_name: Optional[str] = None) -> np.ndarray:
+        return self.predict_masks([array], model_name)[0]
+
+    def predict_masks(self, arrays: List[np.ndarray], model_name: Optional[str] = None) -> List[np.ndarray]:
+        with self._lock:
+            self.calls += 1
+            self.input_shapes.extend(array.shape for array in arrays)
+        return [
+            np.where(array[..., :3].mean(axis=2) > self.threshold, 255, 0).astype(np.uint8)
+            for array in arrays
+        ]
+
+
+# ==================== REGISTRY ====================
+
+_FACTORIES: Dict[str, Callable[[], MaskBackend]] = {
+    BACKEND_REMBG: RembgBackend,
+    BACKEND_KEYING: KeyingBackend,
+    BACKEND_FAKE: FakeBackend,
+}
+
+
+def register_backend(name: str, factory: Callable[[], MaskBackend]) -> None:
+    """Make a backend available by name.
+
+    Args:
+        name: Backend name (replaces an existing registration).
+        factory: Called without arguments to create an instance; each
+            processor creates its own.
+    """
+    _FACTORIES[name] = factory
+
+
+def backend_names() -> List[str]:
+    """Return the registered backend names."""
+    return list(_FACTORIES)
+
+
+def create_backend(name: str) -> MaskBackend:
+    """Create a backend by name.
+
+    Raises:
+        ValueError: If no backend is registered under ``name``.
+    """
+    factory = _FACTORIES.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown backend {name!r} (expected one of {', '.join(_FACTORIES)})")
+    return factory()
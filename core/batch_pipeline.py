@@ -0,0 +1,335 @@
+"""Staged batch pipeline — decode, infer and encode on separate workers."""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Default capacity of each inter-stage queue
+DEFAULT_QUEUE_DEPTH = 4
+
+# Marks the end of the stream on a stage queue
+_STOP = object()
+
+
+class StageStats:
+    """Timing statistics for one pipeline stage.
+
+    Attributes:
+        name: Stage name.
+        workers: Number of worker threads in the stage.
+        items: Number of items the stage handled.
+        busy_time: Total time spent inside the stage function (seconds).
+        wall_time: Wall-clock duration of the whole pipeline run (seconds).
+        batches: Per batch size, the number of calls and their total time
+            (only for stages that run items in batches).
+    """
+
+    __slots__ = ("name", "workers", "items", "busy_time", "wall_time", "batches")
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy_time = 0.0
+        self.wall_time = 0.0
+        self.batches: Dict[int, List[float]] = {}
+
+    def record_batch(self, size: int, elapsed: float) -> None:
+        """Record one batched call of ``size`` items."""
+        entry = self.batches.setdefault(size, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+
+    def batch_report(self) -> Dict[int, Dict[str, float]]:
+        """Return latency and throughput per batch size.
+
+        Returns:
+            ``{size: {"batches", "latency", "throughput"}}`` where latency is
+            the mean time per call (seconds) and throughput is items/second.
+        """
+        return {
+            size: {
+                "batches": count,
+                "latency": round(total / count, 4),
+                "throughput": round(size * count / total, 2) if total > 0 else 0.0,
+            }
+            for size, (count, total) in sorted(self.batches.items())
+        }
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of available worker time spent busy (0.0 - 1.0)."""
+        capacity = self.wall_time * self.workers
+        return min(1.0, self.busy_time / capacity) if capacity > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the statistics as a dictionary."""
+        stats: Dict[str, Any] = {
+            "workers": self.workers,
+            "items": self.items,
+            "busy_time": round(self.busy_time, 4),
+            "utilization": round(self.utilization, 3),
+        }
+        if self.batches:
+            stats["batch_sizes"] = self.batch_report()
+        return stats
+
+    def __repr__(self) -> str:
+        return f"StageStats({self.name!r}, items={self.items}, utilization={self.utilization:.0%})"
+
+
+class _Job:
+    """An item travelling through the pipeline."""
+
+    __slots__ = ("item", "payload", "error")
+
+    def __init__(self, item: Any) -> None:
+        self.item = item
+        self.payload: Any = item
+        self.error: Optional[str] = None
+
+
+class BatchPipeline:
+    """Three-stage pipeline joined by bounded queues.
+
+    Items flow ``decode → infer → encode``; each stage runs on its own
+    worker threads so disk reads, inference and PNG encoding overlap.
+    The queues between stages are bounded by ``queue_depth``, which
+    caps the number of decoded images held in memory at once.
+
+    A failing stage marks the item as failed; later stages skip it and
+    the error is reported with the result.
+
+    With ``infer_batch`` and ``infer_batch_size > 1`` each infer worker
+    takes whatever is already queued (up to the batch size, without
+    waiting for more) and hands it to ``infer_batch`` in one call. If a
+    batched call fails, its items are retried one by one with ``infer``
+    so one bad image does not fail its neighbours.
+
+    Attributes:
+        stats: Per-stage statistics of the last run.
+    """
+
+    STAGES = ("decode", "infer", "encode")
+
+    def __init__(
+        self,
+        decode: Callable[[Any], Any],
+        infer: Callable[[Any], Any],
+        encode: Callable[[Any], Any],
+        decode_workers: int = 1,
+        infer_workers: int = 1,
+        encode_workers: int = 1,
+        queue_depth: int = DEFAULT_QUEUE_DEPTH,
+        cancel_event: Optional[threading.Event] = None,
+        infer_batch: Optional[Callable[[List[Any]], List[Any]]] = None,
+        infer_batch_size: int = 1,
+    ) -> None:
+        self._functions = (decode, infer, encode)
+        self._infer_batch = infer_batch
+        self.infer_batch_size = max(1, infer_batch_size) if infer_batch else 1
+        self._workers = (max(1, decode_workers), max(1, infer_workers), max(1, encode_workers))
+        self.queue_depth = max(1, queue_depth)
+        self._cancel_event = cancel_event or threading.Event()
+        self.stats: Dict[str, StageStats] = {}
+
+    def run(
+        self,
+        items: Iterable[Any],
+        on_result: Callable[[Any, Any, Optional[str]], None],
+    ) -> Dict[str, StageStats]:
+        """Push items through the pipeline, blocking until all are done.
+
+        ``on_result(item, result, error)`` is called from the calling
+        thread for every item that left the last stage. After
+        cancellation, queued items are dropped without being reported.
+
+        Args:
+            items: Input items.
+            on_result: Result callback.
+
+        Returns:
+            Per-stage statistics.
+        """
+        self.stats = {
+            name: StageStats(name, workers) for name, workers in zip(self.STAGES, self._workers)
+        }
+        queues: List["queue.Queue"] = [queue.Queue(maxsize=self.queue_depth) for _ in self.STAGES]
+        results: "queue.Queue" = queue.Queue()
+        outputs = queues[1:] + [results]
+        stat_lock = threading.Lock()
+        threads: List[threading.Thread] = []
+        start_time = time.perf_counter()
+
+        for index, name in enumerate(self.STAGES):
+            remaining = [self._workers[index]]
+            next_workers = self._workers[index + 1] if index + 1 < len(self.STAGES) else 1
+            batched = name == "infer" and self.infer_batch_size > 1
+            for _ in range(self._workers[index]):
+                thread = threading.Thread(
+                    target=self._batch_stage_worker if batched else self._stage_worker,
+                    args=(
+                        self.stats[name], self._functions[index], queues[index], outputs[index],
+                        remaining, next_workers, stat_lock,
+                    ),
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        feeder = threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)
+        feeder.start()
+
+        while True:
+            job = results.get()
+            if job is _STOP:
+                break
+            on_result(job.item, job.payload, job.error)
+
+        feeder.join()
+        for thread in threads:
+            thread.join()
+
+        wall_time = time.perf_counter() - start_time
+        for stats in self.stats.values():
+            stats.wall_time = wall_time
+        logger.info(
+            "Pipeline finished in %.2fs: %s", wall_time,
+            ", ".join(f"{s.name}={s.utilization:.0%}" for s in self.stats.values()),
+        )
+        for size, report in self.stats["infer"].batch_report().items():
+            logger.info(
+                "Infer batch size %d: %d calls, %.3fs/call, %.1f items/s",
+                size, report["batches"], report["latency"], report["throughput"],
+            )
+        return self.stats
+
+    def _feed(self, items: Iterable[Any], first_queue: "queue.Queue") -> None:
+        """Feed input items into the first stage."""
+        try:
+            for item in items:
+                if self._cancel_event.is_set():
+                    break
+                first_queue.put(_Job(item))
+        finally:
+            for _ in range(self._workers[0]):
+                first_queue.put(_STOP)
+
+    def _stage_worker(
+        self,
+        stats: StageStats,
+        func: Callable[[Any], Any],
+        in_queue: "queue.Queue",
+        out_queue: "queue.Queue",
+        remaining: List[int],
+        next_workers: int,
+        stat_lock: threading.Lock,
+    ) -> None:
+        """Run one stage function over its input queue."""
+        while True:
+            job = in_queue.get()
+            if job is _STOP:
+                break
+            # Cancelled items are dropped; failed items pass straight through
+            if self._cancel_event.is_set() and job.error is None:
+                continue
+            if job.error is None:
+                started = time.perf_counter()
+                try:
+                    job.payload = func(job.payload)
+                except Exception as e:
+                    job.error = str(e) or type(e).__name__
+                    job.payload = None
+                with stat_lock:
+                    stats.items += 1
+                    stats.busy_time += time.perf_counter() - started
+            out_queue.put(job)
+
+        self._close_stage(out_queue, remaining, next_workers, stat_lock)
+
+    def _batch_stage_worker(
+        self,
+        stats: StageStats,
+        func: Callable[[Any], Any],
+        in_queue: "queue.Queue",
+        out_queue: "queue.Queue",
+        remaining: List[int],
+        next_workers: int,
+        stat_lock: threading.Lock,
+    ) -> None:
+        """Run the batched infer function over its input queue."""
+        stopped = False
+        while not stopped:
+            job = in_queue.get()
+            if job is _STOP:
+                break
+            jobs = [job]
+            # Take what is already queued, but never wait to fill a batch
+            while len(jobs) < self.infer_batch_size:
+                try:
+                    job = in_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopped = True
+                    break
+                jobs.append(job)
+
+            runnable = []
+            for job in jobs:
+                if job.error is None and not self._cancel_event.is_set():
+                    runnable.append(job)
+                elif job.error is not None:
+                    out_queue.put(job)
+            if not runnable:
+                continue
+
+            started = time.perf_counter()
+            try:
+                results = self._infer_batch([job.payload for job in runnable])
+                for job, result in zip(runnable, results):
+                    job.payload = result
+                calls = [(len(runnable), time.perf_counter() - started)]
+            except Exception as e:
+                logger.warning("Batched inference failed (%s); retrying items one by one", e)
+                # Only the retries count as calls; the failed batch adds to the busy time alone
+                calls = []
+                for job in runnable:
+                    item_started = time.perf_counter()
+                    try:
+                        job.payload = func(job.payload)
+                    except Exception as item_error:
+                        job.error = str(item_error) or type(item_error).__name__
+                        job.payload = None
+                    calls.append((1, time.perf_counter() - item_started))
+            elapsed = time.perf_counter() - started
+            with stat_lock:
+                stats.items += len(runnable)
+                stats.busy_time += elapsed
+                for size, seconds in calls:
+                    stats.record_batch(size, seconds)
+            for job in runnable:
+                out_queue.put(job)
+
+        self._close_stage(out_queue, remaining, next_workers, stat_lock)
+
+    @staticmethod
+    def _close_stage(
+        out_queue: "queue.Queue",
+        remaining: List[int],
+        next_workers: int,
+        stat_lock: threading.Lock,
+    ) -> None:
+        """Close the next queue once the last worker of a stage is done."""
+        with stat_lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(next_workers):
+                out_queue.put(_STOP)
+
@@ -0,0 +1,106 @@
+"""Reduced-scale decoding — JPEG draft mode and reduce() for previews and inference."""
+
+from typing import Optional, Tuple
+
+from PIL import Image
+
+# Formats whose decoder can scale while decoding (JPEG DCT scaling: 1/2, 1/4, 1/8)
+DRAFT_FORMATS = ("JPEG", "MPO")
+
+
+def fit_size(size: Tuple[int, int], max_side: Optional[int]) -> Tuple[int, int]:
+    """Return ``size`` scaled down to fit ``max_side``.
+
+    Args:
+        size: Original (width, height).
+        max_side: Maximum length of the longest side (None = unlimited).
+
+    Returns:
+        ``size`` scaled down to fit ``max_side``, or ``size`` unchanged.
+    """
+    width, height = size
+    if not max_side or max(width, height) <= max_side:
+        return size
+    scale = max_side / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def is_deferred(image: Image.Image) -> bool:
+    """Whether an image was opened but its pixels are not decoded yet."""
+    return bool(getattr(image, "tile", None))
+
+
+def can_draft(image: Image.Image) -> bool:
+    """Whether an undecoded image can be decoded directly at a reduced scale."""
+    return image.format in DRAFT_FORMATS and is_deferred(image)
+
+
+def decode_reduced(
+    image: Image.Image,
+    max_side: Optional[int],
+    resample: int = Image.BILINEAR,
+) -> Image.Image:
+    """Decode an opened image at the scale that fits ``max_side``.
+
+    JPEGs are decoded with :meth:`~PIL.Image.Image.draft`, so a 24 MP
+    photo needed at 1024 px is decoded at 1/4 scale without ever
+    materializing the full-resolution pixels. The result is then
+    brought close to the target with the fast integer
+    :meth:`~PIL.Image.Image.reduce` and resized to exactly
+    :func:`fit_size`. Other formats are fully decoded first.
+
+    The draft request changes ``image`` itself; open the file again
+    when the full resolution is needed later.
+
+    Args:
+        image: Image returned by ``Image.open`` (not loaded yet).
+        max_side: Longest side of the result (None = full resolution).
+        resample: Filter of the final resize.
+
+    Returns:
+        The decoded image, at most ``max_side`` on its longest side.
+    """
+    target = fit_size(image.size, max_side)
+    if target == image.size:
+        image.load()
+        return image
+    if can_draft(image):
+        # The decoder picks the smallest DCT scale that is still >= target
+        image.draft(image.mode if image.mode in ("RGB", "L") else None, target)
+    image.load()
+    factor = min(image.width // target[0], image.height // target[1])
+    if factor >= 2:
+        image = image.reduce(factor)
+    if image.size != target:
+        image = image.resize(target, resample)
+    return image
+
+
+def open_for_inference(path: str, max_side: Optional[int]) -> Tuple[Image.Image, bool]:
+    """Open an image for mask inference, decoding at reduced scale when it is cheap.
+
+    Only formats with draft support are decoded reduced — for the others
+    a reduced decode would cost a full decode now and another one for
+    the composite.
+
+    Args:
+        path: Image file path.
+        max_side: Longest side fed to the model (None = full resolution).
+
+    Returns:
+        ``(image, reduced)`` — ``reduced`` is True when the image is
+        smaller than the file and :func:`load_full` is needed for a
+        full-resolution composite.
+    """
+    image = Image.open(path)
+    if can_draft(image) and fit_size(image.size, max_side) != image.size:
+        return decode_reduced(image, max_side), True
+    image.load()
+    return image, False
+
+
+def load_full(path: str) -> Image.Image:
+    """Open and fully decode an image file."""
+    image = Image.open(path)
+    image.load()
+    return image
@@ -21,14 +21,16 @@ class HistoryEntry:
         image: The image state at this point.
         action: The name of the action performed.
         timestamp: The time the action was performed.
+        mask: The alpha mask attached to the image at this point, if any.
     """
 
-    __slots__ = ("image", "action", "timestamp")
+    __slots__ = ("image", "action", "timestamp", "mask")
 
-    def __init__(self, image: Image.Image, action: str) -> None:
+    def __init__(self, image: Image.Image, action: str, mask: Optional[Image.Image] = None) -> None:
         self.image = image
         self.action = action
         self.timestamp = time.time()
+        self.mask = mask
 
     def __repr__(self) -> str:
         return f"HistoryEntry({self.action!r})"
@@ -44,13 +46,21 @@ class ImageEditor:
     Undo and Redo are implemented via ``collections.deque``
     (O(1) operations, memory-limited).
 
+    An alpha mask (e.g. from background removal) can be attached to the
+    image. Geometric operations transform it along with the image and
+    colour operations leave it untouched, so the cut-out can be
+    recomposited after any edit without running the model again. The
+    mask is saved and restored with undo/redo.
+
     Attributes:
         image: The current image state.
+        mask: Alpha mask of the current image (mode 'L'), or None.
         undo_limit: Maximum number of entries in the undo stack.
     """
 
     def __init__(self, image: Optional[Image.Image] = None, undo_limit: int = DEFAULT_UNDO_LIMIT) -> None:
         self._image: Optional[Image.Image] = image
+        self._mask: Optional[Image.Image] = None
         self._undo_stack: Deque[HistoryEntry] = deque(maxlen=undo_limit)
         self._redo_stack: Deque[HistoryEntry] = deque(maxlen=undo_limit)
         self.undo_limit: int = undo_limit
@@ -63,12 +73,31 @@ class ImageEditor:
 
     @image.setter
     def image(self, new_image: Optional[Image.Image]) -> None:
-        """Set a new image and clear undo/redo stacks."""
+        """Set a new image and clear the mask and undo/redo stacks."""
         self._image = new_image
+        self._mask = None
         self._undo_stack.clear()
         self._redo_stack.clear()
         self._history_log.clear()
 
+    @property
+    def mask(self) -> Optional[Image.Image]:
+        """Return the alpha mask attached to the current image."""
+        return self._mask
+
+    @mask.setter
+    def mask(self, new_mask: Optional[Image.Image]) -> None:
+        """Attach an alpha mask to the current image (None detaches it).
+
+        Raises:
+            ValueError: If the mask size differs from the image size.
+        """
+        if new_mask is not None:
+            if self._image is None or new_mask.size != self._image.size:
+                raise ValueError("Mask size must match the current image.")
+            new_mask = new_mask.convert("L")
+        self._mask = new_mask
+
     @property
     def can_undo(self) -> bool:
         """Check whether an undo operation is possible."""
@@ -101,7 +130,8 @@ class ImageEditor:
             action_name: Name of the action being performed.
         """
         if self._image is not None:
-            self._undo_stack.append(HistoryEntry(self._image.copy(), action_name))
+            # Masks are never modified in place, so the reference is enough
+            self._undo_stack.append(HistoryEntry(self._image.copy(), action_name, self._mask))
             self._redo_stack.clear()  # New action invalidates redo
             self._history_log.append(action_name)
 
@@ -118,10 +148,11 @@ class ImageEditor:
         # Push current state onto redo
         if self._image is not None:
             action = self._undo_stack[-1].action if self._undo_stack else "unknown"
-            self._redo_stack.append(HistoryEntry(self._image.copy(), action))
+            self._redo_stack.append(HistoryEntry(self._image.copy(), action, self._mask))
 
         entry = self._undo_stack.pop()
         self._image = entry.image
+        self._mask = entry.mask
         if self._history_log:
             self._history_log.pop()
         logger.info("Undo: '%s'. stack=%d, redo=%d", entry.action, len(self._undo_stack), len(self._redo_stack))
@@ -140,10 +171,11 @@ class ImageEditor:
         # Push current state onto undo
         if self._image is not None:
             entry_name = self._redo_stack[-1].action
-            self._undo_stack.append(HistoryEntry(self._image.copy(), entry_name))
+            self._undo_stack.append(HistoryEntry(self._image.copy(), entry_name, self._mask))
 
         entry = self._redo_stack.pop()
         self._image = entry.image
+        self._mask = entry.mask
         self._history_log.append(entry.action)
         logger.info("Redo: '%s'. stack=%d, redo=%d", entry.action, len(self._undo_stack), len(self._redo_stack))
         return True
@@ -165,6 +197,9 @@ class ImageEditor:
 
         self._push_undo(f"Rotate {angle}°")
         self._image = self._image.rotate(angle, expand=expand, resample=Image.BICUBIC)
+        if self._mask is not None:
+            # Uncovered corners become background
+            self._mask = self._mask.rotate(angle, expand=expand, resample=Image.BICUBIC)
         logger.info("Image rotated by %s°.", angle)
         return True
 
@@ -175,6 +210,8 @@ class ImageEditor:
 
         self._push_undo("Flip Horizontal")
         self._image = self._image.transpose(Image.FLIP_LEFT_RIGHT)
+        if self._mask is not None:
+            self._mask = self._mask.transpose(Image.FLIP_LEFT_RIGHT)
         logger.info("Image flipped horizontally.")
         return True
 
@@ -185,6 +222,8 @@ class ImageEditor:
 
         self._push_undo("Flip Vertical")
         self._image = self._image.transpose(Image.FLIP_TOP_BOTTOM)
+        if self._mask is not None:
+            self._mask = self._mask.transpose(Image.FLIP_TOP_BOTTOM)
         logger.info("Image flipped vertically.")
         return True
 
@@ -221,6 +260,8 @@ class ImageEditor:
 
         self._push_undo(f"Crop ({left},{top})-({right},{bottom})")
         self._image = self._image.crop((left, top, right, bottom))
+        if self._mask is not None:
+            self._mask = self._mask.crop((left, top, right, bottom))
         logger.info("Image cropped: (%d,%d) -> (%d,%d)", left, top, right, bottom)
         return True
 
@@ -244,6 +285,8 @@ class ImageEditor:
             self._image.thumbnail((width, height), Image.LANCZOS)
         else:
             self._image = self._image.resize((width, height), Image.LANCZOS)
+        if self._mask is not None:
+            self._mask = self._mask.resize(self._image.size, Image.LANCZOS)
 
         logger.info("Image resized to: %dx%d", self._image.width, self._image.height)
         return True
@@ -1,29 +1,242 @@
 """AI-powered background removal using rembg (U2-Net model)."""
 
 import os
+import queue
 import time
 import threading
-from typing import Optional, Callable, List
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, Optional, Callable, List, Tuple, Union
 
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageFilter
 
+from core.admission import MemoryBudget, estimate_memory
+from core.animation import (
+    DEFAULT_REUSE_THRESHOLD, AnimatedCutout, frame_signature, plan_keyframes, read_frames,
+)
+from core.backends import (
+    BACKEND_KEYING, BACKEND_REMBG, KeyingBackend, MaskBackend, RembgBackend, create_backend, mask_from_output,
+)
+from core.batch_pipeline import DEFAULT_QUEUE_DEPTH, BatchPipeline, StageStats
+from core.decoding import fit_size, load_full, open_for_inference
+from core.isolation import FAILURE_ERROR, IsolatedPool
+from core.keying import ChromaKeyer, detect_background
+from core.manifest import BuildManifest, IncrementalPlan, settings_key
+from core.mask_cache import MaskCache
+from core.model_registry import DEFAULT_MODEL, ModelRegistry
+from core.scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, JobHandle, JobScheduler
+from core.triage import ROUTE_COLOR_KEY, ROUTE_PASSTHROUGH, route_counts, triage
+from core.tiling import DEFAULT_GLOBAL_SIDE, DEFAULT_TILE_OVERLAP, Tile, blend_tile, compute_tiles
+from core.timing import TimingRecord, TimingStats
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-# Lazy import — only load rembg when first needed
-_rembg_remove = None
+# ONNX Runtime intra-op threads given to each batch worker process
+DEFAULT_INTRA_OP_THREADS = 4
 
+# Images per model call in pipelined batch runs (1 = one image per call)
+DEFAULT_INFERENCE_BATCH_SIZE = 1
 
-def _get_rembg_remove():
-    """Lazy import — loads the rembg module on first use."""
-    global _rembg_remove
-    if _rembg_remove is None:
-        from rembg import remove
-        _rembg_remove = remove
-        logger.info("rembg module loaded.")
-    return _rembg_remove
+
+def default_worker_count(intra_op_threads: int = DEFAULT_INTRA_OP_THREADS) -> int:
+    """Return the default number of batch worker processes.
+
+    Each worker runs its own ONNX session with ``intra_op_threads``
+    threads, so the CPU count is divided between them.
+
+    Args:
+        intra_op_threads: ONNX Runtime threads per worker.
+
+    Returns:
+        Worker count (at least 1).
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, intra_op_threads))
+
+
+def _batch_output_path(file_path: str, output_dir: str) -> str:
+    """Return the ``<name>_nobg.png`` output path for a batch input."""
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(output_dir, f"{base_name}_nobg.png")
+
+
+# Per-process processor used by the batch worker pool
+_worker_processor: Optional["ImageProcessor"] = None
+
+
+def _init_batch_worker(
+    model_name: str,
+    intra_op_threads: int,
+    cache_dir: Optional[str] = None,
+    max_cache_bytes: int = 0,
+    backend: str = BACKEND_REMBG,
+    keyer: Optional[ChromaKeyer] = None,
+    registry: Optional[ModelRegistry] = None,
+) -> None:
+    """Process pool initializer — builds one warm processor per worker.
+
+    Workers share the parent's on-disk mask cache when ``cache_dir`` is set
+    and the parent's keyer and model registry when given. Backends that
+    need no model skip the warm-up.
+    """
+    global _worker_processor
+    # rembg reads the thread count from the environment when creating sessions
+    os.environ["OMP_NUM_THREADS"] = str(intra_op_threads)
+    mask_cache = MaskCache(cache_dir, max_disk_bytes=max_cache_bytes) if cache_dir else None
+    _worker_processor = ImageProcessor(model_name, mask_cache=mask_cache, keyer=keyer, registry=registry)
+    _worker_processor.warm_up(dummy_inference=True, backend=backend)
+
+
+def _process_batch_file(
+    file_path: str,
+    output_dir: str,
+    max_inference_side: Optional[int] = None,
+    tile_size: Optional[int] = None,
+    use_triage: bool = False,
+    backend: str = BACKEND_REMBG,
+) -> "BatchResult":
+    """Process one batch file inside a worker process.
+
+    Returns:
+        The result with its output path, per-stage timing record and,
+        with ``use_triage``, its route.
+    """
+    processor = _worker_processor or ImageProcessor()
+    full_resolution = processor.get_backend(backend).full_resolution
+    timing = TimingRecord()
+    started = time.perf_counter()
+    image, reduced = open_for_inference(file_path, None if tile_size or full_resolution else max_inference_side)
+    timing.add("decode", time.perf_counter() - started, image.width * image.height)
+
+    route = mask = None
+    if use_triage:
+        with timing.stage("triage", image.width * image.height):
+            route, mask = processor.triage_mask(image)
+
+    with timing.stage("infer", image.width * image.height):
+        if mask is None:
+            mask = processor.compute_mask(
+                image, max_inference_side=max_inference_side, tile_size=tile_size, backend=backend,
+            )
+
+    started = time.perf_counter()
+    if reduced:
+        image = load_full(file_path)
+    image = processor.finish(image, mask, backend, route)
+    out_path = _batch_output_path(file_path, output_dir)
+    processor.apply_mask(image, mask).save(out_path, "PNG", optimize=True)
+    timing.add("encode", time.perf_counter() - started, image.width * image.height)
+    return BatchResult(file_path, out_path, timing=timing, route=route)
+
+
+def _log_admission(stats: Dict[str, Any]) -> None:
+    """Log the memory budget usage of a batch run."""
+    logger.info(
+        "Memory budget: peak %.1f of %.1f MB, %d/%d admissions waited (%.2fs total)",
+        stats["peak"] / 2 ** 20, stats["budget"] / 2 ** 20, stats["waits"], stats["admitted"], stats["wait_time"],
+    )
+
+
+def _log_triage(counts: Dict[str, int]) -> None:
+    """Log how many images of a batch run took each triage route."""
+    logger.info("Triage: %s", ", ".join(f"{route}={count}" for route, count in counts.items()))
+
+
+# Marks the end of the iter_process result stream
+_END_OF_RESULTS = object()
+
+
+class BatchResult:
+    """Outcome of processing one batch input.
+
+    Attributes:
+        input_path: Input file path.
+        output_path: Written output path (None on failure).
+        error: Error message (None on success).
+        timing: Seconds and pixels per stage ('decode', 'triage',
+            'infer', 'encode'; see :class:`~core.timing.TimingRecord`).
+        reason: Failure reason — 'error', or 'timeout', 'crash' or 'oom'
+            from an isolated worker (None on success).
+        route: Triage route ('passthrough', 'color_key' or 'model'; None
+            when the batch ran without triage).
+        source: The input as given to :meth:`ImageProcessor.iter_process`
+            (the path itself unless ``path_of`` was used).
+    """
+
+    __slots__ = ("input_path", "output_path", "error", "timing", "reason", "route", "source")
+
+    def __init__(
+        self,
+        input_path: str,
+        output_path: Optional[str] = None,
+        error: Optional[str] = None,
+        timing: Optional[TimingRecord] = None,
+        reason: Optional[str] = None,
+        route: Optional[str] = None,
+        source: Any = None,
+    ) -> None:
+        self.input_path = input_path
+        self.output_path = output_path
+        self.error = error
+        self.timing: TimingRecord = timing or TimingRecord()
+        self.reason = reason or (FAILURE_ERROR if error is not None else None)
+        self.route = route
+        self.source = input_path if source is None else source
+
+    @property
+    def ok(self) -> bool:
+        """Whether the input was processed successfully."""
+        return self.error is None
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Seconds spent per stage."""
+        return self.timing.durations
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the result as a dictionary."""
+        return {
+            "input_path": self.input_path,
+            "output_path": self.output_path,
+            "error": self.error,
+            "reason": self.reason,
+            "route": self.route,
+            "timings": {stage: round(t, 4) for stage, t in self.timings.items()},
+            "pixels": dict(self.timing.pixels),
+        }
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"BatchResult({os.path.basename(self.input_path)!r}, {status})"
+
+
+class _BatchItem:
+    """Mutable per-input state carried through the batch pipeline."""
+
+    __slots__ = (
+        "index", "input_path", "output_path", "error", "timing", "image", "mask", "reserved", "reduced", "route",
+        "source",
+    )
+
+    def __init__(self, index: int, input_path: str, source: Any = None) -> None:
+        self.index = index
+        self.input_path = input_path
+        self.source = input_path if source is None else source
+        self.output_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.timing = TimingRecord()
+        self.image: Optional[Image.Image] = None
+        self.mask: Optional[Image.Image] = None
+        self.reserved = 0
+        self.reduced = False
+        self.route: Optional[str] = None
+
+    def to_result(self) -> BatchResult:
+        return BatchResult(
+            self.input_path, self.output_path, self.error, self.timing, route=self.route, source=self.source,
+        )
 
 
 class ImageProcessor:
@@ -32,112 +245,760 @@ class ImageProcessor:
     Uses the rembg library (U2-Net model) to automatically remove
     backgrounds from images. Thread-safe with cancel support.
 
+    Model sessions are created once per model name and reused by every
+    call, so the ONNX model is only loaded on the first request (or in
+    :meth:`warm_up`) instead of once per image. With a
+    :class:`~core.mask_cache.MaskCache`, masks of previously seen pixels
+    are reused instead of running the model again.
+
+    Asynchronous requests run as jobs on :attr:`scheduler`: interactive
+    removals are served before queued batches and each job is cancelled
+    through its own :class:`~core.scheduler.JobHandle`, so a running
+    batch neither blocks nor gets cancelled by interactive work.
+
     Attributes:
-        is_processing: Whether a processing job is currently running.
+        model_name: Default rembg model used when none is given.
+        mask_cache: Optional mask cache consulted before inference.
+        scheduler: Job scheduler running the asynchronous requests.
         last_processing_time: Duration of the last processing job (seconds).
+        last_timing: Per-stage durations and pixel counts of the last
+            successful :meth:`remove_background` call.
+        timing_stats: Per-stage percentiles over recent successful
+            :meth:`remove_background` calls.
+        last_batch_stats: Per-stage statistics of the last pipelined batch.
+        last_batch_timing: Per-stage percentiles over the most recent
+            images of the last batch run (a bounded window, so endless
+            streams stay in flat memory).
+        last_incremental_plan: Skip plan of the last incremental batch.
+        last_admission_stats: Memory budget usage of the last batch run
+            with a ``memory_budget`` (see :class:`~core.admission.MemoryBudget`).
+        last_triage_counts: Images per triage route in the last batch run
+            with ``triage`` enabled.
+        keyer: Colour keying engine of the ``keying`` backend and of the
+            triage colour-key route.
+        registry: Local model registry of the ``rembg`` backend.
     """
 
-    def __init__(self) -> None:
-        self.is_processing: bool = False
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        mask_cache: Optional[MaskCache] = None,
+        keyer: Optional[ChromaKeyer] = None,
+        registry: Optional[ModelRegistry] = None,
+    ) -> None:
+        self.model_name: str = model_name
+        self.mask_cache: Optional[MaskCache] = mask_cache
+        self.keyer: ChromaKeyer = keyer or ChromaKeyer()
+        self.registry: ModelRegistry = registry or ModelRegistry()
+        self.scheduler = JobScheduler()
         self.last_processing_time: float = 0.0
+        self.last_timing: Optional[TimingRecord] = None
+        self.timing_stats = TimingStats()
+        self.last_batch_stats: Dict[str, StageStats] = {}
+        self.last_batch_timing: Optional[TimingStats] = None
+        self.last_incremental_plan: Optional[IncrementalPlan] = None
+        self.last_admission_stats: Optional[Dict[str, Any]] = None
+        self.last_triage_counts: Optional[Dict[str, int]] = None
         self._lock = threading.Lock()
-        self._cancel_event = threading.Event()
+        self._cancel_events: List[threading.Event] = []
+        self._backends: Dict[str, MaskBackend] = {}
+        self._backend_lock = threading.Lock()
+        self._warm_up_thread: Optional[threading.Thread] = None
+
+    # ==================== BACKENDS ====================
+
+    def get_backend(self, name: str = BACKEND_REMBG) -> MaskBackend:
+        """Return this processor's instance of a mask backend, creating it on first use.
+
+        The built-in ``rembg`` and ``keying`` backends use the processor's
+        :attr:`registry` and :attr:`keyer`; other names are created
+        through :func:`core.backends.create_backend`.
+
+        Raises:
+            ValueError: If no backend is registered under ``name``.
+        """
+        with self._backend_lock:
+            engine = self._backends.get(name)
+            if engine is None:
+                if name == BACKEND_REMBG:
+                    engine = RembgBackend(self.registry)
+                elif name == BACKEND_KEYING:
+                    engine = KeyingBackend(self.keyer)
+                else:
+                    engine = create_backend(name)
+                self._backends[name] = engine
+            return engine
+
+    def _wait_for_warm_up(self) -> None:
+        """Requests arriving during a background warm-up wait for it instead of loading twice."""
+        warm_up = self._warm_up_thread
+        if warm_up is not None and warm_up is not threading.current_thread():
+            warm_up.join()
+
+    def get_session(self, model_name: Optional[str] = None) -> Any:
+        """Return the pooled rembg session for a model, creating it on first use.
+
+        Args:
+            model_name: Model name or speed/quality tier (defaults to
+                ``self.model_name``).
+
+        Returns:
+            A long-lived rembg session.
+        """
+        self._wait_for_warm_up()
+        return self.get_backend(BACKEND_REMBG).get_session(model_name or self.model_name)
+
+    @property
+    def loaded_models(self) -> List[str]:
+        """Return the names of models with a live session."""
+        return self.get_backend(BACKEND_REMBG).loaded_models
+
+    def warm_up(
+        self,
+        model_names: Optional[List[str]] = None,
+        dummy_inference: bool = False,
+        backend: str = BACKEND_REMBG,
+    ) -> bool:
+        """Load a backend's models ahead of the first request.
+
+        Args:
+            model_names: Models to load (defaults to ``[self.model_name]``).
+            dummy_inference: Also run one tiny inference per model, so
+                ONNX Runtime's first-run setup is paid here too.
+            backend: Mask backend to warm up (a no-op for backends
+                without a model).
+
+        Returns:
+            True if every model was loaded.
+        """
+        try:
+            self.get_backend(backend).warm_up(model_names or [self.model_name], dummy_inference)
+            return True
+        except Exception as e:
+            logger.error("Model warm-up failed: %s", e)
+            return False
+
+    def warm_up_async(
+        self,
+        model_names: Optional[List[str]] = None,
+        on_done: Optional[Callable[[bool, float], None]] = None,
+    ) -> threading.Thread:
+        """Warm up in a background thread, including a dummy inference.
+
+        Requests made meanwhile wait for the warm-up to finish instead of
+        loading the model a second time. Calling this again while a
+        warm-up is running returns the running thread.
+
+        Args:
+            model_names: Models to load (defaults to ``[self.model_name]``).
+            on_done: Callback (success, elapsed_seconds), called from the
+                warm-up thread.
+
+        Returns:
+            The warm-up thread.
+        """
+        with self._lock:
+            if self._warm_up_thread is not None and self._warm_up_thread.is_alive():
+                return self._warm_up_thread
+
+            def _worker() -> None:
+                start_time = time.time()
+                ok = self.warm_up(model_names, dummy_inference=True)
+                elapsed = time.time() - start_time
+                logger.info("Background warm-up %s (%.2fs)", "finished" if ok else "failed", elapsed)
+                if on_done:
+                    on_done(ok, elapsed)
+
+            self._warm_up_thread = threading.Thread(target=_worker, daemon=True)
+            self._warm_up_thread.start()
+            return self._warm_up_thread
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until a background warm-up (if any) has finished.
+
+        Returns:
+            False if the warm-up is still running after ``timeout``.
+        """
+        warm_up = self._warm_up_thread
+        if warm_up is None:
+            return True
+        warm_up.join(timeout)
+        return not warm_up.is_alive()
+
+    def close(self) -> None:
+        """Cancel running jobs, stop the scheduler and release all pooled model sessions."""
+        self.scheduler.shutdown()
+        with self._backend_lock:
+            engines = list(self._backends.values())
+        for engine in engines:
+            engine.close()
+
+    # ==================== JOBS ====================
 
     def cancel(self) -> None:
-        """Request cancellation of the current processing job."""
-        self._cancel_event.set()
+        """Request cancellation of every queued and running job.
+
+        Use :meth:`JobHandle.cancel <core.scheduler.JobHandle.cancel>`
+        to cancel a single job.
+        """
+        self.scheduler.cancel_all()
+        with self._lock:
+            for event in self._cancel_events:
+                event.set()
         logger.info("Processing cancellation requested.")
 
     @property
-    def is_cancelled(self) -> bool:
-        """Check whether cancellation has been requested."""
-        return self._cancel_event.is_set()
+    def is_processing(self) -> bool:
+        """Whether any processing call or job is currently running."""
+        with self._lock:
+            return bool(self._cancel_events)
+
+    @contextmanager
+    def _track(self, cancel_event: threading.Event) -> Iterator[threading.Event]:
+        """Register a running call's cancel event so :meth:`cancel` reaches it."""
+        with self._lock:
+            self._cancel_events.append(cancel_event)
+        try:
+            yield cancel_event
+        finally:
+            with self._lock:
+                self._cancel_events.remove(cancel_event)
+
+    # ==================== MASKS ====================
+
+    @staticmethod
+    def _prepare_input(image: Image.Image, max_inference_side: Optional[int]) -> np.ndarray:
+        """Convert an image to the array fed to the model (downscaled if needed)."""
+        convert_mode = "RGBA" if image.mode == "RGBA" else "RGB"
+        inference_size = fit_size(image.size, max_inference_side)
+        if inference_size != image.size:
+            # Resize before converting so no full-size converted copy is made
+            if image.mode not in ("RGB", "RGBA", "L"):
+                image = image.convert(convert_mode)
+            image = image.resize(inference_size, Image.BILINEAR, reducing_gap=2.0)
+        return np.array(image.convert(convert_mode))
+
+    def _predict_mask(
+        self, img_array: np.ndarray, model_name: Optional[str], backend: str = BACKEND_REMBG,
+    ) -> np.ndarray:
+        """Run a backend on a prepared array and return its 8-bit mask."""
+        engine = self.get_backend(backend)
+        self._wait_for_warm_up()
+        return mask_from_output(engine.predict_mask(img_array, model_name or self.model_name))
+
+    def _predict_masks(
+        self, arrays: List[np.ndarray], model_name: Optional[str], backend: str = BACKEND_REMBG,
+    ) -> List[np.ndarray]:
+        """Run a backend on several prepared arrays, batching when it supports it."""
+        engine = self.get_backend(backend)
+        self._wait_for_warm_up()
+        return [mask_from_output(mask) for mask in engine.predict_masks(arrays, model_name or self.model_name)]
+
+    @staticmethod
+    def _mask_image(mask_array: np.ndarray, size: Tuple[int, int]) -> Image.Image:
+        """Wrap a mask array as an 'L' image, upscaled to ``size`` if needed."""
+        mask = Image.fromarray(mask_array, "L")
+        if mask.size != size:
+            mask = mask.resize(size, Image.BILINEAR)
+        return mask
+
+    def _model_identity(self, model_name: Optional[str], backend: str = BACKEND_REMBG) -> str:
+        """Return the model a request resolves to, prefixed by its backend unless rembg."""
+        model = self.registry.resolve(model_name or self.model_name)
+        return model if backend == BACKEND_REMBG else f"{backend}:{model}"
+
+    def _cache_key(
+        self, image: Image.Image, model_name: Optional[str], backend: str = BACKEND_REMBG, **settings: Any,
+    ) -> Optional[str]:
+        """Return the mask cache key for a request, or None without a cache."""
+        if self.mask_cache is None:
+            return None
+        return MaskCache.make_key(image, self._model_identity(model_name, backend), **settings)
+
+    @staticmethod
+    def _use_tiles(image: Image.Image, tile_size: Optional[int]) -> bool:
+        """Whether an image is large enough for tiled inference."""
+        return bool(tile_size) and max(image.size) > tile_size
+
+    def _compute_mask_tiled(
+        self,
+        image: Image.Image,
+        model_name: Optional[str],
+        tile_size: int,
+        tile_overlap: int = DEFAULT_TILE_OVERLAP,
+        workers: Optional[int] = None,
+        backend: str = BACKEND_REMBG,
+    ) -> Image.Image:
+        """Compute a mask tile by tile, feathering the tiles together.
+
+        A low-res pass over the whole image first finds the subject;
+        each tile's mask is then limited to the (slightly dilated)
+        global mask and filled where the global mask is confident, so
+        tiles that see only background or only subject stay consistent
+        with the whole picture. Tiles are inferred in parallel and
+        blended in raster order, so inference buffers scale with the
+        tile size rather than the image size.
+        """
+        image.load()  # Crops are taken from several threads
+        convert_mode = "RGBA" if image.mode == "RGBA" else "RGB"
+        tiles = compute_tiles(image.width, image.height, tile_size, tile_overlap)
+
+        # Global low-res pass, kept at low resolution
+        global_mask = Image.fromarray(
+            self._predict_mask(self._prepare_input(image, DEFAULT_GLOBAL_SIDE), model_name, backend), "L",
+        )
+        global_gate = global_mask.filter(ImageFilter.MaxFilter(5))
+        scale_x = global_mask.width / image.width
+        scale_y = global_mask.height / image.height
+
+        def predict_tile(tile: Tile) -> np.ndarray:
+            box = tile[0]
+            size = (box[2] - box[0], box[3] - box[1])
+            tile_mask = self._predict_mask(np.array(image.crop(box).convert(convert_mode)), model_name, backend)
+            if tile_mask.shape != (size[1], size[0]):
+                tile_mask = np.asarray(Image.fromarray(tile_mask, "L").resize(size, Image.BILINEAR))
+
+            low_res_box = (box[0] * scale_x, box[1] * scale_y, box[2] * scale_x, box[3] * scale_y)
+            gate = np.asarray(global_gate.resize(size, Image.BILINEAR, box=low_res_box))
+            confident = np.asarray(global_mask.resize(size, Image.BILINEAR, box=low_res_box))
+            confident = np.where(confident >= 242, confident, 0).astype(np.uint8)
+            return np.maximum(np.minimum(tile_mask, gate), confident)
+
+        workers = workers or max(1, min(len(tiles), os.cpu_count() or 1, 4))
+        out = np.zeros((image.height, image.width), dtype=np.uint8)
+        window: deque = deque()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Blend in raster order while keeping a bounded number of tiles in flight
+            for tile in tiles:
+                window.append((tile, pool.submit(predict_tile, tile)))
+                if len(window) >= workers * 2:
+                    done_tile, future = window.popleft()
+                    blend_tile(out, future.result(), done_tile)
+            while window:
+                done_tile, future = window.popleft()
+                blend_tile(out, future.result(), done_tile)
+
+        logger.info("Tiled mask computed: %d tiles of %dpx on %d threads", len(tiles), tile_size, workers)
+        return Image.fromarray(out, "L")
+
+    def compute_mask(
+        self,
+        image: Image.Image,
+        model_name: Optional[str] = None,
+        max_inference_side: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        tile_overlap: int = DEFAULT_TILE_OVERLAP,
+        backend: str = BACKEND_REMBG,
+    ) -> Image.Image:
+        """Compute the foreground mask of an image.
+
+        The mask can be kept and re-applied with :meth:`apply_mask`
+        (e.g. with a different background) without running the model
+        again. Unlike :meth:`remove_background` this method does not
+        report progress and raises on failure. The mask cache (if any)
+        is consulted first.
+
+        Args:
+            image: Input image.
+            model_name: Model or speed/quality tier (``"fast"``,
+                ``"balanced"``, ``"best"``) to use (defaults to
+                ``self.model_name``).
+            max_inference_side: Longest side of the image fed to the model
+                (None = full resolution). Ignored in tiled mode.
+            tile_size: Enables tiled inference for images whose longest
+                side exceeds this many pixels (None = never tile).
+            tile_overlap: Overlap between neighbouring tiles (pixels).
+            backend: Mask backend (see :mod:`core.backends`): ``"rembg"``
+                for the segmentation model, ``"keying"`` to key out a
+                solid or chroma-key background with :attr:`keyer` (full
+                resolution, no model, no cache), or any registered name.
+
+        Returns:
+            Mask image (mode 'L', same size as ``image``; 255 = foreground).
+
+        Raises:
+            ValueError: If ``backend`` is unknown.
+        """
+        return self.compute_masks([image], model_name, max_inference_side, tile_size, tile_overlap, backend)[0]
+
+    def compute_masks(
+        self,
+        images: List[Image.Image],
+        model_name: Optional[str] = None,
+        max_inference_side: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        tile_overlap: int = DEFAULT_TILE_OVERLAP,
+        backend: str = BACKEND_REMBG,
+    ) -> List[Image.Image]:
+        """Compute the masks of several images with as few model calls as possible.
+
+        Cached and tiled images are handled one by one; the remaining
+        inputs go through the backend together, in a single batched call
+        when it supports it (for rembg: a session with a
+        ``predict_batch`` method, or an ONNX graph with a dynamic batch
+        axis), and one call per image otherwise.
+
+        Args:
+            images: Input images.
+            model_name: See :meth:`compute_mask`.
+            max_inference_side: See :meth:`compute_mask`.
+            tile_size: See :meth:`compute_mask`.
+            tile_overlap: See :meth:`compute_mask`.
+            backend: See :meth:`compute_mask`.
+
+        Returns:
+            One mask per image, in input order.
+
+        Raises:
+            ValueError: If ``backend`` is unknown.
+        """
+        engine = self.get_backend(backend)
+        if engine.full_resolution:
+            # Full-resolution backends (keying) cost less than hashing the pixels for a cache lookup
+            arrays = [self._prepare_input(image, None) for image in images]
+            return [
+                self._mask_image(mask_array, image.size)
+                for image, mask_array in zip(images, self._predict_masks(arrays, model_name, backend))
+            ]
+
+        masks: List[Optional[Image.Image]] = [None] * len(images)
+        keys = [
+            self._cache_key(image, model_name, backend, max_inference_side=max_inference_side, tile_size=tile_size)
+            for image in images
+        ]
+        pending: List[int] = []
+        for index, (image, key) in enumerate(zip(images, keys)):
+            cached = self.mask_cache.get(key) if key is not None else None
+            if cached is not None:
+                masks[index] = cached
+            elif self._use_tiles(image, tile_size):
+                masks[index] = self._compute_mask_tiled(
+                    image, model_name, tile_size, tile_overlap, backend=backend,
+                )
+                if key is not None:
+                    self.mask_cache.put(key, masks[index])
+            else:
+                pending.append(index)
+
+        if pending:
+            arrays = [self._prepare_input(images[i], max_inference_side) for i in pending]
+            for index, mask_array in zip(pending, self._predict_masks(arrays, model_name, backend)):
+                masks[index] = self._mask_image(mask_array, images[index].size)
+                if keys[index] is not None:
+                    self.mask_cache.put(keys[index], masks[index])
+        return masks
+
+    def triage_mask(self, image: Image.Image) -> Tuple[str, Optional[Image.Image]]:
+        """Triage an image and build its mask when the model is not needed.
+
+        See :func:`~core.triage.triage`: images with a real alpha
+        channel keep it, flat-background images are colour keyed and
+        the rest need the model. The colour key uses :attr:`keyer`'s
+        ramp with the detected border colour.
+
+        Returns:
+            ``(route, mask)`` — ``mask`` is None for the model route.
+        """
+        decision = triage(image)
+        if decision.route == ROUTE_PASSTHROUGH:
+            # apply_mask keeps existing transparency, so an opaque mask passes it through
+            return decision.route, Image.new("L", image.size, 255)
+        if decision.route == ROUTE_COLOR_KEY:
+            return decision.route, self.keyer.compute_mask(image, decision.background)
+        return decision.route, None
+
+    def suppress_spill(self, image: Image.Image, mask: Image.Image, route: Optional[str] = None) -> Image.Image:
+        """Remove the key colour cast from a keyed image before compositing.
+
+        See :meth:`~core.keying.ChromaKeyer.suppress_spill`. Images of the
+        triage colour-key route (``route``) use their detected border
+        colour; others use :attr:`keyer`'s key colour.
+        """
+        background = detect_background(image) if route == ROUTE_COLOR_KEY else None
+        return self.keyer.suppress_spill(image, mask, background)
+
+    def finish(
+        self, image: Image.Image, mask: Image.Image, backend: str = BACKEND_REMBG, route: Optional[str] = None,
+    ) -> Image.Image:
+        """Prepare a source image for compositing with the mask of its route.
+
+        Colour-keyed triage images get spill suppression with their
+        border colour, pass-through images stay as they are, and the
+        rest go through the backend's :meth:`~core.backends.MaskBackend.finish`.
+        """
+        if route == ROUTE_COLOR_KEY:
+            return self.suppress_spill(image, mask, route)
+        if route == ROUTE_PASSTHROUGH:
+            return image
+        return self.get_backend(backend).finish(image, mask)
+
+    @staticmethod
+    def apply_mask(
+        image: Image.Image,
+        mask: Image.Image,
+        background: Optional[Union[Tuple[int, int, int], Image.Image]] = None,
+    ) -> Image.Image:
+        """Composite an image with a foreground mask.
+
+        Existing transparency in ``image`` is kept (multiplied with the
+        mask). The mask is resized to the image if the sizes differ.
+
+        Args:
+            image: Source image.
+            mask: Foreground mask (mode 'L'; 255 = foreground).
+            background: None for a transparent RGBA result, or an RGB
+                color / image to flatten the foreground onto.
+
+        Returns:
+            RGBA image (no background) or RGB image (with background).
+        """
+        if mask.size != image.size:
+            mask = mask.resize(image.size, Image.BILINEAR)
+
+        rgba = np.array(image.convert("RGBA"))
+        alpha = np.asarray(mask.convert("L"), dtype=np.uint16)
+        if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+            alpha = (rgba[..., 3].astype(np.uint16) * alpha + 127) // 255
+
+        if background is None:
+            rgba[..., 3] = alpha
+            return Image.fromarray(rgba, "RGBA")
+
+        # Flatten: out = fg * a + bg * (1 - a), in 16-bit integer math
+        if isinstance(background, Image.Image):
+            if background.size != image.size:
+                background = background.resize(image.size, Image.BILINEAR)
+            bg = np.asarray(background.convert("RGB"), dtype=np.uint16)
+        else:
+            bg = np.array(background[:3], dtype=np.uint16)
+        a = alpha[..., np.newaxis]
+        out = (rgba[..., :3].astype(np.uint16) * a + bg * (255 - a) + 127) // 255
+        return Image.fromarray(out.astype(np.uint8), "RGB")
+
+    # ==================== PROCESSING ====================
 
     def remove_background(
         self,
         image: Image.Image,
         on_progress: Optional[Callable[[float], None]] = None,
+        model_name: Optional[str] = None,
+        max_inference_side: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        tile_overlap: int = DEFAULT_TILE_OVERLAP,
+        cancel_event: Optional[threading.Event] = None,
+        backend: str = BACKEND_REMBG,
+        timing: Optional[TimingRecord] = None,
     ) -> Optional[Image.Image]:
         """Remove the background from an image.
 
+        Equivalent to :meth:`compute_mask` followed by :meth:`apply_mask`,
+        with progress reporting and cancellation. Several calls may run
+        at once; each one is cancelled through its own ``cancel_event``
+        (or all of them by :meth:`cancel`).
+
+        When ``max_inference_side`` is set and the image is larger, the
+        model only sees a downscaled copy and the mask is upscaled and
+        applied to the full-resolution pixels. U2-Net segments at 320×320
+        internally, so this skips the full-size array conversion without
+        losing mask quality.
+
+        With ``backend="keying"`` the background colour is keyed out by
+        :attr:`keyer` instead (see :mod:`core.keying`) and its colour
+        cast is suppressed before compositing.
+
+        The time and pixels of each stage — ``cache`` (key and lookup),
+        ``convert`` (mode conversion, downscale and array copy),
+        ``infer`` (the backend), ``mask`` (mask image and upscale) and
+        ``composite`` — are recorded in ``timing``, stored in
+        :attr:`last_timing` and added to :attr:`timing_stats`.
+
         Args:
             image: Input image (PIL Image).
             on_progress: Progress callback (0.0 - 1.0).
+            model_name: Model or speed/quality tier to use (defaults to
+                ``self.model_name``).
+            max_inference_side: Longest side of the image fed to the model
+                (None = full resolution).
+            tile_size: Enables tiled inference for larger images
+                (see :meth:`compute_mask`).
+            tile_overlap: Overlap between neighbouring tiles (pixels).
+            cancel_event: Event that cancels this call when set.
+            backend: Mask backend (see :meth:`compute_mask`).
+            timing: Record that receives this call's stage timings
+                (a new one is used if None).
 
         Returns:
             Image with background removed, or None on error/cancel.
         """
-        with self._lock:
-            if self.is_processing:
-                logger.warning("Already processing an image.")
-                return None
-            self.is_processing = True
-            self._cancel_event.clear()
+        with self._track(cancel_event or threading.Event()) as cancel_event:
+            start_time = time.time()
 
-        start_time = time.time()
+            try:
+                if on_progress:
+                    on_progress(0.1)
 
-        try:
-            if on_progress:
-                on_progress(0.1)
+                logger.info(
+                    "Background removal started: %dx%d, mode=%s",
+                    image.width, image.height, image.mode,
+                )
 
-            logger.info(
-                "Background removal started: %dx%d, mode=%s",
-                image.width, image.height, image.mode,
-            )
+                # Check for cancellation
+                if cancel_event.is_set():
+                    logger.info("Processing cancelled (before conversion).")
+                    return None
 
-            # Check for cancellation
-            if self._cancel_event.is_set():
-                logger.info("Processing cancelled (before conversion).")
-                return None
+                engine = self.get_backend(backend)
+                timing = timing if timing is not None else TimingRecord()
+                pixels = image.width * image.height
+                key = mask = None
+                if not engine.full_resolution and self.mask_cache is not None:
+                    with timing.stage("cache", pixels):
+                        key = self._cache_key(
+                            image, model_name, backend, max_inference_side=max_inference_side, tile_size=tile_size,
+                        )
+                        mask = self.mask_cache.get(key)
 
-            # Convert to RGBA or RGB
-            convert_mode = "RGBA" if image.mode == "RGBA" else "RGB"
-            img_array = np.array(image.convert(convert_mode))
+                if mask is None and not engine.full_resolution and self._use_tiles(image, tile_size):
+                    with timing.stage("infer", pixels):
+                        mask = self._compute_mask_tiled(image, model_name, tile_size, tile_overlap, backend=backend)
+                elif mask is None:
+                    # Convert (and downscale once unless the backend needs full resolution)
+                    with timing.stage("convert", pixels):
+                        img_array = self._prepare_input(
+                            image, None if engine.full_resolution else max_inference_side,
+                        )
 
-            if on_progress:
-                on_progress(0.2)
+                    if on_progress:
+                        on_progress(0.2)
 
-            # Check for cancellation
-            if self._cancel_event.is_set():
-                logger.info("Processing cancelled (after conversion).")
-                return None
+                    # Check for cancellation
+                    if cancel_event.is_set():
+                        logger.info("Processing cancelled (after conversion).")
+                        return None
 
-            # Remove background via rembg (lazy import)
-            remove_fn = _get_rembg_remove()
-            result_array = remove_fn(img_array)
+                    # Predict the mask with the backend (rembg is imported lazily)
+                    with timing.stage("infer", img_array.shape[0] * img_array.shape[1]):
+                        mask_array = self._predict_mask(img_array, model_name, backend)
+                    with timing.stage("mask", pixels):
+                        mask = self._mask_image(mask_array, image.size)
+                else:
+                    logger.info("Mask cache hit — inference skipped.")
+                    key = None
+                if key is not None:
+                    with timing.stage("cache"):
+                        self.mask_cache.put(key, mask)
 
-            if on_progress:
-                on_progress(0.7)
+                if on_progress:
+                    on_progress(0.7)
+
+                # Check for cancellation
+                if cancel_event.is_set():
+                    logger.info("Processing cancelled (after removal).")
+                    return None
+
+                with timing.stage("composite", pixels):
+                    result_image = self.apply_mask(engine.finish(image, mask), mask)
+
+                if on_progress:
+                    on_progress(0.9)
+
+                elapsed = time.time() - start_time
+                self.last_processing_time = elapsed
+                self.last_timing = timing
+                self.timing_stats.add(timing)
 
-            # Check for cancellation
-            if self._cancel_event.is_set():
-                logger.info("Processing cancelled (after removal).")
+                logger.info(
+                    "Background removal complete: %dx%d, mode=%s, time=%.2fs",
+                    result_image.width, result_image.height, result_image.mode, elapsed,
+                )
+
+                if on_progress:
+                    on_progress(1.0)
+
+                return result_image
+
+            except Exception as e:
+                logger.error("Background removal error: %s", e)
                 return None
 
-            result_image = Image.fromarray(result_array)
+    def remove_background_animated(
+        self,
+        image: Image.Image,
+        on_progress: Optional[Callable[[float], None]] = None,
+        model_name: Optional[str] = None,
+        max_inference_side: Optional[int] = None,
+        reuse_threshold: float = DEFAULT_REUSE_THRESHOLD,
+        workers: Optional[int] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Optional[AnimatedCutout]:
+        """Remove the background from every frame of an animated image.
 
-            if on_progress:
-                on_progress(0.9)
+        Frames that barely differ from the current keyframe (compared on
+        small grayscale thumbnails, see
+        :func:`~core.animation.plan_keyframes`) reuse the keyframe's mask;
+        only keyframes run through the model, in parallel. Still images
+        are handled as a one-frame animation.
 
-            elapsed = time.time() - start_time
-            self.last_processing_time = elapsed
+        Args:
+            image: Animated GIF/APNG/WebP (or any image).
+            on_progress: Progress callback (0.0 - 1.0).
+            model_name: rembg model to use (defaults to ``self.model_name``).
+            max_inference_side: See :meth:`remove_background`.
+            reuse_threshold: Mean absolute thumbnail difference (0-255)
+                under which a frame reuses its keyframe's mask
+                (0 = infer every frame).
+            workers: Threads running keyframe inference.
+            cancel_event: Event that cancels this call when set.
+
+        Returns:
+            The cut-out animation (save it with
+            :meth:`AnimatedCutout.save <core.animation.AnimatedCutout.save>`),
+            or None on error/cancel.
+        """
+        with self._track(cancel_event or threading.Event()) as cancel_event:
+            start_time = time.time()
+            try:
+                frames, durations = read_frames(image)
+                sources = plan_keyframes([frame_signature(frame) for frame in frames], reuse_threshold)
+                keyframes = sorted(set(sources))
+                logger.info(
+                    "Animation started: %d frames, %d keyframes", len(frames), len(keyframes),
+                )
+
+                masks: Dict[int, Image.Image] = {}
+                workers = workers or max(1, min(len(keyframes), os.cpu_count() or 1, 4))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {
+                        pool.submit(self.compute_mask, frames[index], model_name, max_inference_side): index
+                        for index in keyframes
+                    }
+                    for future in as_completed(futures):
+                        if cancel_event.is_set():
+                            for pending in futures:
+                                pending.cancel()
+                            logger.info("Animation processing cancelled.")
+                            return None
+                        masks[futures[future]] = future.result()
+                        if on_progress:
+                            on_progress(0.9 * len(masks) / len(keyframes))
 
+                cutouts = [self.apply_mask(frame, masks[source]) for frame, source in zip(frames, sources)]
+                result = AnimatedCutout(
+                    cutouts, durations, image.info.get("loop", 0),
+                    inferred_frames=len(keyframes), reused_frames=len(frames) - len(keyframes),
+                )
+            except Exception as e:
+                logger.error("Animation processing error: %s", e)
+                return None
+
+            self.last_processing_time = time.time() - start_time
             logger.info(
-                "Background removal complete: %dx%d, mode=%s, time=%.2fs",
-                result_image.width, result_image.height, result_image.mode, elapsed,
+                "Animation complete: %d frames, %d inferred, time=%.2fs",
+                len(frames), len(keyframes), self.last_processing_time,
             )
-
             if on_progress:
                 on_progress(1.0)
-
-            return result_image
-
-        except Exception as e:
-            logger.error("Background removal error: %s", e)
-            return None
-        finally:
-            with self._lock:
-                self.is_processing = False
+            return result
 
     def remove_background_async(
         self,
@@ -145,32 +1006,90 @@ class ImageProcessor:
         on_complete: Callable[[Optional[Image.Image]], None],
         on_progress: Optional[Callable[[float], None]] = None,
         on_error: Optional[Callable[[str], None]] = None,
-    ) -> threading.Thread:
-        """Remove the background asynchronously in a separate thread.
+        model_name: Optional[str] = None,
+        timing: Optional[TimingRecord] = None,
+    ) -> JobHandle:
+        """Remove the background asynchronously as an interactive job.
+
+        Interactive jobs run ahead of queued batches and never wait for a
+        running batch to finish.
 
         Args:
             image: Input image.
             on_complete: Callback when finished.
             on_progress: Progress callback.
             on_error: Error callback.
+            model_name: rembg model to use (defaults to ``self.model_name``).
+            timing: Record that receives the stage timings (see
+                :meth:`remove_background`).
 
         Returns:
-            The started Thread object.
+            The job's handle (cancel it to cancel this removal only).
         """
-        def _worker() -> None:
-            result = self.remove_background(image, on_progress)
-            if self._cancel_event.is_set():
+        def _job(handle: JobHandle) -> Optional[Image.Image]:
+            result = self.remove_background(
+                image, on_progress, model_name, cancel_event=handle.cancel_event, timing=timing,
+            )
+            if handle.is_cancelled:
                 if on_error:
                     on_error("Processing was cancelled.")
-                return
+                return None
             if result is not None:
                 on_complete(result)
             elif on_error:
                 on_error("Background removal failed.")
+            return result
+
+        def _on_done(future) -> None:
+            # Jobs cancelled while still queued never run _job
+            if future.cancelled():
+                on_error("Processing was cancelled.")
+
+        handle = self.scheduler.submit(_job, PRIORITY_INTERACTIVE, "remove-background")
+        if on_error:
+            handle.future.add_done_callback(_on_done)
+        return handle
+
+    def batch_settings(
+        self,
+        model_name: Optional[str] = None,
+        max_inference_side: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        backend: str = BACKEND_REMBG,
+        use_triage: bool = False,
+        **output: Any,
+    ) -> Dict[str, Any]:
+        """Return the settings that decide a batch's outputs, for :func:`~core.manifest.settings_key`.
 
-        thread = threading.Thread(target=_worker, daemon=True)
-        thread.start()
-        return thread
+        Used by incremental batches here and in the CLI, so both key
+        their manifests the same way.
+
+        Args:
+            model_name: rembg model or tier (defaults to ``self.model_name``).
+            max_inference_side: See :meth:`remove_background`.
+            tile_size: See :meth:`compute_mask`.
+            backend: Mask backend.
+            use_triage: Whether triage routes images around the model.
+            **output: Output options of the caller (format, quality, ...).
+
+        Returns:
+            The settings dictionary.
+        """
+        options: Dict[str, Any] = {
+            "model": self.registry.resolve(model_name or self.model_name),
+            **output,
+            "max_inference_side": max_inference_side,
+            "tile_size": tile_size,
+        }
+        if backend != BACKEND_REMBG:
+            # Only non-default backends enter the key, so existing manifests stay valid
+            options["backend"] = backend
+        if use_triage:
+            # Triage keys flat backgrounds with the keyer, so it enters the key as well
+            options["triage"] = True
+        if backend == BACKEND_KEYING or use_triage:
+            options["keyer"] = repr(self.keyer)
+        return options
 
     def batch_process(
         self,
@@ -179,8 +1098,54 @@ class ImageProcessor:
         on_progress: Optional[Callable[[int, int, str], None]] = None,
         on_complete: Optional[Callable[[int, int], None]] = None,
         on_error: Optional[Callable[[str, str], None]] = None,
-    ) -> threading.Thread:
-        """Process multiple images sequentially.
+        model_name: Optional[str] = None,
+        use_processes: bool = False,
+        workers: Optional[int] = None,
+        intra_op_threads: int = DEFAULT_INTRA_OP_THREADS,
+        decode_workers: int = 1,
+        encode_workers: int = 2,
+        queue_depth: int = DEFAULT_QUEUE_DEPTH,
+        max_inference_side: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        inference_batch_size: int = DEFAULT_INFERENCE_BATCH_SIZE,
+        incremental: bool = False,
+        content_hash: bool = False,
+        dry_run: bool = False,
+        task_timeout: Optional[float] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        memory_limit_mb: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+        use_triage: bool = False,
+        backend: str = BACKEND_REMBG,
+        on_result: Optional[Callable[[BatchResult], None]] = None,
+    ) -> JobHandle:
+        """Process multiple images as a background (batch priority) job.
+
+        By default images go through a decode → infer → encode pipeline
+        (see :class:`~core.batch_pipeline.BatchPipeline`): file reads,
+        mask compositing and PNG encoding run on their own threads while
+        inference uses this processor's model session. Per-stage
+        utilization of the run is stored in :attr:`last_batch_stats`.
+        :meth:`iter_process` is the streaming form of the same pipeline.
+
+        With ``use_processes=True`` the files are instead spread over a
+        pool of isolated worker processes, each holding its own warm
+        session. A file that exceeds ``task_timeout``, crashes its
+        worker or runs it out of memory fails alone — ``on_error``
+        receives the reason (``"timeout: ..."``, ``"crash: ..."``,
+        ``"oom: ..."``) — and the worker is replaced. Setting
+        ``task_timeout``, ``max_tasks_per_worker`` or ``memory_limit_mb``
+        implies ``use_processes``.
+        Callbacks are always invoked from the scheduler thread running
+        the job; ``on_complete`` is not called if the job is cancelled
+        before it starts.
+
+        With ``incremental=True`` a :class:`~core.manifest.BuildManifest`
+        in ``output_dir`` records what every output was built from, and
+        inputs whose output is up to date for the same model and
+        settings are skipped. The skip counts and the recorded time they
+        save are stored in :attr:`last_incremental_plan`; ``total`` in
+        the callbacks counts only the inputs that are processed.
 
         Args:
             file_paths: List of input file paths.
@@ -188,50 +1153,505 @@ class ImageProcessor:
             on_progress: Progress callback (current, total, filename).
             on_complete: Completion callback (success_count, total).
             on_error: Error callback (filename, error_message).
+            model_name: rembg model to use (defaults to ``self.model_name``).
+            use_processes: Whether to use the multi-process worker pool.
+            workers: Number of worker processes
+                (defaults to :func:`default_worker_count`).
+            intra_op_threads: ONNX Runtime threads per worker process.
+            decode_workers: Pipeline threads reading and decoding files.
+            encode_workers: Pipeline threads encoding and writing results.
+            queue_depth: Capacity of each queue between pipeline stages.
+            max_inference_side: Longest side of the images fed to the model
+                (see :meth:`remove_background`).
+            tile_size: Tile edge for tiled inference of large images
+                (see :meth:`compute_mask`).
+            inference_batch_size: Images per model call in the pipeline
+                (see :meth:`iter_process`; ignored with ``use_processes``).
+            incremental: Skip inputs whose output is up to date.
+            content_hash: In incremental mode, also compare input content
+                hashes so touched-but-unchanged inputs are skipped.
+            dry_run: Only compute :attr:`last_incremental_plan`; nothing
+                is processed or written and ``on_complete`` is not called.
+            task_timeout: Seconds a worker may spend on one file before it
+                is killed and replaced.
+            max_tasks_per_worker: Files after which a worker process is
+                replaced by a fresh one, bounding memory growth.
+            memory_limit_mb: Address-space limit per worker process
+                (POSIX only); larger allocations fail the file with 'oom'.
+            memory_budget: Bytes the images in flight may take together
+                (see :meth:`iter_process`); applies to both modes.
+            use_triage: Route already-transparent and flat-background
+                images around the model (see :meth:`iter_process`);
+                applies to both modes.
+            backend: Mask backend (see :meth:`compute_mask`); applies to
+                both modes.
+            on_result: Called with the :class:`BatchResult` of every
+                file, from the job's thread; applies to both modes.
 
         Returns:
-            The started Thread object.
+            The job's handle; its result is the number of successfully
+            processed files.
+
+        Raises:
+            ValueError: If ``backend`` is unknown.
         """
-        def _batch_worker() -> None:
-            total = len(file_paths)
-            success_count = 0
+        self.get_backend(backend)
+        isolated = use_processes or any(
+            option is not None for option in (task_timeout, max_tasks_per_worker, memory_limit_mb)
+        )
 
-            for i, file_path in enumerate(file_paths):
-                # Check for cancellation
-                if self._cancel_event.is_set():
-                    logger.info("Batch processing cancelled: %d/%d", i, total)
-                    break
+        def _batch_job(handle: JobHandle) -> int:
+            paths = file_paths
+            manifest = None
+            if incremental or dry_run:
+                manifest = BuildManifest.for_directory(output_dir, content_hash)
+                settings = settings_key(
+                    self.batch_settings(model_name, max_inference_side, tile_size, backend, use_triage, format="png"),
+                )
+                plan = manifest.plan(
+                    ((path, _batch_output_path(path, output_dir)) for path in file_paths), settings,
+                )
+                self.last_incremental_plan = plan
+                paths = plan.todo
+                if dry_run:
+                    return 0
 
-                filename = os.path.basename(file_path)
-                try:
-                    img = Image.open(file_path)
-                    result = self.remove_background(img)
+            def _on_result(result: BatchResult) -> None:
+                if manifest is not None and result.ok:
+                    manifest.record(result.input_path, result.output_path, settings, sum(result.timings.values()))
+                if on_result:
+                    on_result(result)
+
+            try:
+                with self._track(handle.cancel_event):
+                    if isolated:
+                        success_count = self._run_process_pool(
+                            paths, output_dir, on_progress, on_error, model_name,
+                            workers or default_worker_count(intra_op_threads), intra_op_threads,
+                            max_inference_side, tile_size, handle.cancel_event, _on_result,
+                            task_timeout, max_tasks_per_worker, memory_limit_mb, memory_budget, use_triage,
+                            backend,
+                        )
+                    else:
+                        success_count = self._run_pipeline(
+                            paths, output_dir, on_progress, on_error, model_name,
+                            decode_workers, encode_workers, queue_depth, max_inference_side, tile_size,
+                            inference_batch_size, handle.cancel_event, _on_result, memory_budget, use_triage,
+                            backend,
+                        )
+            finally:
+                if manifest is not None:
+                    manifest.save()
+
+            if on_complete:
+                on_complete(success_count, len(paths))
+            return success_count
+
+        return self.scheduler.submit(_batch_job, PRIORITY_BATCH, f"batch ({len(file_paths)} files)")
+
+    def iter_process(
+        self,
+        inputs: Iterable[Any],
+        output_dir: str,
+        model_name: Optional[str] = None,
+        max_inference_side: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        ordered: bool = False,
+        read_ahead: int = DEFAULT_QUEUE_DEPTH,
+        decode_workers: int = 1,
+        encode_workers: int = 2,
+        cancel_event: Optional[threading.Event] = None,
+        inference_batch_size: int = DEFAULT_INFERENCE_BATCH_SIZE,
+        writer: Optional[Callable[[Image.Image, Any], str]] = None,
+        memory_budget: Optional[int] = None,
+        use_triage: bool = False,
+        backend: str = BACKEND_REMBG,
+        path_of: Optional[Callable[[Any], str]] = None,
+    ) -> Iterator[BatchResult]:
+        """Process a stream of images lazily, yielding results as they finish.
+
+        Input paths are pulled from ``inputs`` only as the pipeline has
+        room for them, so a generator over millions of paths (a manifest,
+        a directory walk) is processed with flat memory. Work runs on the
+        same decode → infer → encode pipeline as :meth:`batch_process`.
+
+        Calling :meth:`cancel` stops pulling new inputs; results of work
+        already finished are still yielded. Closing the iterator early
+        stops the pipeline as well.
+
+        Args:
+            inputs: Iterable of input file paths (or of arbitrary objects,
+                see ``path_of``).
+            output_dir: Output directory.
+            model_name: rembg model to use (defaults to ``self.model_name``).
+            max_inference_side: Longest side of the images fed to the model
+                (see :meth:`remove_background`).
+            tile_size: Tile edge for tiled inference of large images
+                (see :meth:`compute_mask`).
+            ordered: Yield results in input order instead of as completed.
+            read_ahead: Capacity of each pipeline queue (bounds how many
+                inputs are in flight).
+            decode_workers: Threads reading and decoding files.
+            encode_workers: Threads compositing, encoding and writing results.
+            cancel_event: Event that stops the stream when set (it is
+                also set by :meth:`cancel`).
+            inference_batch_size: Maximum images per model call. Decoded
+                images already waiting for inference are grouped (see
+                :meth:`compute_masks`); the latency and throughput per
+                batch size are reported in ``last_batch_stats["infer"]``.
+            writer: Saves a cut-out in the encode stage; called with the
+                image and its input (the path, or the object given to
+                ``path_of``), returns the written path and raises on
+                failure. Defaults to ``<name>_nobg.png`` in ``output_dir``.
+            memory_budget: Bytes the images in flight may take together.
+                Each input's decoded and inference memory is estimated
+                from its header (:func:`~core.admission.estimate_memory`)
+                and it enters the pipeline only while the total fits;
+                peak usage and admission waits are stored in
+                :attr:`last_admission_stats`. None = no limit.
+            use_triage: Triage each decoded image (see :meth:`triage_mask`)
+                so already-transparent and flat-background images skip
+                the model; each result's ``route`` tells which way it
+                went and the totals are stored in :attr:`last_triage_counts`.
+            backend: Mask backend (see :meth:`compute_mask`). Images for
+                full-resolution backends such as ``"keying"`` are decoded
+                at full resolution, and the backend's
+                :meth:`~core.backends.MaskBackend.finish` (colour cast
+                suppression for keying) runs in the encode stage.
+            path_of: Returns the file path of an input. The input object
+                itself (a queued job, say) travels through the pipeline
+                to ``writer`` and comes back as the result's ``source``,
+                so inputs sharing a path stay apart.
+
+        Yields:
+            A :class:`BatchResult` per input.
+
+        Raises:
+            ValueError: If ``backend`` is unknown.
+        """
+        # Full-resolution backends (keying) need every pixel: no reduced decode
+        inference_side = None if self.get_backend(backend).full_resolution else max_inference_side
+        cancel_event = cancel_event or threading.Event()
+        stop = threading.Event()
+        results: "queue.Queue" = queue.Queue(maxsize=max(1, read_ahead))
+        budget = MemoryBudget(memory_budget) if memory_budget else None
+        self.last_admission_stats = None
+        counts = route_counts()
+        self.last_triage_counts = None
+        batch_timing = self.last_batch_timing = TimingStats()
+
+        def admitted(sources: Iterable[Any]) -> Iterator[_BatchItem]:
+            # Runs on the pipeline's feeder thread, so waiting here holds back new inputs only
+            for index, source in enumerate(sources):
+                path = path_of(source) if path_of is not None else source
+                item = _BatchItem(index, path, source)
+                if budget is not None:
+                    item.reserved = estimate_memory(path, inference_side, tile_size)
+                    if not budget.acquire(item.reserved, stop):
+                        return
+                yield item
+
+        def decode(item: _BatchItem) -> _BatchItem:
+            # Low-res inference decodes JPEGs at reduced scale; the full
+            # resolution is decoded in the encode stage, for the composite
+            started = time.perf_counter()
+            item.image, item.reduced = open_for_inference(
+                item.input_path, None if tile_size else inference_side,
+            )
+            pixels = item.image.width * item.image.height
+            item.timing.add("decode", time.perf_counter() - started, pixels)
+            if use_triage:
+                # Runs on the decode threads, keeping the inference thread for the model
+                with item.timing.stage("triage", pixels):
+                    item.route, item.mask = self.triage_mask(item.image)
+            return item
+
+        def infer(item: _BatchItem) -> _BatchItem:
+            if item.mask is not None:
+                item.timing.add("infer", 0.0)
+                return item
+            with item.timing.stage("infer", item.image.width * item.image.height):
+                item.mask = self.compute_mask(item.image, model_name, max_inference_side, tile_size, backend=backend)
+            return item
+
+        def infer_batch(items: List[_BatchItem]) -> List[_BatchItem]:
+            # Timings are recorded only once the batch succeeded: a failed
+            # batch is retried through infer(), which records its own
+            pending = [item for item in items if item.mask is None]
+            skipped = [item for item in items if item.mask is not None]
+            if pending:
+                started = time.perf_counter()
+                masks = self.compute_masks(
+                    [item.image for item in pending], model_name, max_inference_side, tile_size, backend=backend,
+                )
+                # The batch's time is shared evenly by its images
+                elapsed = (time.perf_counter() - started) / len(pending)
+                for item, mask in zip(pending, masks):
+                    item.mask = mask
+                    item.timing.add("infer", elapsed, item.image.width * item.image.height)
+            for item in skipped:
+                item.timing.add("infer", 0.0)
+            return items
+
+        def encode(item: _BatchItem) -> _BatchItem:
+            # Compositing runs here, off the inference thread
+            started = time.perf_counter()
+            if item.reduced:
+                item.image = load_full(item.input_path)
+            item.image = self.finish(item.image, item.mask, backend, item.route)
+            result = self.apply_mask(item.image, item.mask)
+            if writer is not None:
+                out_path = writer(result, item.source)
+            else:
+                out_path = _batch_output_path(item.input_path, output_dir)
+                result.save(out_path, "PNG", optimize=True)
+            item.output_path = out_path
+            item.timing.add("encode", time.perf_counter() - started, result.width * result.height)
+            return item
+
+        def on_result(item: _BatchItem, _: Any, error: Optional[str]) -> None:
+            item.error = error
+            item.image = item.mask = None
+            if error is None:
+                batch_timing.add(item.timing)
+            if budget is not None:
+                budget.release(item.reserved)
+            if item.route is not None:
+                counts[item.route] += 1
+            # Blocks while the consumer is behind — this is the backpressure
+            results.put(item)
 
-                    if self._cancel_event.is_set():
+        pipeline = BatchPipeline(
+            decode, infer, encode,
+            decode_workers=decode_workers,
+            encode_workers=encode_workers,
+            queue_depth=max(read_ahead, inference_batch_size),
+            cancel_event=stop,
+            infer_batch=infer_batch,
+            infer_batch_size=inference_batch_size,
+        )
+
+        def _run() -> None:
+            try:
+                self.last_batch_stats = pipeline.run(admitted(inputs), on_result)
+            finally:
+                if budget is not None:
+                    self.last_admission_stats = budget.stats()
+                    _log_admission(self.last_admission_stats)
+                if use_triage:
+                    self.last_triage_counts = counts
+                    _log_triage(counts)
+                results.put(_END_OF_RESULTS)
+
+        runner = threading.Thread(target=_run, daemon=True)
+        runner.start()
+
+        with self._track(cancel_event):
+            reorder: Dict[int, _BatchItem] = {}
+            next_index = 0
+            try:
+                while True:
+                    try:
+                        item = results.get(timeout=0.1)
+                    except queue.Empty:
+                        if cancel_event.is_set():
+                            stop.set()
+                        continue
+                    if cancel_event.is_set():
+                        stop.set()
+                    if item is _END_OF_RESULTS:
                         break
+                    if not ordered:
+                        yield item.to_result()
+                        continue
+                    reorder[item.index] = item
+                    while next_index in reorder:
+                        yield reorder.pop(next_index).to_result()
+                        next_index += 1
 
-                    if result is not None:
-                        out_name = f"{os.path.splitext(filename)[0]}_nobg.png"
-                        out_path = os.path.join(output_dir, out_name)
-                        result.save(out_path, "PNG", optimize=True)
-                        success_count += 1
-                        logger.info("Batch: %s processed (%d/%d)", filename, i + 1, total)
-                    else:
-                        if on_error:
-                            on_error(filename, "Processing failed")
+                # After cancellation some indices never arrive
+                for index in sorted(reorder):
+                    yield reorder.pop(index).to_result()
+            finally:
+                stop.set()
+                # Drain so the pipeline can shut down if the consumer stopped early
+                while runner.is_alive():
+                    try:
+                        results.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                runner.join()
+
+    def _run_pipeline(
+        self,
+        file_paths: List[str],
+        output_dir: str,
+        on_progress: Optional[Callable[[int, int, str], None]],
+        on_error: Optional[Callable[[str, str], None]],
+        model_name: Optional[str],
+        decode_workers: int,
+        encode_workers: int,
+        queue_depth: int,
+        max_inference_side: Optional[int],
+        tile_size: Optional[int],
+        inference_batch_size: int,
+        cancel_event: threading.Event,
+        on_result: Optional[Callable[[BatchResult], None]] = None,
+        memory_budget: Optional[int] = None,
+        use_triage: bool = False,
+        backend: str = BACKEND_REMBG,
+    ) -> int:
+        """Process batch files via :meth:`iter_process`, reporting through callbacks.
+
+        Returns:
+            Number of successfully processed files.
+        """
+        total = len(file_paths)
+        done_count = 0
+        success_count = 0
+
+        for result in self.iter_process(
+            file_paths, output_dir,
+            model_name=model_name,
+            max_inference_side=max_inference_side,
+            tile_size=tile_size,
+            read_ahead=queue_depth,
+            decode_workers=decode_workers,
+            encode_workers=encode_workers,
+            cancel_event=cancel_event,
+            inference_batch_size=inference_batch_size,
+            memory_budget=memory_budget,
+            use_triage=use_triage,
+            backend=backend,
+        ):
+            filename = os.path.basename(result.input_path)
+            done_count += 1
+            if on_result:
+                on_result(result)
+            if result.ok:
+                success_count += 1
+                logger.info("Batch: %s processed (%d/%d)", filename, done_count, total)
+            else:
+                logger.error("Batch error [%s]: %s", filename, result.error)
+                if on_error:
+                    on_error(filename, result.error)
 
-                except Exception as e:
-                    logger.error("Batch error [%s]: %s", filename, e)
+            if on_progress:
+                on_progress(done_count, total, filename)
+
+        if cancel_event.is_set():
+            logger.info("Batch processing cancelled: %d/%d", done_count, total)
+
+        return success_count
+
+    def _run_process_pool(
+        self,
+        file_paths: List[str],
+        output_dir: str,
+        on_progress: Optional[Callable[[int, int, str], None]],
+        on_error: Optional[Callable[[str, str], None]],
+        model_name: Optional[str],
+        workers: int,
+        intra_op_threads: int,
+        max_inference_side: Optional[int],
+        tile_size: Optional[int],
+        cancel_event: threading.Event,
+        on_result: Optional[Callable[[BatchResult], None]] = None,
+        task_timeout: Optional[float] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        memory_limit_mb: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+        use_triage: bool = False,
+        backend: str = BACKEND_REMBG,
+    ) -> int:
+        """Process batch files on a pool of isolated worker processes.
+
+        Each worker runs one file at a time (see
+        :class:`~core.isolation.IsolatedPool`): a file that hangs past
+        ``task_timeout`` or crashes its worker fails on its own, and the
+        worker is replaced for the remaining files. On cancellation no
+        new files are dispatched and the in-flight ones are drained and
+        reported normally. With ``memory_budget`` a file is dispatched
+        only while the estimated memory of the files in flight fits.
+
+        Returns:
+            Number of successfully processed files.
+        """
+        total = len(file_paths)
+        success_count = 0
+        done_count = 0
+        budget = MemoryBudget(memory_budget) if memory_budget else None
+        estimates: Dict[str, int] = {}
+        self.last_admission_stats = None
+        counts = route_counts()
+        batch_timing = self.last_batch_timing = TimingStats()
+        inference_side = None if self.get_backend(backend).full_resolution else max_inference_side
+
+        def admit(args: Tuple) -> bool:
+            if args[0] not in estimates:
+                estimates[args[0]] = estimate_memory(args[0], inference_side, tile_size)
+            return budget.try_acquire(estimates[args[0]])
+
+        logger.info("Batch started on %d worker processes: %d files", workers, total)
+
+        pool = IsolatedPool(
+            _process_batch_file,
+            workers=workers,
+            task_timeout=task_timeout,
+            max_tasks_per_worker=max_tasks_per_worker,
+            initializer=_init_batch_worker,
+            initargs=(
+                model_name or self.model_name,
+                intra_op_threads,
+                self.mask_cache.cache_dir if self.mask_cache else None,
+                self.mask_cache.max_disk_bytes if self.mask_cache else 0,
+                backend,
+                self.keyer,
+                self.registry,
+            ),
+            memory_limit=memory_limit_mb * 1024 * 1024 if memory_limit_mb else None,
+        )
+        tasks = ((path, output_dir, max_inference_side, tile_size, use_triage, backend) for path in file_paths)
+        with pool:
+            for outcome in pool.imap(tasks, cancel_event, admit if budget is not None else None):
+                file_path = outcome.args[0]
+                if budget is not None:
+                    budget.release(estimates.get(file_path, 0))
+                filename = os.path.basename(file_path)
+                done_count += 1
+                if outcome.ok:
+                    result = outcome.value
+                    success_count += 1
+                    batch_timing.add(result.timing)
+                    if result.route is not None:
+                        counts[result.route] += 1
+                    logger.info("Batch: %s processed (%d/%d)", filename, done_count, total)
+                else:
+                    result = BatchResult(file_path, error=outcome.error, reason=outcome.reason)
+                    message = outcome.error
+                    if outcome.reason != FAILURE_ERROR:
+                        message = f"{outcome.reason}: {outcome.error}"
+                    logger.error("Batch error [%s]: %s", filename, message)
                     if on_error:
-                        on_error(filename, str(e))
+                        on_error(filename, message)
+                if on_result:
+                    on_result(result)
 
                 if on_progress:
-                    on_progress(i + 1, total, filename)
+                    on_progress(done_count, total, filename)
 
-            if on_complete:
-                on_complete(success_count, total)
+        if budget is not None:
+            self.last_admission_stats = budget.stats()
+            _log_admission(self.last_admission_stats)
+        self.last_triage_counts = counts if use_triage else None
+        if use_triage:
+            _log_triage(counts)
+        stats = pool.stats()
+        if stats["timeouts"] or stats["crashes"]:
+            logger.warning(
+                "Batch workers replaced: %d timed out, %d crashed", stats["timeouts"], stats["crashes"],
+            )
+        if cancel_event.is_set():
+            logger.info("Batch processing cancelled: %d/%d", done_count, total)
 
-        self._cancel_event.clear()
-        thread = threading.Thread(target=_batch_worker, daemon=True)
-        thread.start()
-        return thread
+        return success_count
@@ -0,0 +1,357 @@
+"""Isolated worker processes — per-task timeouts, crash recovery and recycling."""
+
+import multiprocessing
+import signal
+import time
+from multiprocessing.connection import Connection, wait as wait_connections
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.logger import setup_logger
+
+try:
+    import resource
+except ImportError:  # Windows: no address-space limits
+    resource = None
+
+logger = setup_logger(__name__)
+
+# Failure reasons reported for a task
+FAILURE_ERROR = "error"
+FAILURE_TIMEOUT = "timeout"
+FAILURE_CRASH = "crash"
+FAILURE_OOM = "oom"
+
+# Seconds a retiring worker gets to exit before it is killed
+_EXIT_GRACE = 2.0
+
+# Worker → parent message kinds
+_MSG_READY = "ready"
+_MSG_INIT_FAILED = "init_failed"
+_MSG_OK = "ok"
+
+
+def _signal_name(exitcode: Optional[int]) -> str:
+    """Describe a process exit code (negative codes are signals)."""
+    if exitcode is None or exitcode >= 0:
+        return f"exit code {exitcode}"
+    try:
+        return signal.Signals(-exitcode).name
+    except ValueError:
+        return f"signal {-exitcode}"
+
+
+def _limit_memory(memory_limit: Optional[int]) -> None:
+    """Cap the address space of the current process (POSIX only)."""
+    if memory_limit and resource is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            memory_limit = min(memory_limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+
+
+def _worker_main(
+    conn: Connection,
+    func: Callable[..., Any],
+    initializer: Optional[Callable[..., None]],
+    initargs: Tuple,
+    memory_limit: Optional[int],
+) -> None:
+    """Worker process loop: initialize, then run one task per message until told to exit."""
+    try:
+        _limit_memory(memory_limit)
+        if initializer is not None:
+            initializer(*initargs)
+    except BaseException as e:
+        conn.send((_MSG_INIT_FAILED, f"{type(e).__name__}: {e}"))
+        return
+    conn.send((_MSG_READY, None))
+
+    while True:
+        try:
+            args = conn.recv()
+        except (EOFError, OSError):
+            return
+        if args is None:
+            return
+        try:
+            message = (_MSG_OK, func(*args))
+        except MemoryError as e:
+            message = (FAILURE_OOM, f"out of memory: {e or 'MemoryError'}")
+        except Exception as e:
+            message = (FAILURE_ERROR, str(e))
+        try:
+            conn.send(message)
+        except Exception as e:  # Unpicklable result
+            conn.send((FAILURE_ERROR, f"cannot return result: {e}"))
+
+
+class TaskOutcome:
+    """Result of one task run in an isolated worker.
+
+    Attributes:
+        args: Arguments the task was called with.
+        value: Return value (None on failure).
+        reason: Failure reason (``FAILURE_*``; None on success).
+        error: Failure description (None on success).
+        elapsed: Seconds between dispatch and outcome.
+    """
+
+    __slots__ = ("args", "value", "reason", "error", "elapsed")
+
+    def __init__(
+        self,
+        args: Tuple,
+        value: Any = None,
+        reason: Optional[str] = None,
+        error: Optional[str] = None,
+        elapsed: float = 0.0,
+    ) -> None:
+        self.args = args
+        self.value = value
+        self.reason = reason
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        """Whether the task returned normally."""
+        return self.reason is None
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"{self.reason}: {self.error}"
+        return f"TaskOutcome({status}, {self.elapsed:.2f}s)"
+
+
+class _Worker:
+    """One worker process and the task it is running."""
+
+    __slots__ = ("process", "conn", "ready", "args", "started", "tasks_done")
+
+    def __init__(self, process: multiprocessing.Process, conn: Connection) -> None:
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.args: Optional[Tuple] = None
+        self.started = 0.0
+        self.tasks_done = 0
+
+    @property
+    def busy(self) -> bool:
+        return self.args is not None
+
+
+class IsolatedPool:
+    """Runs tasks in worker processes that cannot take the batch down.
+
+    Each worker runs one task at a time. A task that exceeds
+    ``task_timeout`` gets its worker killed; a worker that dies (a
+    segfault in a decoder, the kernel's OOM killer) fails only the task
+    it was running. Both are replaced by fresh workers for the
+    remaining tasks. Workers are also retired after
+    ``max_tasks_per_worker`` tasks so memory fragmentation or leaks in
+    native code cannot grow without bound.
+
+    Attributes:
+        workers: Number of worker processes.
+        task_timeout: Seconds a task may run (None = unlimited).
+        max_tasks_per_worker: Tasks before a worker is replaced (None = never).
+        memory_limit: Address-space limit per worker in bytes (POSIX only;
+            allocations beyond it fail with ``MemoryError``).
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        workers: int = 1,
+        task_timeout: Optional[float] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple = (),
+        memory_limit: Optional[int] = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.task_timeout = task_timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.memory_limit = memory_limit
+        self._func = func
+        self._initializer = initializer
+        self._initargs = initargs
+        self._pool: List[_Worker] = []
+        self._counters = {"spawned": 0, "timeouts": 0, "crashes": 0, "recycled": 0}
+
+    def __enter__(self) -> "IsolatedPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Return worker lifecycle counters (spawned, timeouts, crashes, recycled)."""
+        return dict(self._counters)
+
+    # ==================== WORKERS ====================
+
+    def _spawn(self) -> _Worker:
+        """Start a worker process."""
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_worker_main,
+            args=(child_conn, self._func, self._initializer, self._initargs, self.memory_limit),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self._counters["spawned"] += 1
+        worker = _Worker(process, parent_conn)
+        self._pool.append(worker)
+        return worker
+
+    def _retire(self, worker: _Worker, kill: bool = False) -> None:
+        """Stop a worker (ask it to exit, or kill it) and drop it from the pool."""
+        if kill:
+            worker.process.kill()
+        else:
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            worker.process.join(_EXIT_GRACE)
+            if worker.process.is_alive():
+                worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+        self._pool.remove(worker)
+
+    def _crash_reason(self, worker: _Worker) -> Tuple[str, str]:
+        """Classify the death of a worker."""
+        worker.process.join()
+        exitcode = worker.process.exitcode
+        # The kernel's OOM killer ends processes with SIGKILL
+        if exitcode == -getattr(signal, "SIGKILL", 9):
+            return FAILURE_OOM, f"worker killed ({_signal_name(exitcode)}), likely out of memory"
+        return FAILURE_CRASH, f"worker crashed ({_signal_name(exitcode)})"
+
+    def close(self) -> None:
+        """Stop all workers (busy ones are killed)."""
+        for worker in list(self._pool):
+            self._retire(worker, kill=worker.busy)
+
+    # ==================== TASKS ====================
+
+    def _receive(self, worker: _Worker) -> Optional[TaskOutcome]:
+        """Handle a message or the exit of a worker; return the finished task's outcome."""
+        try:
+            kind, payload = worker.conn.recv()
+        except (EOFError, OSError):
+            reason, error = self._crash_reason(worker)
+            outcome = TaskOutcome(worker.args, reason=reason, error=error) if worker.busy else None
+            if not worker.ready:
+                self._retire(worker)
+                raise RuntimeError(f"Worker failed to start: {error}")
+            self._counters["crashes"] += 1
+            logger.warning("Isolated worker %s: %s", worker.process.pid, error)
+            if outcome is not None:
+                outcome.elapsed = time.monotonic() - worker.started
+            self._retire(worker)
+            return outcome
+
+        if kind == _MSG_READY:
+            worker.ready = True
+            return None
+        if kind == _MSG_INIT_FAILED:
+            self._retire(worker)
+            raise RuntimeError(f"Worker failed to start: {payload}")
+
+        outcome = TaskOutcome(worker.args, elapsed=time.monotonic() - worker.started)
+        if kind == _MSG_OK:
+            outcome.value = payload
+        else:
+            outcome.reason, outcome.error = kind, payload
+        worker.args = None
+        worker.tasks_done += 1
+        if self.max_tasks_per_worker and worker.tasks_done >= self.max_tasks_per_worker:
+            self._counters["recycled"] += 1
+            self._retire(worker)
+        return outcome
+
+    def _expire(self, now: float) -> List[TaskOutcome]:
+        """Kill workers whose task ran past the timeout."""
+        outcomes = []
+        for worker in list(self._pool):
+            if worker.busy and now - worker.started >= self.task_timeout:
+                self._counters["timeouts"] += 1
+                outcomes.append(TaskOutcome(
+                    worker.args, reason=FAILURE_TIMEOUT,
+                    error=f"timed out after {self.task_timeout:g}s", elapsed=now - worker.started,
+                ))
+                logger.warning("Isolated worker %s killed: task timed out", worker.process.pid)
+                self._retire(worker, kill=True)
+        return outcomes
+
+    def imap(
+        self,
+        tasks: Iterable[Tuple],
+        cancel_event: Optional[Any] = None,
+        admit: Optional[Callable[[Tuple], bool]] = None,
+    ) -> Iterator[TaskOutcome]:
+        """Run tasks and yield their outcomes in completion order.
+
+        Args:
+            tasks: Argument tuples, one per task; pulled only as workers
+                become free.
+            cancel_event: When set, no new tasks are dispatched; running
+                ones still finish (or time out) and are yielded.
+            admit: Called with the next task's arguments before it is
+                dispatched; while it returns False the task is held back
+                until another task finishes. It must admit a task when
+                none are running.
+
+        Raises:
+            RuntimeError: If a worker cannot be initialized.
+        """
+        remaining = iter(tasks)
+        exhausted = False
+        held: Optional[Tuple] = None
+        while True:
+            accepting = not exhausted and not (cancel_event is not None and cancel_event.is_set())
+            # Keep the pool full while tasks remain
+            if accepting:
+                while len(self._pool) < self.workers:
+                    self._spawn()
+
+            for worker in list(self._pool):
+                if not accepting:
+                    break
+                if worker.ready and not worker.busy:
+                    if not worker.process.is_alive():  # Died while idle
+                        self._counters["crashes"] += 1
+                        self._retire(worker)
+                        continue
+                    args = held if held is not None else next(remaining, None)
+                    if args is None:
+                        exhausted = accepting = False
+                        break
+                    if admit is not None and not admit(tuple(args)):
+                        held = args  # Wait for a running task to finish
+                        break
+                    held = None
+                    worker.args = tuple(args)
+                    worker.started = time.monotonic()
+                    worker.conn.send(worker.args)
+
+            busy = [w for w in self._pool if w.busy]
+            starting = [w for w in self._pool if not w.ready] if accepting else []
+            if not busy and not starting:
+                return
+
+            timeout = None
+            if self.task_timeout is not None and busy:
+                now = time.monotonic()
+                timeout = max(0.0, min(w.started + self.task_timeout - now for w in busy))
+            by_conn = {w.conn: w for w in busy + starting}
+            for conn in wait_connections(list(by_conn), timeout):
+                outcome = self._receive(by_conn[conn])
+                if outcome is not None:
+                    yield outcome
+            if self.task_timeout is not None:
+                yield from self._expire(time.monotonic())
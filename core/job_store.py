@@ -0,0 +1,576 @@
+"""Durable job store — SQLite-backed batch queue shared by worker processes."""
+
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from PIL import Image
+
+from core.backends import BACKEND_REMBG
+from core.export_manager import ExportManager
+from core.image_processor import DEFAULT_INFERENCE_BATCH_SIZE, ImageProcessor
+from core.model_registry import ModelRegistry
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Job states
+STORE_PENDING = "pending"
+STORE_RUNNING = "running"
+STORE_DONE = "done"
+STORE_FAILED = "failed"
+
+# Seconds a claimed job stays reserved without a heartbeat
+DEFAULT_LEASE_SECONDS = 60.0
+
+# Attempts before a job is marked failed
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Delay before the first retry; doubles with every further attempt (seconds)
+DEFAULT_RETRY_BACKOFF = 5.0
+
+# Error recorded for an attempt whose worker never reported back
+LEASE_EXPIRED_ERROR = "lease expired (worker crashed or was killed)"
+
+# Seconds an idle worker waits before looking for jobs again
+DEFAULT_STORE_POLL_INTERVAL = 1.0
+
+# Seconds SQLite waits for a competing writer before giving up
+_BUSY_TIMEOUT_MS = 30000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    input_path TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    elapsed REAL,
+    timings TEXT,
+    output_path TEXT,
+    error TEXT,
+    UNIQUE (input_path, output_dir)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at);
+"""
+
+
+class StoredJob:
+    """A job row of the store.
+
+    Attributes:
+        job_id: Row id.
+        input_path: Input file path.
+        output_dir: Output directory.
+        status: One of the ``STORE_*`` states.
+        attempts: Number of times the job was claimed.
+        output_path: Written output path (None until done).
+        error: Last error message.
+        elapsed: Processing time of the successful attempt (seconds).
+        timings: Seconds per stage of the successful attempt.
+    """
+
+    __slots__ = (
+        "job_id", "input_path", "output_dir", "status", "attempts",
+        "output_path", "error", "elapsed", "timings",
+    )
+
+    def __init__(self, row: sqlite3.Row) -> None:
+        self.job_id: int = row["id"]
+        self.input_path: str = row["input_path"]
+        self.output_dir: str = row["output_dir"]
+        self.status: str = row["status"]
+        self.attempts: int = row["attempts"]
+        self.output_path: Optional[str] = row["output_path"]
+        self.error: Optional[str] = row["error"]
+        self.elapsed: Optional[float] = row["elapsed"]
+        self.timings: Dict[str, float] = json.loads(row["timings"]) if row["timings"] else {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the job as a dictionary."""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"StoredJob({self.job_id}, {os.path.basename(self.input_path)!r}, {self.status})"
+
+
+class JobStore:
+    """Batch job queue in an SQLite database.
+
+    Workers :meth:`claim` jobs under a lease, renew it while working
+    (:meth:`extend_leases`) and report each job with :meth:`complete` or
+    :meth:`fail`. A job whose lease expires — its worker crashed or
+    was killed — counts as a failed attempt and becomes claimable
+    again, so an interrupted run resumes by simply starting workers on
+    the same database. Failed attempts are retried after an exponential
+    backoff until ``max_attempts``.
+
+    The database uses WAL mode so readers never block the workers. WAL
+    needs all processes on one host; for a store on a network share
+    used from several machines, pass ``wal=False`` (rollback journal
+    with file locks).
+
+    Every thread gets its own connection, so one store can be shared by
+    the threads of a process; other processes open their own store on
+    the same path.
+
+    Attributes:
+        path: Database file path.
+        lease_seconds: Lease length of a claimed job.
+        max_attempts: Attempts before a job is marked failed.
+        retry_backoff: Delay before the first retry (doubles per attempt).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        wal: bool = True,
+    ) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.wal = wal
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    # ==================== CONNECTIONS ====================
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # Only this thread uses the connection, but it may be closed from another
+            conn = sqlite3.connect(
+                self.path, timeout=_BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS}")
+            conn.execute(f"PRAGMA journal_mode = {'WAL' if self.wal else 'DELETE'}")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in a write transaction (taken up front to avoid deadlocks)."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ==================== PRODUCERS ====================
+
+    def add(self, input_paths: Iterable[str], output_dir: str) -> int:
+        """Queue inputs; inputs already queued for the same output directory are ignored.
+
+        Returns:
+            Number of new jobs.
+        """
+        now = time.time()
+        output_dir = os.path.abspath(output_dir)
+        rows = [(os.path.abspath(path), output_dir, now) for path in input_paths]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (input_path, output_dir, created_at) VALUES (?, ?, ?)", rows,
+            )
+            added = conn.total_changes - before
+        logger.info("Job store: %d job(s) added (%d already queued)", added, len(rows) - added)
+        return added
+
+    def retry_failed(self) -> int:
+        """Return failed jobs to the queue with a fresh attempt budget.
+
+        Returns:
+            Number of requeued jobs.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, available_at = 0, error = NULL WHERE status = ?",
+                (STORE_PENDING, STORE_FAILED),
+            )
+        return cursor.rowcount
+
+    # ==================== WORKERS ====================
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[StoredJob]:
+        """Lease up to ``limit`` runnable jobs.
+
+        Runnable are pending jobs whose backoff has elapsed. Running jobs
+        whose lease expired are first recorded as failed attempts (see
+        :meth:`fail`): an input that keeps killing its worker is retried
+        with backoff and finally marked failed instead of being
+        reclaimed forever.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            expired = conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = ? AND lease_expires < ?", (STORE_RUNNING, now),
+            ).fetchall()
+            for row in expired:
+                status = self._record_failure(conn, row["id"], row["attempts"], LEASE_EXPIRED_ERROR, now)
+                logger.warning("Job store: lease of job %d expired, job %s", row["id"], status)
+            ids = [row["id"] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND available_at <= ? ORDER BY id LIMIT ?",
+                (STORE_PENDING, now, limit),
+            )]
+            if not ids:
+                return []
+            marks = ",".join("?" * len(ids))
+            conn.execute(
+                f"UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, "
+                f"lease_expires = ?, started_at = ? WHERE id IN ({marks})",
+                (STORE_RUNNING, worker_id, now + self.lease_seconds, now, *ids),
+            )
+            rows = conn.execute(f"SELECT * FROM jobs WHERE id IN ({marks}) ORDER BY id", ids).fetchall()
+        return [StoredJob(row) for row in rows]
+
+    def extend_leases(self, worker_id: str, job_ids: Iterable[int]) -> int:
+        """Renew the leases of jobs this worker still holds.
+
+        Returns:
+            Number of renewed leases (a lease lost to another worker is not renewed).
+        """
+        ids = list(job_ids)
+        if not ids:
+            return 0
+        marks = ",".join("?" * len(ids))
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET lease_expires = ? WHERE status = ? AND lease_owner = ? AND id IN ({marks})",
+                (time.time() + self.lease_seconds, STORE_RUNNING, worker_id, *ids),
+            )
+        return cursor.rowcount
+
+    def complete(
+        self, job_id: int, worker_id: str, output_path: str, timings: Optional[Dict[str, float]] = None,
+    ) -> bool:
+        """Mark a job done.
+
+        Returns:
+            False if the worker no longer held the job's lease.
+        """
+        timings = timings or {}
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, output_path = ?, error = NULL, finished_at = ?, elapsed = ?, "
+                "timings = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (STORE_DONE, output_path, time.time(), round(sum(timings.values()), 4),
+                 json.dumps({k: round(v, 4) for k, v in timings.items()}), job_id, STORE_RUNNING, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> Optional[str]:
+        """Record a failed attempt; the job is retried after a backoff or marked failed.
+
+        Returns:
+            The job's new status, or None if the worker no longer held its lease.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND status = ? AND lease_owner = ?",
+                (job_id, STORE_RUNNING, worker_id),
+            ).fetchone()
+            if row is None:
+                return None
+            return self._record_failure(conn, job_id, row["attempts"], error, now)
+
+    def _record_failure(self, conn: sqlite3.Connection, job_id: int, attempts: int, error: str, now: float) -> str:
+        """Requeue a job after its backoff, or mark it failed once its attempts are used up."""
+        if attempts >= self.max_attempts:
+            status, available_at = STORE_FAILED, 0.0
+        else:
+            status, available_at = STORE_PENDING, now + self.retry_backoff * 2 ** (attempts - 1)
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, available_at = ?, finished_at = ?, "
+            "lease_owner = NULL, lease_expires = NULL WHERE id = ?",
+            (status, error, available_at, now, job_id),
+        )
+        return status
+
+    def release(self, worker_id: str, job_ids: Optional[Iterable[int]] = None) -> int:
+        """Give back leased jobs unprocessed (not counted as an attempt).
+
+        Args:
+            worker_id: Worker holding the leases.
+            job_ids: Jobs to release (None = all of the worker's jobs).
+
+        Returns:
+            Number of released jobs.
+        """
+        query = "UPDATE jobs SET status = ?, attempts = attempts - 1, lease_owner = NULL, lease_expires = NULL " \
+                "WHERE status = ? AND lease_owner = ?"
+        params: List[Any] = [STORE_PENDING, STORE_RUNNING, worker_id]
+        if job_ids is not None:
+            ids = list(job_ids)
+            if not ids:
+                return 0
+            query += f" AND id IN ({','.join('?' * len(ids))})"
+            params.extend(ids)
+        with self._transaction() as conn:
+            cursor = conn.execute(query, params)
+        return cursor.rowcount
+
+    # ==================== STATUS ====================
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs per state."""
+        counts = {STORE_PENDING: 0, STORE_RUNNING: 0, STORE_DONE: 0, STORE_FAILED: 0}
+        for row in self._connection().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        return counts
+
+    def jobs(self, status: Optional[str] = None) -> List[StoredJob]:
+        """Return the jobs (optionally of one state) in queue order."""
+        conn = self._connection()
+        if status is None:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        else:
+            rows = conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,)).fetchall()
+        return [StoredJob(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return state counts, mean job time and overall throughput."""
+        stats: Dict[str, Any] = dict(self.counts())
+        row = self._connection().execute(
+            "SELECT AVG(elapsed) AS avg, MIN(started_at) AS first, MAX(finished_at) AS last "
+            "FROM jobs WHERE status = ?", (STORE_DONE,),
+        ).fetchone()
+        stats["avg_elapsed"] = round(row["avg"], 4) if row["avg"] is not None else None
+        span = (row["last"] - row["first"]) if row["first"] is not None else 0.0
+        stats["throughput"] = round(stats[STORE_DONE] / span, 3) if span > 0 else None
+        return stats
+
+
+def default_worker_id() -> str:
+    """Return a worker id unique across hosts and processes."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class StoreWorker:
+    """Processes jobs claimed from a :class:`JobStore`.
+
+    Claimed jobs are streamed through the processor's
+    :meth:`~core.image_processor.ImageProcessor.iter_process` pipeline;
+    only a few jobs are leased ahead of the pipeline, so other workers
+    get the rest. A heartbeat thread renews the leases of in-flight
+    jobs. Results go to ``<output_dir>/<name>_nobg.png`` of each job.
+
+    Attributes:
+        store: The job store.
+        processor: Processor running the jobs.
+        worker_id: Lease owner id of this worker.
+        claim_size: Jobs leased per claim.
+        exit_when_idle: Return once no pending jobs are left (otherwise
+            keep polling until cancelled).
+        use_triage: Route already-transparent and flat-background images
+            around the model (see ``iter_process``).
+        backend: Mask backend the jobs run on.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        processor: ImageProcessor,
+        worker_id: Optional[str] = None,
+        claim_size: int = 2,
+        exit_when_idle: bool = True,
+        poll_interval: float = DEFAULT_STORE_POLL_INTERVAL,
+        max_inference_side: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        inference_batch_size: int = DEFAULT_INFERENCE_BATCH_SIZE,
+        use_triage: bool = False,
+        backend: str = BACKEND_REMBG,
+    ) -> None:
+        self.store = store
+        self.processor = processor
+        self.worker_id = worker_id or default_worker_id()
+        self.claim_size = max(1, claim_size, inference_batch_size)
+        self.exit_when_idle = exit_when_idle
+        self.poll_interval = poll_interval
+        self.max_inference_side = max_inference_side
+        self.tile_size = tile_size
+        self.inference_batch_size = inference_batch_size
+        self.use_triage = use_triage
+        self.backend = backend
+        # Keyed by job id: the same input may be queued for several output directories
+        self._in_flight: Dict[int, StoredJob] = {}
+        self._lock = threading.Lock()
+
+    def _held_ids(self) -> List[int]:
+        """Return the ids of the jobs this worker is processing."""
+        with self._lock:
+            return list(self._in_flight)
+
+    def _claimed(self, stop: threading.Event) -> Iterator[StoredJob]:
+        """Yield newly claimed jobs until idle or stopped."""
+        try:
+            while not stop.is_set():
+                jobs = self.store.claim(self.worker_id, self.claim_size)
+                if not jobs:
+                    # In-flight jobs may still fail back to pending, so wait for them
+                    if self.exit_when_idle and not self._held_ids() and self.store.counts()[STORE_PENDING] == 0:
+                        return
+                    stop.wait(self.poll_interval)
+                    continue
+                for job in jobs:
+                    with self._lock:
+                        self._in_flight[job.job_id] = job
+                    yield job
+        finally:
+            self.store.close()
+
+    @staticmethod
+    def _write(image: Image.Image, job: StoredJob) -> str:
+        """Pipeline writer — saves into the output directory of the job."""
+        out_path = os.path.join(job.output_dir, ExportManager.generate_output_filename(job.input_path))
+        os.makedirs(job.output_dir, exist_ok=True)
+        image.save(out_path, "PNG", optimize=True)
+        return out_path
+
+    def _heartbeat(self, stop: threading.Event) -> None:
+        """Renew the leases of in-flight jobs until ``stop`` is set."""
+        try:
+            while not stop.wait(self.store.lease_seconds / 3):
+                self.store.extend_leases(self.worker_id, self._held_ids())
+        finally:
+            self.store.close()
+
+    def run(self, cancel_event: Optional[threading.Event] = None) -> Dict[str, int]:
+        """Process jobs until none are left (or ``cancel_event`` is set).
+
+        On cancellation, leased jobs that were not finished are released
+        back to the queue.
+
+        Returns:
+            ``{"done": n, "failed": n, "retried": n}`` for this worker.
+        """
+        cancel_event = cancel_event or threading.Event()
+        counts = {STORE_DONE: 0, STORE_FAILED: 0, "retried": 0}
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(finished,), daemon=True)
+        heartbeat.start()
+        logger.info("Store worker %s started", self.worker_id)
+        try:
+            for result in self.processor.iter_process(
+                self._claimed(cancel_event), "",
+                max_inference_side=self.max_inference_side,
+                tile_size=self.tile_size,
+                cancel_event=cancel_event,
+                inference_batch_size=self.inference_batch_size,
+                use_triage=self.use_triage,
+                backend=self.backend,
+                writer=self._write,
+                path_of=lambda job: job.input_path,
+            ):
+                # Results arrive in completion order; each carries its own job
+                job = result.source
+                with self._lock:
+                    del self._in_flight[job.job_id]
+                if result.ok:
+                    self.store.complete(job.job_id, self.worker_id, result.output_path, result.timings)
+                    counts[STORE_DONE] += 1
+                else:
+                    status = self.store.fail(job.job_id, self.worker_id, result.error)
+                    counts[STORE_FAILED if status == STORE_FAILED else "retried"] += 1
+        finally:
+            finished.set()
+            heartbeat.join()
+            released = self.store.release(self.worker_id, self._held_ids())
+            with self._lock:
+                self._in_flight.clear()
+            if released:
+                logger.info("Store worker %s released %d unfinished job(s)", self.worker_id, released)
+            self.store.close()
+        logger.info("Store worker %s finished: %s", self.worker_id, counts)
+        return counts
+
+
+def _store_worker_main(
+    store_path: str, model_name: Optional[str], registry: Optional[ModelRegistry], options: Dict[str, Any],
+) -> Dict[str, int]:
+    """Entry point of a worker process: own store connection, own warm processor."""
+    store = JobStore(store_path, **options.pop("store", {}))
+    processor = ImageProcessor(model_name, registry=registry) if model_name else ImageProcessor(registry=registry)
+    try:
+        processor.warm_up(dummy_inference=True, backend=options.get("backend", BACKEND_REMBG))
+        return StoreWorker(store, processor, **options).run()
+    finally:
+        processor.close()
+
+
+def run_store_workers(
+    store_path: str,
+    processes: int = 1,
+    model_name: Optional[str] = None,
+    store_options: Optional[Dict[str, Any]] = None,
+    registry: Optional[ModelRegistry] = None,
+    **worker_options: Any,
+) -> Dict[str, int]:
+    """Drain a job store with several worker processes.
+
+    Each process loads its own model and claims jobs independently, so
+    throughput scales with the number of processes up to the machine's
+    cores. More processes (or machines) can join the same store at any
+    time.
+
+    Args:
+        store_path: Database file path.
+        processes: Number of worker processes.
+        model_name: rembg model or tier to use.
+        store_options: Keyword arguments for :class:`JobStore` in each process.
+        registry: Model registry of each process's processor (model
+            directory, local-only mode, registered models).
+        **worker_options: Keyword arguments for :class:`StoreWorker`
+            (``backend``, ``use_triage``, ...).
+
+    Returns:
+        Per-state job counts summed over the processes.
+    """
+    def options() -> Dict[str, Any]:
+        return dict(worker_options, store=dict(store_options or {}))
+
+    if processes <= 1:
+        return _store_worker_main(store_path, model_name, registry, options())
+
+    totals = {STORE_DONE: 0, STORE_FAILED: 0, "retried": 0}
+    with multiprocessing.Pool(processes) as pool:
+        results = [
+            pool.apply_async(_store_worker_main, (store_path, model_name, registry, options()))
+            for _ in range(processes)
+        ]
+        for result in results:
+            for key, value in result.get().items():
+                totals[key] += value
+    return totals
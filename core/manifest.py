@@ -0,0 +1,226 @@
+"""Build manifest — input and settings fingerprints for incremental batches."""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Manifest file name inside the output directory
+MANIFEST_FILENAME = ".bgremover_manifest.json"
+
+# Manifest format version (entries of other versions are ignored)
+MANIFEST_VERSION = 1
+
+# Read size when hashing input files
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_key(settings: Dict[str, Any]) -> str:
+    """Return a stable fingerprint of processing settings (model, format, ...)."""
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class IncrementalPlan:
+    """Which inputs of a batch need processing.
+
+    Attributes:
+        todo: Inputs whose output is missing or out of date.
+        skipped: Inputs whose output is up to date.
+        time_saved: Recorded processing time of the skipped inputs (seconds).
+    """
+
+    __slots__ = ("todo", "skipped", "time_saved")
+
+    def __init__(self, todo: List[str], skipped: List[str], time_saved: float = 0.0) -> None:
+        self.todo = todo
+        self.skipped = skipped
+        self.time_saved = time_saved
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the plan counts as a dictionary."""
+        return {
+            "total": len(self.todo) + len(self.skipped),
+            "to_process": len(self.todo),
+            "skipped": len(self.skipped),
+            "time_saved": round(self.time_saved, 3),
+        }
+
+    def __repr__(self) -> str:
+        return f"IncrementalPlan(to_process={len(self.todo)}, skipped={len(self.skipped)})"
+
+
+class BuildManifest:
+    """Records, per output file, what it was built from.
+
+    Each entry holds the input path, its size and mtime (and optionally
+    a SHA-256 of its content), the fingerprint of the processing
+    settings and how long the build took. An output is up to date when
+    it exists and its entry matches the current input and settings.
+    With ``content_hash`` an input whose mtime changed but whose content
+    did not (a copy, a touch) still counts as up to date.
+
+    Attributes:
+        path: Manifest file path.
+        content_hash: Compare input content hashes when size/mtime differ.
+    """
+
+    def __init__(self, path: str, content_hash: bool = False) -> None:
+        self.path = path
+        self.content_hash = content_hash
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    @classmethod
+    def for_directory(cls, output_dir: str, content_hash: bool = False) -> "BuildManifest":
+        """Open the manifest stored in an output directory."""
+        return cls(os.path.join(output_dir, MANIFEST_FILENAME), content_hash)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ==================== STORAGE ====================
+
+    def load(self) -> None:
+        """Load the manifest from disk (a missing or broken file means empty)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable manifest %s: %s", self.path, e)
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self._entries = data.get("outputs", {})
+
+    def save(self) -> None:
+        """Write the manifest if it changed (atomically, via a temporary file)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": MANIFEST_VERSION, "outputs": self._entries}
+            tmp_path = f"{self.path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, indent=1)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                logger.error("Failed to save manifest %s: %s", self.path, e)
+
+    # ==================== FINGERPRINTS ====================
+
+    def _key(self, output_path: str) -> str:
+        """Entry key: the output path relative to the manifest directory."""
+        return os.path.relpath(os.path.abspath(output_path), os.path.dirname(os.path.abspath(self.path)))
+
+    def is_up_to_date(self, input_path: str, output_path: str, settings: str) -> bool:
+        """Check whether an output was built from the current input and settings.
+
+        Args:
+            input_path: Input file path.
+            output_path: Output file path.
+            settings: Settings fingerprint from :func:`settings_key`.
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(output_path))
+        if entry is None or entry.get("settings") != settings:
+            return False
+        if entry.get("input") != os.path.abspath(input_path) or not os.path.isfile(output_path):
+            return False
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return False
+        if stat.st_size != entry.get("size"):
+            return False
+        if stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        if not self.content_hash or "sha256" not in entry:
+            return False
+        try:
+            same = file_digest(input_path) == entry["sha256"]
+        except OSError:
+            return False
+        if same:
+            # Touched but unchanged — remember the new mtime to skip hashing next time
+            with self._lock:
+                entry["mtime_ns"] = stat.st_mtime_ns
+                self._dirty = True
+        return same
+
+    def elapsed(self, output_path: str) -> float:
+        """Return the recorded build time of an output (0 if unknown)."""
+        with self._lock:
+            entry = self._entries.get(self._key(output_path))
+        return float(entry.get("elapsed", 0.0)) if entry else 0.0
+
+    def record(self, input_path: str, output_path: str, settings: str, elapsed: float = 0.0) -> None:
+        """Record a successful build of ``output_path`` from ``input_path``."""
+        try:
+            stat = os.stat(input_path)
+            entry: Dict[str, Any] = {
+                "input": os.path.abspath(input_path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "settings": settings,
+                "elapsed": round(elapsed, 4),
+            }
+            if self.content_hash:
+                entry["sha256"] = file_digest(input_path)
+        except OSError as e:
+            logger.warning("Cannot fingerprint %s: %s", input_path, e)
+            return
+        with self._lock:
+            self._entries[self._key(output_path)] = entry
+            self._dirty = True
+
+    def plan(self, jobs: Iterable[Tuple[str, str]], settings: str) -> IncrementalPlan:
+        """Split ``(input_path, output_path)`` pairs into work and skips.
+
+        Args:
+            jobs: Input paths with the output path each one produces.
+            settings: Settings fingerprint from :func:`settings_key`.
+
+        Returns:
+            The plan; its ``time_saved`` sums the recorded build times
+            of the skipped outputs.
+        """
+        todo: List[str] = []
+        skipped: List[str] = []
+        time_saved = 0.0
+        for input_path, output_path in jobs:
+            if self.is_up_to_date(input_path, output_path, settings):
+                skipped.append(input_path)
+                time_saved += self.elapsed(output_path)
+            else:
+                todo.append(input_path)
+        logger.info(
+            "Incremental plan: %d to process, %d up to date (%.1fs saved)",
+            len(todo), len(skipped), time_saved,
+        )
+        return IncrementalPlan(todo, skipped, time_saved)
+
+    def get(self, output_path: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the entry of an output, or None."""
+        with self._lock:
+            entry = self._entries.get(self._key(output_path))
+            return dict(entry) if entry else None
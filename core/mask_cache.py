@@ -0,0 +1,226 @@
+"""Mask cache — content-addressed memory LRU + on-disk store for masks."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".bgremover_cache")
+
+# Default size limits
+DEFAULT_MEMORY_BYTES = 256 * 1024 * 1024
+DEFAULT_DISK_BYTES = 1024 * 1024 * 1024
+
+# After eviction the disk store is trimmed to this fraction of its limit
+_DISK_LOW_WATER = 0.9
+
+# Pixel data is hashed in horizontal strips of about this many bytes
+_HASH_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+class MaskCache:
+    """Two-tier cache for segmentation masks.
+
+    Masks are keyed by a hash of the image pixels plus the model name
+    and inference settings (see :meth:`make_key`), so the same picture
+    opened from a different path still hits. Recently used masks live
+    in a bounded in-memory LRU; every mask is also written as a PNG
+    under ``cache_dir``, which is trimmed oldest-first when it grows
+    past ``max_disk_bytes``. Thread-safe; the disk store can be shared
+    by several processes.
+
+    Attributes:
+        cache_dir: Directory of the on-disk store (None = memory only).
+        max_memory_bytes: Size limit of the in-memory tier.
+        max_disk_bytes: Size limit of the on-disk tier.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        max_disk_bytes: int = DEFAULT_DISK_BYTES,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Image.Image]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(image: Image.Image, model_name: str, **settings: Any) -> str:
+        """Return the cache key of an image and its processing settings.
+
+        Args:
+            image: Input image.
+            model_name: Segmentation model name.
+            **settings: Other settings that change the mask
+                (e.g. ``max_inference_side``).
+
+        Returns:
+            Hex digest string.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{image.mode}:{image.width}x{image.height}:{model_name}:".encode())
+        digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+        # Strip by strip instead of one tobytes() copy of the whole image;
+        # the strips concatenate to the same bytes, so keys are unchanged
+        row_bytes = max(1, image.width * len(image.getbands()))
+        rows = max(1, _HASH_CHUNK_BYTES // row_bytes)
+        for top in range(0, image.height, rows):
+            bottom = min(top + rows, image.height)
+            digest.update(image.crop((0, top, image.width, bottom)).tobytes())
+        return digest.hexdigest()
+
+    # ==================== LOOKUP ====================
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        """Return a cached mask, or None on a miss."""
+        with self._lock:
+            mask = self._memory.get(key)
+            if mask is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return mask
+
+        mask = self._read_disk(key)
+        with self._lock:
+            if mask is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, mask)
+        return mask
+
+    def put(self, key: str, mask: Image.Image) -> None:
+        """Store a mask in both tiers."""
+        with self._lock:
+            self._remember(key, mask)
+        self._write_disk(key, mask)
+
+    def clear(self) -> None:
+        """Remove every cached mask (memory and disk)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self.cache_dir and os.path.isdir(self.cache_dir):
+                for path, _, _ in self._scan_disk():
+                    self._remove_file(path)
+            self._disk_bytes = 0
+        logger.info("Mask cache cleared.")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current tier sizes."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+            stats["memory_items"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+            stats["disk_bytes"] = self._disk_bytes or 0
+            return stats
+
+    # ==================== MEMORY TIER ====================
+
+    def _remember(self, key: str, mask: Image.Image) -> None:
+        """Insert a mask into the memory LRU (lock must be held)."""
+        size = mask.width * mask.height
+        if size > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= old.width * old.height
+        self._memory[key] = mask
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.width * evicted.height
+
+    # ==================== DISK TIER ====================
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.png")
+
+    def _read_disk(self, key: str) -> Optional[Image.Image]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with Image.open(path) as img:
+                mask = img.convert("L")
+            # Refresh mtime so eviction stays least-recently-used
+            os.utime(path)
+            return mask
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, mask: Image.Image) -> None:
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see partial PNGs
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                mask.save(f, "PNG")
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.warning("Failed to write mask cache entry: %s", e)
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(entry_size for _, entry_size, _ in self._scan_disk())
+            else:
+                self._disk_bytes += size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _scan_disk(self):
+        """Yield (path, size, mtime) of every cache file (lock must be held)."""
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(".png"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    yield entry.path, st.st_size, st.st_mtime
+
+    def _evict_disk(self) -> None:
+        """Delete the oldest files until under the low-water mark (lock must be held)."""
+        entries = sorted(self._scan_disk(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * _DISK_LOW_WATER
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            if self._remove_file(path):
+                total -= size
+                self._stats["evictions"] += 1
+        self._disk_bytes = total
+
+    @staticmethod
+    def _remove_file(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
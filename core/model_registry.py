@@ -0,0 +1,199 @@
+"""Local model registry — segmentation model files, custom models and speed/quality tiers."""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Model used when a request names none
+DEFAULT_MODEL = "u2net"
+
+# Speed/quality tiers a job can ask for instead of a model name
+TIER_FAST = "fast"
+TIER_BALANCED = "balanced"
+TIER_BEST = "best"
+TIERS = {TIER_FAST: "u2netp", TIER_BALANCED: "u2net", TIER_BEST: "isnet-general-use"}
+
+# Model families and the rembg sessions that load their ONNX files from a path
+FAMILY_U2NET = "u2net"
+FAMILY_ISNET = "isnet"
+_CUSTOM_SESSIONS = {FAMILY_U2NET: "u2net_custom", FAMILY_ISNET: "dis_custom"}
+
+
+class ModelSpec:
+    """A segmentation model and where its weights live.
+
+    Attributes:
+        name: Model name used in requests and cache keys.
+        file_name: ONNX file name inside the registry's model directory.
+        family: Architecture family (``"u2net"`` or ``"isnet"``); decides
+            the rembg session that loads the file from a path.
+        input_side: Edge of the square model input (pixels).
+        description: Short human-readable summary.
+        path: Explicit ONNX file path (None = ``file_name`` in the model
+            directory).
+    """
+
+    __slots__ = ("name", "file_name", "family", "input_side", "description", "path")
+
+    def __init__(
+        self,
+        name: str,
+        file_name: str,
+        family: str = FAMILY_U2NET,
+        input_side: int = 320,
+        description: str = "",
+        path: Optional[str] = None,
+    ) -> None:
+        if family not in _CUSTOM_SESSIONS:
+            raise ValueError(f"Unknown model family {family!r} (expected one of {', '.join(_CUSTOM_SESSIONS)})")
+        self.name = name
+        self.file_name = file_name
+        self.family = family
+        self.input_side = input_side
+        self.description = description
+        self.path = path
+
+    def __repr__(self) -> str:
+        return f"ModelSpec({self.name!r}, family={self.family!r}, input_side={self.input_side})"
+
+
+# The rembg models this application knows how to batch and describe
+BUILTIN_MODELS: Dict[str, ModelSpec] = {
+    spec.name: spec for spec in (
+        ModelSpec("u2netp", "u2netp.onnx", description="Lightweight U2-Net, fastest (4.7 MB)"),
+        ModelSpec("u2net", "u2net.onnx", description="General-purpose U2-Net (176 MB)"),
+        ModelSpec("silueta", "silueta.onnx", description="U2-Net pruned to 43 MB"),
+        ModelSpec("u2net_human_seg", "u2net_human_seg.onnx", description="U2-Net trained on people"),
+        ModelSpec("isnet-general-use", "isnet-general-use.onnx", FAMILY_ISNET, 1024,
+                  "IS-Net, highest quality at 1024 px"),
+        ModelSpec("isnet-anime", "isnet-anime.onnx", FAMILY_ISNET, 1024, "IS-Net for anime characters"),
+    )
+}
+
+
+def default_model_dir() -> str:
+    """Return the directory rembg keeps its models in (``U2NET_HOME``, else ``~/.u2net``)."""
+    home = os.environ.get("U2NET_HOME") or os.path.join(os.environ.get("XDG_DATA_HOME", "~"), ".u2net")
+    return os.path.abspath(os.path.expanduser(home))
+
+
+class ModelRegistry:
+    """Segmentation models available to the rembg backend.
+
+    Built-in models are looked up as ``<name>.onnx`` in ``model_dir`` or
+    in rembg's download layout below it (``models/<name>/<name>.onnx``),
+    and any other local ONNX file can be registered under a name. With
+    ``local_only`` every model is loaded straight from its file and a
+    missing file is an error; otherwise rembg may download built-in
+    models into ``model_dir`` on first use.
+
+    Speed/quality tiers (``"fast"``, ``"balanced"``, ``"best"``) can be
+    used wherever a model name is expected.
+
+    Attributes:
+        model_dir: Directory holding the model files.
+        local_only: Never download; load models only from local files.
+    """
+
+    __slots__ = ("model_dir", "local_only", "_custom")
+
+    def __init__(self, model_dir: Optional[str] = None, local_only: bool = False) -> None:
+        self.model_dir = os.path.abspath(os.path.expanduser(model_dir)) if model_dir else default_model_dir()
+        self.local_only = local_only
+        self._custom: Dict[str, ModelSpec] = {}
+
+    def __repr__(self) -> str:
+        return f"ModelRegistry({self.model_dir!r}, local_only={self.local_only}, custom={sorted(self._custom)})"
+
+    def register(
+        self,
+        name: str,
+        path: str,
+        family: str = FAMILY_U2NET,
+        input_side: int = 320,
+        description: str = "",
+    ) -> ModelSpec:
+        """Register a local ONNX file as a model.
+
+        Args:
+            name: Model name to request it by (may shadow a built-in).
+            path: ONNX file path.
+            family: Architecture family (``"u2net"`` or ``"isnet"``).
+            input_side: Edge of the square model input (pixels).
+            description: Short human-readable summary.
+
+        Returns:
+            The registered spec.
+
+        Raises:
+            FileNotFoundError: If ``path`` does not exist.
+        """
+        path = os.path.abspath(os.path.expanduser(path))
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Model file not found: {path}")
+        spec = ModelSpec(name, os.path.basename(path), family, input_side, description, path)
+        self._custom[name] = spec
+        return spec
+
+    def resolve(self, name: str) -> str:
+        """Map a speed/quality tier to its model name (other names pass through)."""
+        return TIERS.get(name, name)
+
+    def spec(self, name: str) -> Optional[ModelSpec]:
+        """Return the spec of a model or tier (None for models unknown here)."""
+        name = self.resolve(name)
+        return self._custom.get(name) or BUILTIN_MODELS.get(name)
+
+    def model_path(self, name: str) -> Optional[str]:
+        """Return the ONNX file path of a model (None for models unknown here).
+
+        Built-in models are found where rembg downloads them
+        (``<model_dir>/models/<name>/<file>``, checked first, as rembg
+        does) or directly in ``model_dir``; when neither exists, the path
+        directly in ``model_dir`` is returned.
+        """
+        spec = self.spec(name)
+        if spec is None:
+            return None
+        if spec.path:
+            return spec.path
+        downloaded = os.path.join(self.model_dir, "models", spec.name, spec.file_name)
+        if os.path.isfile(downloaded):
+            return downloaded
+        return os.path.join(self.model_dir, spec.file_name)
+
+    def is_local(self, name: str) -> bool:
+        """Whether a model's file is present locally."""
+        path = self.model_path(name)
+        return path is not None and os.path.isfile(path)
+
+    def models(self) -> List[str]:
+        """Return the names of all known models (built-in and registered)."""
+        return sorted(set(BUILTIN_MODELS) | set(self._custom))
+
+    def available(self) -> List[str]:
+        """Return the names of the models whose files are present locally."""
+        return [name for name in self.models() if self.is_local(name)]
+
+    def session_args(self, name: str) -> Tuple[str, Dict[str, Any]]:
+        """Return the rembg ``new_session`` arguments that load a model.
+
+        Registered models, and every model in ``local_only`` mode, are
+        loaded through rembg's custom sessions from their file path.
+        Other built-in models are requested by name (rembg looks in
+        ``model_dir`` first).
+
+        Returns:
+            ``(session_name, kwargs)``.
+
+        Raises:
+            FileNotFoundError: In ``local_only`` mode, if the model is
+                unknown or its file is missing.
+        """
+        name = self.resolve(name)
+        spec = self.spec(name)
+        if self.local_only or name in self._custom:
+            path = self.model_path(name)
+            if spec is None or not os.path.isfile(path):
+                raise FileNotFoundError(f"No local model file for {name!r} (looked in {self.model_dir})")
+            return _CUSTOM_SESSIONS[spec.family], {"model_path": path}
+        return name, {}
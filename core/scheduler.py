@@ -0,0 +1,305 @@
+"""Job scheduler — prioritized processing jobs with per-job handles."""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Job priorities (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# Default number of scheduler worker threads
+DEFAULT_SCHEDULER_WORKERS = 2
+
+
+class JobHandle:
+    """Handle of a submitted job — status, cancellation and result.
+
+    Every job has its own cancel event, so cancelling one job never
+    affects another. The job function receives its handle and is
+    expected to poll :attr:`cancel_event` at convenient points.
+
+    Attributes:
+        job_id: Unique id within the scheduler.
+        name: Human-readable job name.
+        priority: Job priority (lower runs first).
+        cancel_event: Set when cancellation is requested.
+        future: Future holding the job's return value or exception.
+        submitted_at: Submission time (epoch seconds).
+        started_at: Start time, or None while queued.
+        finished_at: End time, or None while unfinished.
+    """
+
+    __slots__ = (
+        "job_id", "name", "priority", "cancel_event", "future",
+        "submitted_at", "started_at", "finished_at", "_status",
+    )
+
+    def __init__(self, job_id: int, name: str, priority: int) -> None:
+        self.job_id = job_id
+        self.name = name
+        self.priority = priority
+        self.cancel_event = threading.Event()
+        self.future: Future = Future()
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._status = JOB_QUEUED
+
+    @property
+    def status(self) -> str:
+        """Current job state (one of the ``JOB_*`` constants)."""
+        if self.future.cancelled():
+            return JOB_CANCELLED
+        return self._status
+
+    @property
+    def is_background(self) -> bool:
+        """Whether the job runs at batch (background) priority."""
+        return self.priority >= PRIORITY_BATCH
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Check whether cancellation of this job has been requested."""
+        return self.cancel_event.is_set()
+
+    def cancel(self) -> bool:
+        """Request cancellation of this job.
+
+        A queued job is dropped without running; a running job sees its
+        cancel event and stops at its next check.
+
+        Returns:
+            True if the job had not finished yet.
+        """
+        if self.future.done():
+            return False
+        self.cancel_event.set()
+        if self.future.cancel():
+            try:
+                # Wakes waiters right away instead of when a worker dequeues the job
+                self.future.set_running_or_notify_cancel()
+            except RuntimeError:
+                pass  # A worker already did
+            logger.info("Job cancelled before start: %s", self.name)
+        else:
+            logger.info("Job cancellation requested: %s", self.name)
+        return True
+
+    def done(self) -> bool:
+        """Whether the job has finished (including failed or cancelled)."""
+        return self.future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes.
+
+        Returns:
+            True if the job finished within ``timeout``.
+        """
+        done, _ = wait([self.future], timeout=timeout)
+        return bool(done)
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Return the job's result, re-raising its exception if it failed."""
+        return self.future.result(timeout=timeout)
+
+    def __repr__(self) -> str:
+        return f"JobHandle({self.job_id}, {self.name!r}, priority={self.priority}, status={self.status})"
+
+
+class JobScheduler:
+    """Runs jobs on a small thread pool in priority order.
+
+    Interactive jobs (:data:`PRIORITY_INTERACTIVE`) always run before
+    queued batch jobs (:data:`PRIORITY_BATCH`), and at most
+    ``background_slots`` batch jobs run at once, so at least one worker
+    is free for interactive work while a long batch is running. Jobs of
+    equal priority run in submission order. Worker threads are started
+    on first use.
+
+    Attributes:
+        workers: Number of worker threads.
+        background_slots: Maximum number of batch jobs running at once.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_SCHEDULER_WORKERS,
+        background_slots: Optional[int] = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        if background_slots is None:
+            background_slots = self.workers - 1
+        self.background_slots = max(1, min(background_slots, self.workers))
+        self._queue: list = []
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._active: Dict[int, JobHandle] = {}
+        self._running_background = 0
+        self._ids = itertools.count(1)
+        self._shutdown = False
+        self._stats = {"submitted": 0, JOB_DONE: 0, JOB_FAILED: 0, JOB_CANCELLED: 0}
+
+    def submit(
+        self,
+        fn: Callable[[JobHandle], Any],
+        priority: int = PRIORITY_BATCH,
+        name: Optional[str] = None,
+    ) -> JobHandle:
+        """Queue a job.
+
+        Args:
+            fn: Job function; called with the job's :class:`JobHandle`.
+            priority: Job priority (lower runs first).
+            name: Job name for logs and status displays.
+
+        Returns:
+            The job's handle.
+
+        Raises:
+            RuntimeError: If the scheduler has been shut down.
+        """
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Scheduler has been shut down.")
+            job_id = next(self._ids)
+            handle = JobHandle(job_id, name or f"job-{job_id}", priority)
+            self._active[job_id] = handle
+            heapq.heappush(self._queue, (priority, job_id, handle, fn))
+            self._stats["submitted"] += 1
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            self._cond.notify_all()
+        logger.debug("Job queued: %s (priority %d)", handle.name, priority)
+        return handle
+
+    def jobs(self) -> List[JobHandle]:
+        """Return the handles of queued and running jobs, oldest first."""
+        with self._cond:
+            return [h for h in self._active.values() if not h.future.cancelled()]
+
+    def cancel_all(self) -> int:
+        """Cancel every queued and running job.
+
+        Returns:
+            Number of jobs that were cancelled.
+        """
+        return sum(1 for handle in self.jobs() if handle.cancel())
+
+    def shutdown(self, cancel: bool = True, join: bool = False) -> None:
+        """Stop accepting jobs and let the workers exit once the queue is empty.
+
+        Without ``cancel`` the queued jobs still run — batch jobs waiting
+        for a background slot included — so every handle resolves.
+
+        Args:
+            cancel: Cancel queued and running jobs first.
+            join: Block until the worker threads have exited.
+        """
+        if cancel:
+            self.cancel_all()
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if join:
+            for thread in threads:
+                thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        """Return job counters and current queue sizes."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["running"] = sum(1 for h in self._active.values() if h.status == JOB_RUNNING)
+            stats["queued"] = sum(1 for h in self._active.values() if h.status == JOB_QUEUED)
+            return stats
+
+    # ==================== WORKERS ====================
+
+    def _take(self) -> Optional[tuple]:
+        """Pop the next runnable job, or None (lock must be held)."""
+        while self._queue:
+            _, job_id, handle, fn = self._queue[0]
+            if handle.future.cancelled():
+                heapq.heappop(self._queue)
+                self._finish(handle)
+                continue
+            if handle.is_background and self._running_background >= self.background_slots:
+                return None
+            heapq.heappop(self._queue)
+            try:
+                started = handle.future.set_running_or_notify_cancel()
+            except RuntimeError:
+                started = False  # Cancelled in between
+            if not started:
+                self._finish(handle)
+                continue
+            if handle.is_background:
+                self._running_background += 1
+            handle._status = JOB_RUNNING
+            handle.started_at = time.time()
+            return handle, fn
+        return None
+
+    def _finish(self, handle: JobHandle) -> None:
+        """Forget a finished job and count it (lock must be held)."""
+        if self._active.pop(handle.job_id, None) is not None:
+            self._stats[handle.status] += 1
+
+    def _worker(self) -> None:
+        """Worker thread loop."""
+        while True:
+            with self._cond:
+                entry = self._take()
+                while entry is None:
+                    # Jobs queued behind a background slot still run
+                    if self._shutdown and not self._queue:
+                        return
+                    self._cond.wait()
+                    entry = self._take()
+            handle, fn = entry
+            result, error = self._run(handle, fn)
+            with self._cond:
+                if handle.is_background:
+                    self._running_background -= 1
+                self._finish(handle)
+                self._cond.notify_all()
+            # Settle the future last so waiters see the final counters
+            if error is not None:
+                handle.future.set_exception(error)
+            else:
+                handle.future.set_result(result)
+
+    @staticmethod
+    def _run(handle: JobHandle, fn: Callable[[JobHandle], Any]) -> tuple:
+        """Run a job and record its final state.
+
+        Returns:
+            ``(result, exception)`` — one of the two is None.
+        """
+        try:
+            result = fn(handle)
+        except BaseException as e:  # A worker that died here would hold its background slot forever
+            logger.error("Job failed: %s: %s", handle.name, e)
+            handle._status = JOB_FAILED
+            handle.finished_at = time.time()
+            return None, e
+        handle._status = JOB_CANCELLED if handle.is_cancelled else JOB_DONE
+        handle.finished_at = time.time()
+        return result, None
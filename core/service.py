@@ -0,0 +1,497 @@
+"""HTTP service — background removal for other applications on the network."""
+
+import io
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image
+
+from core.image_processor import DEFAULT_MODEL, ImageProcessor
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Default listen address
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Default number of warm processors and of requests allowed to wait for one
+DEFAULT_SERVICE_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 16
+
+# Largest accepted upload (bytes)
+DEFAULT_MAX_BODY_BYTES = 50 * 1024 * 1024
+
+# Seconds a request may wait for its result before the server answers 504
+DEFAULT_REQUEST_TIMEOUT = 120.0
+
+# Response formats: query value -> (Pillow format, content type)
+RESPONSE_FORMATS = {"png": ("PNG", "image/png"), "webp": ("WEBP", "image/webp")}
+
+# Output modes: the cut-out (RGBA) or the mask alone (L)
+MODE_CUTOUT = "cutout"
+MODE_MASK = "mask"
+
+# Number of recent requests kept for latency percentiles
+_LATENCY_WINDOW = 1000
+
+# Seconds suggested to clients in the Retry-After header of 429 responses
+_RETRY_AFTER = 1
+
+# How often the server loop checks for shutdown (seconds)
+_SHUTDOWN_POLL = 0.1
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the request queue is at capacity."""
+
+
+class _HTTPError(Exception):
+    """Request error carrying the HTTP status to answer with."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _Task:
+    """A queued request waiting for a worker."""
+
+    __slots__ = ("image", "mode", "max_inference_side", "future", "queued_at")
+
+    def __init__(self, image: Image.Image, mode: str, max_inference_side: Optional[int]) -> None:
+        self.image = image
+        self.mode = mode
+        self.max_inference_side = max_inference_side
+        self.future: Future = Future()
+        self.queued_at = time.perf_counter()
+
+
+class WorkerPool:
+    """Pool of warm processors fed from a bounded queue.
+
+    Each worker thread owns one :class:`ImageProcessor`, so model
+    sessions are never shared between concurrent requests. At most
+    ``queue_size`` requests wait for a free worker; further submissions
+    are rejected immediately instead of piling up.
+
+    Attributes:
+        workers: Number of worker threads (and processors).
+        queue_size: Maximum number of waiting requests.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_SERVICE_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        model_name: str = DEFAULT_MODEL,
+        processor_factory: Optional[Callable[[], ImageProcessor]] = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self._factory = processor_factory or (lambda: ImageProcessor(model_name))
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        self._threads: List[threading.Thread] = []
+        self._processors: List[ImageProcessor] = []
+        self._lock = threading.Lock()
+        self._ready = 0
+        self._busy = 0
+        self._closed = False
+
+    def start(self) -> None:
+        """Create the processors and start the workers (each warms its model)."""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                processor = self._factory()
+                thread = threading.Thread(
+                    target=self._worker, args=(processor,), name=f"service-worker-{index}", daemon=True,
+                )
+                self._processors.append(processor)
+                self._threads.append(thread)
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def ready_workers(self) -> int:
+        """Number of workers whose model is loaded."""
+        with self._lock:
+            return self._ready
+
+    def submit(
+        self,
+        image: Image.Image,
+        mode: str = MODE_CUTOUT,
+        max_inference_side: Optional[int] = None,
+    ) -> Future:
+        """Queue an image.
+
+        Args:
+            image: Decoded input image.
+            mode: :data:`MODE_CUTOUT` or :data:`MODE_MASK`.
+            max_inference_side: Longest side of the image fed to the model.
+
+        Returns:
+            Future resolving to ``(result_image, queue_wait_seconds)``.
+
+        Raises:
+            QueueFullError: If ``queue_size`` requests are already waiting.
+            RuntimeError: If the pool has been closed.
+        """
+        if self._closed:
+            raise RuntimeError("Worker pool has been closed.")
+        task = _Task(image, mode, max_inference_side)
+        try:
+            self._queue.put_nowait(task)
+        except queue.Full:
+            raise QueueFullError("Request queue is full.") from None
+        return task.future
+
+    def _worker(self, processor: ImageProcessor) -> None:
+        """Worker thread loop."""
+        processor.warm_up(dummy_inference=True)
+        with self._lock:
+            self._ready += 1
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            wait = time.perf_counter() - task.queued_at
+            with self._lock:
+                self._busy += 1
+            try:
+                mask = processor.compute_mask(task.image, max_inference_side=task.max_inference_side)
+                result = mask if task.mode == MODE_MASK else processor.apply_mask(task.image, mask)
+                task.future.set_result((result, wait))
+            except Exception as e:
+                task.future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return worker and queue occupancy."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "ready_workers": self._ready,
+                "busy_workers": self._busy,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self.queue_size,
+            }
+
+    def close(self) -> None:
+        """Fail waiting requests, stop the workers and release the models."""
+        self._closed = True
+        while True:
+            try:
+                task = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if task is not None and task.future.set_running_or_notify_cancel():
+                task.future.set_exception(RuntimeError("Service is shutting down."))
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        for processor in self._processors:
+            processor.close()
+        logger.info("Worker pool closed.")
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    """Threading HTTP server that knows its :class:`BackgroundRemovalService`."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: "BackgroundRemovalService") -> None:
+        self.service = service
+        super().__init__(address, _RequestHandler)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Routes HTTP requests to the service."""
+
+    server_version = "BgRemover/2.1"
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        service = self.server.service
+        if path == "/health":
+            health = service.health()
+            self._send_json(200 if health["status"] == "ok" else 503, health)
+        elif path == "/metrics":
+            self._send_json(200, service.metrics())
+        else:
+            self._send_error(404, f"Unknown endpoint: {path}")
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        modes = {"/remove": MODE_CUTOUT, "/mask": MODE_MASK}
+        if url.path not in modes:
+            self._send_error(404, f"Unknown endpoint: {url.path}")
+            return
+        status, headers, body = self.server.service.handle_upload(
+            modes[url.path], parse_qs(url.query), self.headers, self.rfile,
+        )
+        self._send(status, headers, body)
+
+    # ==================== RESPONSES ====================
+
+    def _send(self, status: int, headers: Dict[str, str], body: bytes) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        self._send(status, {"Content-Type": "application/json"}, json.dumps(payload).encode("utf-8"))
+
+    def _send_error(self, status: int, message: str) -> None:
+        self.server.service.count(status)
+        self._send_json(status, {"error": message})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class BackgroundRemovalService:
+    """HTTP front end over a :class:`WorkerPool`.
+
+    Endpoints:
+        ``POST /remove``: body = image file; returns the cut-out.
+        ``POST /mask``: body = image file; returns the grayscale mask.
+        ``GET /health``: 200 once a worker's model is loaded, else 503.
+        ``GET /metrics``: request counters, latencies and queue occupancy.
+
+    Upload endpoints accept the query parameters ``format`` (png/webp),
+    ``quality`` (WebP, 1-100; lossless if omitted) and ``max_side``.
+    When every worker is busy and the queue is full the request is
+    answered ``429 Too Many Requests`` with ``Retry-After`` at once, so
+    clients back off instead of timing out.
+
+    Attributes:
+        pool: Worker pool running the requests.
+        max_body_bytes: Largest accepted upload.
+        request_timeout: Seconds to wait for a result before answering 504.
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        pool: Optional[WorkerPool] = None,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ) -> None:
+        self.pool = pool or WorkerPool()
+        self.max_body_bytes = max_body_bytes
+        self.request_timeout = request_timeout
+        self._httpd = _HTTPServer((host, port), self)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._status_counts: Dict[int, int] = {}
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._queue_waits: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Bound ``(host, port)`` (useful with port 0)."""
+        return self._httpd.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        """Base URL of the service."""
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self) -> threading.Thread:
+        """Start the workers and serve on a background thread."""
+        self.pool.start()
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever, args=(_SHUTDOWN_POLL,), name="http-service", daemon=True,
+            )
+            self._thread.start()
+            logger.info("Service listening on %s", self.url)
+        return self._thread
+
+    def serve_forever(self) -> None:
+        """Start the workers and serve on the calling thread until :meth:`shutdown`."""
+        self.pool.start()
+        logger.info("Service listening on %s", self.url)
+        self._httpd.serve_forever(_SHUTDOWN_POLL)
+
+    def shutdown(self) -> None:
+        """Stop serving, then stop the workers."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self.pool.close()
+        logger.info("Service stopped.")
+
+    # ==================== REQUESTS ====================
+
+    def handle_upload(
+        self, mode: str, params: Dict[str, List[str]], headers: Any, body: Any,
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Process an upload request.
+
+        Args:
+            mode: :data:`MODE_CUTOUT` or :data:`MODE_MASK`.
+            params: Parsed query parameters.
+            headers: Request headers.
+            body: Readable request body.
+
+        Returns:
+            ``(status, headers, body)`` of the response.
+        """
+        started = time.perf_counter()
+        try:
+            options = self._parse_options(params)
+            image = self._read_image(headers, body)
+        except _HTTPError as e:
+            return self._error(e.status, str(e))
+
+        try:
+            future = self.pool.submit(image, mode, options["max_side"])
+        except QueueFullError as e:
+            response = self._error(429, str(e))
+            response[1]["Retry-After"] = str(_RETRY_AFTER)
+            return response
+        except RuntimeError as e:
+            return self._error(503, str(e))
+
+        try:
+            result, wait = future.result(timeout=self.request_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            return self._error(504, "Processing timed out.")
+        except Exception as e:
+            logger.error("Request failed: %s", e)
+            return self._error(500, f"Processing failed: {e}")
+
+        file_format, content_type = RESPONSE_FORMATS[options["format"]]
+        save_options: Dict[str, Any] = {}
+        if file_format == "WEBP":
+            quality = options["quality"]
+            save_options = {"lossless": True} if quality is None else {"quality": quality}
+        buffer = io.BytesIO()
+        result.save(buffer, file_format, **save_options)
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._latencies.append(elapsed)
+            self._queue_waits.append(wait)
+        self.count(200)
+        return 200, {
+            "Content-Type": content_type,
+            "X-Processing-Time": f"{elapsed:.4f}",
+            "X-Queue-Wait": f"{wait:.4f}",
+        }, buffer.getvalue()
+
+    @staticmethod
+    def _parse_options(params: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Validate the upload query parameters."""
+        def single(name: str) -> Optional[str]:
+            values = params.get(name)
+            return values[-1] if values else None
+
+        file_format = (single("format") or "png").lower()
+        if file_format not in RESPONSE_FORMATS:
+            raise _HTTPError(400, f"Unsupported format: {file_format}")
+        options: Dict[str, Any] = {"format": file_format, "quality": None, "max_side": None}
+        for name, low, high in (("quality", 1, 100), ("max_side", 16, 100_000)):
+            value = single(name)
+            if value is None:
+                continue
+            try:
+                options[name] = int(value)
+            except ValueError:
+                raise _HTTPError(400, f"{name} must be an integer") from None
+            if not low <= options[name] <= high:
+                raise _HTTPError(400, f"{name} must be between {low} and {high}")
+        return options
+
+    def _read_image(self, headers: Any, body: Any) -> Image.Image:
+        """Read and decode the request body."""
+        try:
+            length = int(headers.get("Content-Length", ""))
+        except ValueError:
+            raise _HTTPError(411, "Content-Length is required.") from None
+        if length <= 0:
+            raise _HTTPError(400, "Empty request body.")
+        if length > self.max_body_bytes:
+            raise _HTTPError(413, f"Upload exceeds {self.max_body_bytes} bytes.")
+        data = body.read(length)
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.load()
+        except Exception:
+            raise _HTTPError(400, "Body is not a supported image.") from None
+        return image
+
+    def _error(self, status: int, message: str) -> Tuple[int, Dict[str, str], bytes]:
+        self.count(status)
+        return status, {"Content-Type": "application/json"}, json.dumps({"error": message}).encode("utf-8")
+
+    # ==================== METRICS ====================
+
+    def count(self, status: int) -> None:
+        """Count a response by status code."""
+        with self._lock:
+            self._status_counts[status] = self._status_counts.get(status, 0) + 1
+
+    def health(self) -> Dict[str, Any]:
+        """Return the readiness of the service."""
+        ready = self.pool.ready_workers
+        return {"status": "ok" if ready else "starting", "ready_workers": ready, "workers": self.pool.workers}
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return request counters, latency percentiles and pool occupancy.
+
+        Latencies are in seconds over the last completed requests.
+        """
+        with self._lock:
+            counts = dict(self._status_counts)
+            latencies = sorted(self._latencies)
+            waits = list(self._queue_waits)
+        metrics: Dict[str, Any] = {
+            "uptime": round(time.time() - self._started_at, 1),
+            "requests": sum(counts.values()),
+            "responses": {str(status): n for status, n in sorted(counts.items())},
+            "rejected": counts.get(429, 0),
+            "latency": {
+                "avg": round(sum(latencies) / len(latencies), 4) if latencies else None,
+                "p50": _percentile(latencies, 0.50),
+                "p95": _percentile(latencies, 0.95),
+                "max": round(latencies[-1], 4) if latencies else None,
+            },
+            "queue_wait_avg": round(sum(waits) / len(waits), 4) if waits else None,
+        }
+        metrics.update(self.pool.stats())
+        return metrics
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    """Return a nearest-rank percentile of sorted values."""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return round(ordered[index], 4)
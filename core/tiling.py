@@ -0,0 +1,92 @@
+"""Tiling helpers — overlapping tile grids and feathered mask blending."""
+
+from typing import List, Tuple
+
+import numpy as np
+
+# Default tile edge and overlap for tiled inference (pixels)
+DEFAULT_TILE_SIZE = 1024
+DEFAULT_TILE_OVERLAP = 128
+
+# Longest side of the low-res global pass that keeps tiles consistent
+DEFAULT_GLOBAL_SIDE = 1024
+
+# (left, top, right, bottom) box plus overlap with the previous tile in x and y
+Tile = Tuple[Tuple[int, int, int, int], int, int]
+
+
+def _tile_starts(length: int, tile_size: int, step: int) -> List[int]:
+    """Return tile start offsets along one axis; the last tile ends at ``length``."""
+    if length <= tile_size:
+        return [0]
+    starts = list(range(0, length - tile_size + 1, step))
+    if starts[-1] + tile_size < length:
+        starts.append(length - tile_size)
+    return starts
+
+
+def compute_tiles(
+    width: int,
+    height: int,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    overlap: int = DEFAULT_TILE_OVERLAP,
+) -> List[Tile]:
+    """Split an image area into overlapping tiles, in raster order.
+
+    Args:
+        width: Image width.
+        height: Image height.
+        tile_size: Tile edge length.
+        overlap: Minimum overlap between neighbouring tiles.
+
+    Returns:
+        List of ``(box, overlap_x, overlap_y)`` where ``box`` is
+        ``(left, top, right, bottom)`` and the overlaps are measured
+        against the tile to the left and the tile above (0 for the
+        first column / row).
+    """
+    overlap = max(0, min(overlap, tile_size // 2))
+    step = max(1, tile_size - overlap)
+    xs = _tile_starts(width, tile_size, step)
+    ys = _tile_starts(height, tile_size, step)
+
+    tiles: List[Tile] = []
+    for row, y in enumerate(ys):
+        bottom = min(y + tile_size, height)
+        overlap_y = min(ys[row - 1] + tile_size, height) - y if row else 0
+        for col, x in enumerate(xs):
+            right = min(x + tile_size, width)
+            overlap_x = min(xs[col - 1] + tile_size, width) - x if col else 0
+            tiles.append(((x, y, right, bottom), overlap_x, overlap_y))
+    return tiles
+
+
+def _ramp(length: int, overlap: int) -> np.ndarray:
+    """Return a 0→1 weight ramp over the first ``overlap`` samples."""
+    weights = np.ones(length, dtype=np.float32)
+    if overlap > 0:
+        weights[:overlap] = np.arange(1, overlap + 1, dtype=np.float32) / (overlap + 1)
+    return weights
+
+
+def blend_tile(out: np.ndarray, tile_mask: np.ndarray, tile: Tile) -> None:
+    """Feather a tile mask into the output mask in place.
+
+    Tiles must be blended in the raster order of :func:`compute_tiles`:
+    each tile cross-fades linearly into what the tiles to its left and
+    above already wrote, and overwrites the rest of its area. Only the
+    8-bit output is kept at full size.
+
+    Args:
+        out: Full-size uint8 mask (H, W).
+        tile_mask: uint8 mask of the tile area.
+        tile: The tile from :func:`compute_tiles`.
+    """
+    (left, top, right, bottom), overlap_x, overlap_y = tile
+    region = out[top:bottom, left:right]
+    if overlap_x == 0 and overlap_y == 0:
+        region[...] = tile_mask
+        return
+    weight = _ramp(bottom - top, overlap_y)[:, np.newaxis] * _ramp(right - left, overlap_x)[np.newaxis, :]
+    blended = region * (1.0 - weight) + tile_mask * weight
+    region[...] = np.clip(blended + 0.5, 0, 255).astype(np.uint8)
@@ -0,0 +1,163 @@
+"""Per-stage timing records — durations and pixel counts per image, aggregated into percentiles."""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Percentiles reported per stage
+PERCENTILES = (50, 90, 99)
+
+# Most recent samples per stage kept — bounds memory for endless streams
+DEFAULT_MAX_SAMPLES = 500
+
+
+def _megapixels_per_second(pixels: int, seconds: float) -> float:
+    return round(pixels / seconds / 1e6, 2) if seconds > 0 and pixels else 0.0
+
+
+class TimingRecord:
+    """Per-stage durations and pixel counts of processing one image.
+
+    Stages are listed in the order they first ran; recording a stage
+    again adds to its duration and pixel count.
+
+    Attributes:
+        durations: Seconds per stage.
+        pixels: Pixels handled per stage (only stages that work on pixels).
+    """
+
+    __slots__ = ("durations", "pixels")
+
+    def __init__(
+        self,
+        durations: Optional[Dict[str, float]] = None,
+        pixels: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.durations: Dict[str, float] = dict(durations or {})
+        self.pixels: Dict[str, int] = dict(pixels or {})
+
+    def add(self, stage: str, seconds: float, pixels: int = 0) -> None:
+        """Record ``seconds`` spent in ``stage`` on ``pixels`` pixels."""
+        self.durations[stage] = self.durations.get(stage, 0.0) + seconds
+        if pixels:
+            self.pixels[stage] = self.pixels.get(stage, 0) + pixels
+
+    @contextmanager
+    def stage(self, name: str, pixels: int = 0) -> Iterator[None]:
+        """Time the enclosed block as stage ``name`` (recorded even if it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started, pixels)
+
+    @property
+    def total(self) -> float:
+        """Seconds spent in all stages."""
+        return sum(self.durations.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a dictionary.
+
+        Returns:
+            ``{"total", "stages": {stage: {"seconds", "pixels", "megapixels_per_second"}}}``.
+        """
+        stages = {}
+        for stage, seconds in self.durations.items():
+            entry: Dict[str, Any] = {"seconds": round(seconds, 4)}
+            if stage in self.pixels:
+                entry["pixels"] = self.pixels[stage]
+                entry["megapixels_per_second"] = _megapixels_per_second(self.pixels[stage], seconds)
+            stages[stage] = entry
+        return {"total": round(self.total, 4), "stages": stages}
+
+    def summary(self) -> str:
+        """Return one ``stage  12.3 ms`` line per stage, with its megapixels when known."""
+        lines = []
+        for stage, seconds in self.durations.items():
+            line = f"{stage:<10} {seconds * 1000:8.1f} ms"
+            if stage in self.pixels:
+                line += f"  ({self.pixels[stage] / 1e6:.2f} MP)"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        stages = ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in self.durations.items())
+        return f"TimingRecord({stages})"
+
+
+class TimingStats:
+    """Per-stage percentiles over many :class:`TimingRecord` objects.
+
+    Thread-safe: batch stages and concurrent removals add records from
+    several threads.
+
+    Attributes:
+        count: Number of records added.
+        max_samples: Most recent samples kept per stage (None = all).
+    """
+
+    __slots__ = ("count", "max_samples", "_samples", "_lock")
+
+    def __init__(self, max_samples: Optional[int] = DEFAULT_MAX_SAMPLES) -> None:
+        self.count = 0
+        self.max_samples = max_samples
+        self._samples: Dict[str, Deque[Tuple[float, int]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, record: TimingRecord) -> None:
+        """Add one image's stage durations and pixel counts."""
+        with self._lock:
+            self.count += 1
+            for stage, seconds in record.durations.items():
+                samples = self._samples.get(stage)
+                if samples is None:
+                    samples = self._samples[stage] = deque(maxlen=self.max_samples)
+                samples.append((seconds, record.pixels.get(stage, 0)))
+
+    def stages(self) -> List[str]:
+        """Return the recorded stage names, in the order they first appeared."""
+        with self._lock:
+            return list(self._samples)
+
+    def stage_stats(self, stage: str) -> Dict[str, Any]:
+        """Return a stage's sample count, mean, percentiles, maximum and throughput.
+
+        Returns:
+            ``{"count", "mean", "p50", "p90", "p99", "max"}`` in seconds,
+            plus ``"megapixels_per_second"`` for stages that work on
+            pixels; an empty dict for an unknown stage.
+        """
+        with self._lock:
+            samples = list(self._samples.get(stage, ()))
+        if not samples:
+            return {}
+        seconds = np.array([s for s, _ in samples])
+        pixels = sum(p for _, p in samples)
+        stats: Dict[str, Any] = {"count": len(samples), "mean": round(float(seconds.mean()), 4)}
+        for q, value in zip(PERCENTILES, np.percentile(seconds, PERCENTILES)):
+            stats[f"p{q}"] = round(float(value), 4)
+        stats["max"] = round(float(seconds.max()), 4)
+        if pixels:
+            stats["megapixels_per_second"] = _megapixels_per_second(pixels, float(seconds.sum()))
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return ``{"count", "stages": {stage: stage_stats}}``."""
+        return {"count": self.count, "stages": {stage: self.stage_stats(stage) for stage in self.stages()}}
+
+    def summary(self) -> str:
+        """Return one ``stage  p50 … p90 … p99 …`` line per stage (milliseconds)."""
+        lines = []
+        for stage in self.stages():
+            stats = self.stage_stats(stage)
+            percentiles = "  ".join(f"p{q} {stats[f'p{q}'] * 1000:7.1f}" for q in PERCENTILES)
+            lines.append(f"{stage:<10} {percentiles} ms")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"TimingStats(count={self.count}, stages={self.stages()})"
@@ -0,0 +1,132 @@
+"""Pre-inference triage — route images to pass-through, colour keying or the model."""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Routes an image can take
+ROUTE_PASSTHROUGH = "passthrough"
+ROUTE_COLOR_KEY = "color_key"
+ROUTE_MODEL = "model"
+ROUTES = (ROUTE_PASSTHROUGH, ROUTE_COLOR_KEY, ROUTE_MODEL)
+
+# Share of fully transparent pixels that makes an alpha channel "real"
+MIN_TRANSPARENT_FRACTION = 0.01
+
+# Border strip analysed for a flat background (fraction of the short side, min 2 px)
+BORDER_FRACTION = 0.02
+
+# Border pixels within this RGB distance of the dominant colour count as background
+DOMINANT_TOLERANCE = 24.0
+
+# Share of border pixels that must match the dominant colour
+MIN_DOMINANT_FRACTION = 0.97
+
+# Largest per-channel standard deviation of the matching border pixels
+MAX_BORDER_STD = 8.0
+
+
+class TriageDecision:
+    """Route chosen for one image.
+
+    Attributes:
+        route: One of ``ROUTES``.
+        background: Dominant border colour (RGB) for the colour-key route.
+        stats: Measurements the decision was based on.
+    """
+
+    __slots__ = ("route", "background", "stats")
+
+    def __init__(
+        self,
+        route: str,
+        background: Optional[Tuple[int, int, int]] = None,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.route = route
+        self.background = background
+        self.stats: Dict[str, Any] = stats or {}
+
+    def __repr__(self) -> str:
+        return f"TriageDecision({self.route!r}, background={self.background})"
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def transparent_fraction(image: Image.Image) -> float:
+    """Return the share of fully transparent pixels (0 for images without alpha)."""
+    if not _has_alpha(image):
+        return 0.0
+    if image.mode not in ("RGBA", "LA", "PA"):
+        image = image.convert("RGBA")  # Palette or colour-key transparency
+    histogram = image.getchannel("A").histogram()
+    return histogram[0] / max(1, image.width * image.height)
+
+
+def border_pixels(image: Image.Image, fraction: float = BORDER_FRACTION) -> np.ndarray:
+    """Return the RGB pixels of a strip around the image edges as an (N, 3) array."""
+    width, height = image.size
+    strip = max(2, round(min(width, height) * fraction))
+    strip = min(strip, height // 2 or 1, width // 2 or 1)
+    inner = max(strip, height - strip)
+    # Only the strips are converted, not the whole image
+    boxes = [
+        (0, 0, width, strip),
+        (0, height - strip, width, height),
+        (0, strip, strip, inner),
+        (width - strip, strip, width, inner),
+    ]
+    return np.concatenate([np.asarray(image.crop(box).convert("RGB")).reshape(-1, 3) for box in boxes])
+
+
+def flat_background(
+    image: Image.Image,
+    tolerance: float = DOMINANT_TOLERANCE,
+    min_fraction: float = MIN_DOMINANT_FRACTION,
+    max_std: float = MAX_BORDER_STD,
+) -> Tuple[Optional[Tuple[int, int, int]], Dict[str, float]]:
+    """Detect a flat, single-colour background from the border pixels.
+
+    Returns:
+        ``(colour, stats)`` — the dominant border colour if the border
+        is flat enough (else None), with the matched fraction and the
+        largest channel standard deviation.
+    """
+    border = border_pixels(image).astype(np.float32)
+    dominant = np.median(border, axis=0)
+    distance = np.sqrt(((border - dominant) ** 2).sum(axis=1))
+    matching = border[distance <= tolerance]
+    fraction = len(matching) / max(1, len(border))
+    std = float(matching.std(axis=0, dtype=np.float64).max()) if len(matching) else float("inf")
+    stats = {"border_fraction": round(fraction, 4), "border_std": round(std, 3)}
+    if fraction >= min_fraction and std <= max_std:
+        colour = tuple(int(round(c)) for c in matching.mean(axis=0, dtype=np.float64))
+        return colour, stats
+    return None, stats
+
+
+def triage(image: Image.Image) -> TriageDecision:
+    """Choose how to produce the mask of an image.
+
+    * Images whose alpha channel already has transparent pixels pass
+      through — their alpha is kept as the cut-out.
+    * Images with a flat border of one dominant colour (packshots on
+      white or a backdrop) are colour keyed (see :mod:`core.keying`).
+    * Everything else goes to the segmentation model.
+    """
+    transparent = transparent_fraction(image)
+    if transparent >= MIN_TRANSPARENT_FRACTION:
+        return TriageDecision(ROUTE_PASSTHROUGH, stats={"transparent_fraction": round(transparent, 4)})
+    colour, stats = flat_background(image)
+    stats["transparent_fraction"] = round(transparent, 4)
+    if colour is not None:
+        return TriageDecision(ROUTE_COLOR_KEY, colour, stats)
+    return TriageDecision(ROUTE_MODEL, stats=stats)
+
+
+def route_counts() -> Dict[str, int]:
+    """Return a zeroed per-route counter."""
+    return {route: 0 for route in ROUTES}
@@ -0,0 +1,273 @@
+"""Hot-folder watcher — continuous background removal of dropped files."""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from core.image_processor import DEFAULT_INFERENCE_BATCH_SIZE, BatchResult, ImageProcessor
+from utils.helpers import IMAGE_EXTENSIONS
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Seconds between directory scans
+DEFAULT_POLL_INTERVAL = 0.5
+
+# Consecutive scans a file must keep the same size and mtime before it is processed
+DEFAULT_STABLE_POLLS = 2
+
+# Name suffix of the files written by the batch machinery
+_OUTPUT_SUFFIX = "_nobg"
+
+# (size, mtime_ns) of a file at one scan
+_Signature = Tuple[int, int]
+
+
+class FolderWatcher:
+    """Watches a directory and removes the background of every new image.
+
+    The directory is polled with :func:`os.scandir`, which returns size
+    and mtime without an extra ``stat`` per file. A file is processed
+    once it has kept the same size and mtime for ``stable_polls``
+    consecutive scans, so files still being copied are skipped until
+    they are complete. Files replaced by new content are processed again.
+
+    Ready files are streamed into a single long-running
+    :meth:`ImageProcessor.iter_process` pipeline, so the model session
+    stays loaded between arrivals and a drop only waits for the next scan.
+
+    Attributes:
+        processor: Processor running the pipeline.
+        input_dir: Watched directory (not recursive).
+        output_dir: Directory receiving the ``<name>_nobg.png`` results.
+        poll_interval: Seconds between scans.
+        stable_polls: Scans with an unchanged size and mtime before a
+            file counts as complete.
+        on_result: Called with each :class:`BatchResult` from the
+            watcher thread.
+        writer: Output writer passed to :meth:`ImageProcessor.iter_process`
+            (None writes ``<name>_nobg.png``).
+
+    With ``process_existing=False``, files already in the directory when
+    the watcher is created are ignored until they change.
+    """
+
+    def __init__(
+        self,
+        processor: ImageProcessor,
+        input_dir: str,
+        output_dir: str,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        stable_polls: int = DEFAULT_STABLE_POLLS,
+        process_existing: bool = True,
+        model_name: Optional[str] = None,
+        max_inference_side: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        inference_batch_size: int = DEFAULT_INFERENCE_BATCH_SIZE,
+        on_result: Optional[Callable[[BatchResult], None]] = None,
+        writer: Optional[Callable[[Image.Image, str], str]] = None,
+    ) -> None:
+        self.processor = processor
+        self.input_dir = os.path.abspath(input_dir)
+        self.output_dir = os.path.abspath(output_dir)
+        self.poll_interval = max(0.01, poll_interval)
+        self.stable_polls = max(1, stable_polls)
+        self.model_name = model_name
+        self.max_inference_side = max_inference_side
+        self.tile_size = tile_size
+        self.inference_batch_size = inference_batch_size
+        self.on_result = on_result
+        self.writer = writer
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # path -> (signature, consecutive scans seen with it)
+        self._pending: Dict[str, Tuple[_Signature, int]] = {}
+        # path -> signature that was queued for processing
+        self._queued: Dict[str, _Signature] = {}
+        # path -> time the current version was first seen (monotonic)
+        self._first_seen: Dict[str, float] = {}
+        self._in_flight = 0
+        self._stats = {"processed": 0, "failed": 0, "scans": 0}
+        self._latency_total = 0.0
+        self._last_latency: Optional[float] = None
+        if not process_existing:
+            self._queued.update(self._list_files())
+
+    # ==================== SCANNING ====================
+
+    def _is_candidate(self, name: str) -> bool:
+        """Check whether a directory entry name looks like a watchable input."""
+        if name.startswith((".", "~")):
+            return False  # Hidden and editor/office temp files
+        if self.output_dir == self.input_dir and os.path.splitext(name)[0].endswith(_OUTPUT_SUFFIX):
+            return False  # Our own results
+        return name.lower().endswith(IMAGE_EXTENSIONS)
+
+    def _list_files(self) -> Dict[str, _Signature]:
+        """Return the signature of every candidate file in the input directory."""
+        files: Dict[str, _Signature] = {}
+        try:
+            with os.scandir(self.input_dir) as entries:
+                for entry in entries:
+                    if not self._is_candidate(entry.name):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # Removed while scanning
+                    files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError as e:
+            logger.warning("Cannot scan watch folder %s: %s", self.input_dir, e)
+        return files
+
+    def scan(self) -> List[str]:
+        """Scan the directory once and return the files that became ready.
+
+        Returned files are marked as queued; they are not returned again
+        unless their content changes.
+
+        Returns:
+            Paths that are complete and not yet processed, oldest first.
+        """
+        files = self._list_files()
+        now = time.monotonic()
+        ready: List[str] = []
+        with self._lock:
+            self._stats["scans"] += 1
+            for stale in set(self._pending) - set(files):
+                del self._pending[stale]
+                self._first_seen.pop(stale, None)
+            for gone in set(self._queued) - set(files):
+                # A file dropped again under the same name is new work
+                del self._queued[gone]
+
+            for path, signature in files.items():
+                if self._queued.get(path) == signature:
+                    continue
+                previous, count = self._pending.get(path, (None, 0))
+                if signature != previous:
+                    self._pending[path] = (signature, 1)
+                    self._first_seen.setdefault(path, now)
+                    count = 1
+                else:
+                    count += 1
+                    self._pending[path] = (signature, count)
+                if count >= self.stable_polls and signature[0] > 0:
+                    del self._pending[path]
+                    self._queued[path] = signature
+                    ready.append(path)
+
+            ready.sort(key=lambda p: self._first_seen.get(p, now))
+            self._in_flight += len(ready)
+        return ready
+
+    def _iter_ready(self) -> Iterator[str]:
+        """Yield ready files until the watcher is stopped."""
+        while not self._stop.is_set():
+            ready = self.scan()
+            if ready:
+                logger.info("Watch folder: %d new file(s)", len(ready))
+            for path in ready:
+                yield path
+            if not ready:
+                self._stop.wait(self.poll_interval)
+
+    # ==================== RUNNING ====================
+
+    def run(self) -> None:
+        """Watch and process until :meth:`stop` is called (blocking).
+
+        Files already queued when the watcher stops are finished before
+        this returns; :meth:`ImageProcessor.cancel` aborts them instead.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        logger.info("Watching %s → %s", self.input_dir, self.output_dir)
+        # Load the model before the first file arrives; the pipeline keeps it in use afterwards
+        self.processor.warm_up([self.model_name or self.processor.model_name], dummy_inference=True)
+
+        results = self.processor.iter_process(
+            self._iter_ready(), self.output_dir,
+            model_name=self.model_name,
+            max_inference_side=self.max_inference_side,
+            tile_size=self.tile_size,
+            inference_batch_size=self.inference_batch_size,
+            writer=self.writer,
+        )
+        for result in results:
+            self._record(result)
+        logger.info("Stopped watching %s", self.input_dir)
+
+    def start(self) -> threading.Thread:
+        """Run the watcher on a background thread.
+
+        Returns:
+            The watcher thread (the running one if already started).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="folder-watcher", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Stop scanning and wait for queued files to finish.
+
+        Args:
+            timeout: Maximum seconds to wait for the watcher thread.
+
+        Returns:
+            True if the watcher thread has exited.
+        """
+        self._stop.set()
+        thread = self._thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the watcher thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _record(self, result: BatchResult) -> None:
+        """Count a finished file and measure its drop-to-output latency."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            seen = self._first_seen.pop(result.input_path, None)
+            if result.ok:
+                self._stats["processed"] += 1
+                if seen is not None:
+                    self._last_latency = time.monotonic() - seen
+                    self._latency_total += self._last_latency
+            else:
+                self._stats["failed"] += 1
+        if result.ok:
+            logger.info("Watch folder: %s → %s", os.path.basename(result.input_path), result.output_path)
+        else:
+            logger.error("Watch folder: %s failed: %s", os.path.basename(result.input_path), result.error)
+        if self.on_result:
+            self.on_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return file counters and the drop-to-output latency.
+
+        Latency is measured from the scan that first saw a file to its
+        written output, so it includes the stability wait.
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+            stats["waiting"] = len(self._pending)
+            processed = self._stats["processed"]
+            stats["avg_latency"] = round(self._latency_total / processed, 3) if processed else None
+            stats["last_latency"] = round(self._last_latency, 3) if self._last_latency is not None else None
+            return stats
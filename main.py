@@ -3,6 +3,8 @@
 
 Usage:
     python main.py
+
+Without a display, use the command-line interface instead (see cli.py).
 """
 
 import sys
@@ -0,0 +1,97 @@
+"""Memory admission tests — header-only estimates and the byte budget."""
+
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from core.admission import IMAGE_OVERHEAD_BYTES, MemoryBudget, estimate_memory
+
+
+@pytest.fixture
+def large_png(tmp_path) -> str:
+    path = str(tmp_path / "large.png")
+    Image.new("RGB", (400, 300)).save(path)
+    return path
+
+
+class TestEstimateMemory:
+    """Header-only estimate tests."""
+
+    def test_estimate(self, large_png: str) -> None:
+        pixels = 400 * 300
+        # Decoded RGB (32-bit pixels) + RGBA copy + RGBA result + mask + full-size inference input
+        assert estimate_memory(large_png) == pixels * (4 + 9 + 4) + IMAGE_OVERHEAD_BYTES
+
+    def test_smaller_inference(self, large_png: str) -> None:
+        assert estimate_memory(large_png, max_inference_side=200) < estimate_memory(large_png)
+        assert estimate_memory(large_png, tile_size=100) < estimate_memory(large_png, max_inference_side=200)
+
+    def test_header_only(self, large_png: str, monkeypatch) -> None:
+        def fail_load(self) -> None:
+            raise AssertionError("pixels decoded")
+
+        monkeypatch.setattr(Image.Image, "load", fail_load)
+        assert estimate_memory(large_png) > 0
+
+    def test_unreadable(self, tmp_path) -> None:
+        path = tmp_path / "broken.png"
+        path.write_bytes(b"junk")
+        assert estimate_memory(str(path)) == 0
+        assert estimate_memory(str(tmp_path / "missing.png")) == 0
+
+
+class TestMemoryBudget:
+    """Byte budget tests."""
+
+    def test_rejects_invalid_budget(self) -> None:
+        with pytest.raises(ValueError):
+            MemoryBudget(0)
+
+    def test_waits_for_release(self) -> None:
+        budget = MemoryBudget(100)
+        assert budget.acquire(60)
+        admitted = threading.Event()
+
+        def second() -> None:
+            budget.acquire(60)
+            admitted.set()
+
+        thread = threading.Thread(target=second)
+        thread.start()
+        assert not admitted.wait(0.1)
+        budget.release(60)
+        assert admitted.wait(5)
+        thread.join()
+        stats = budget.stats()
+        assert stats["peak"] == 60
+        assert stats["waits"] == 1
+        assert stats["wait_time"] >= 0.1
+        assert stats["admitted"] == 2
+
+    def test_oversized_admitted_alone(self) -> None:
+        budget = MemoryBudget(100)
+        assert budget.try_acquire(500)
+        assert not budget.try_acquire(1)
+        budget.release(500)
+        assert budget.try_acquire(1)
+        assert budget.stats()["peak"] == 500
+
+    def test_try_acquire_records_wait(self) -> None:
+        budget = MemoryBudget(100)
+        budget.try_acquire(80)
+        assert not budget.try_acquire(30)
+        time.sleep(0.05)
+        budget.release(80)
+        assert budget.try_acquire(30)
+        assert budget.stats()["waits"] == 1
+        assert budget.stats()["max_wait"] >= 0.05
+
+    def test_cancel(self) -> None:
+        budget = MemoryBudget(100)
+        budget.acquire(100)
+        cancel = threading.Event()
+        cancel.set()
+        assert not budget.acquire(1, cancel)
+        assert budget.stats()["admitted"] == 1
@@ -0,0 +1,93 @@
+"""Animation helper tests — frame reading, keyframe planning, animated export."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.animation import AnimatedCutout, frame_signature, is_animated, plan_keyframes, read_frames
+
+
+def make_gif(path: str, colors: list, durations: list) -> str:
+    frames = [Image.new("RGB", (32, 16), color) for color in colors]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=durations, loop=0)
+    return path
+
+
+class TestReadFrames:
+    """Frame reading tests."""
+
+    def test_frames_and_durations(self, tmp_path) -> None:
+        path = make_gif(str(tmp_path / "a.gif"), [(255, 0, 0), (0, 0, 255), (0, 255, 0)], [50, 120, 80])
+        with Image.open(path) as img:
+            assert is_animated(img)
+            frames, durations = read_frames(img)
+        assert durations == [50, 120, 80]
+        assert [f.mode for f in frames] == ["RGBA"] * 3
+        assert frames[1].getpixel((0, 0))[:3] == (0, 0, 255)
+
+    def test_still_image(self) -> None:
+        img = Image.new("RGB", (8, 8))
+        assert not is_animated(img)
+        frames, durations = read_frames(img)
+        assert len(frames) == 1 and len(durations) == 1
+
+
+class TestPlanKeyframes:
+    """Keyframe planning tests."""
+
+    def test_identical_frames_reuse(self) -> None:
+        same = np.zeros((4, 4), dtype=np.float32)
+        assert plan_keyframes([same, same, same]) == [0, 0, 0]
+
+    def test_changed_frames_become_keyframes(self) -> None:
+        a = np.zeros((4, 4), dtype=np.float32)
+        b = np.full((4, 4), 100, dtype=np.float32)
+        assert plan_keyframes([a, a, b, b, a]) == [0, 0, 2, 2, 4]
+
+    def test_drift_compared_to_keyframe(self) -> None:
+        # Each step is below the threshold, but the drift from the keyframe is not
+        frames = [np.full((4, 4), 1.5 * i, dtype=np.float32) for i in range(4)]
+        assert plan_keyframes(frames, threshold=2.0) == [0, 0, 2, 2]
+
+    def test_zero_threshold_infers_every_frame(self) -> None:
+        a = frame_signature(Image.new("RGB", (100, 100)))
+        b = frame_signature(Image.new("RGB", (100, 100), (1, 1, 1)))
+        assert a.shape == (64, 64)
+        assert plan_keyframes([a, b], threshold=0) == [0, 1]
+
+
+class TestAnimatedCutout:
+    """Animated export tests."""
+
+    @pytest.fixture
+    def cutout(self) -> AnimatedCutout:
+        frames = []
+        for x in (0, 10):
+            frame = Image.new("RGBA", (20, 10), (0, 0, 0, 0))
+            frame.paste((255, 0, 0, 255), (x, 0, x + 10, 10))
+            frames.append(frame)
+        return AnimatedCutout(frames, [70, 140], inferred_frames=1, reused_frames=1)
+
+    def test_save_apng(self, cutout: AnimatedCutout, tmp_path) -> None:
+        path = cutout.save(str(tmp_path / "out.png"))
+        with Image.open(path) as img:
+            assert img.n_frames == 2
+            img.seek(1)
+            assert img.info["duration"] == 140
+            frame = img.convert("RGBA")
+            # The first frame's pixels must not show through
+            assert frame.getpixel((2, 2))[3] == 0
+            assert frame.getpixel((15, 2))[3] == 255
+
+    def test_save_webp(self, cutout: AnimatedCutout, tmp_path) -> None:
+        path = cutout.save(str(tmp_path / "out.webp"))
+        with Image.open(path) as img:
+            assert img.n_frames == 2
+            assert img.convert("RGBA").getpixel((15, 2))[3] == 0
+
+    def test_unsupported_format(self, cutout: AnimatedCutout, tmp_path) -> None:
+        with pytest.raises(ValueError):
+            cutout.save(str(tmp_path / "out.jpg"))
+
+    def test_to_dict(self, cutout: AnimatedCutout) -> None:
+        assert cutout.to_dict() == {"frames": 2, "inferred_frames": 1, "reused_frames": 1}
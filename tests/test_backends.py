@@ -0,0 +1,216 @@
+"""Mask backend tests — capabilities, fake and keying backends, rembg sessions and the registry."""
+
+import os
+
+import numpy as np
+import pytest
+
+import core.backends as backends
+from core.backends import (
+    BACKEND_FAKE, BACKEND_KEYING, BACKEND_REMBG, FakeBackend, KeyingBackend, MaskBackend, RembgBackend,
+    backend_names, create_backend, mask_from_output, register_backend,
+)
+from core.model_registry import ModelRegistry
+
+
+class FakeSession:
+    """Stand-in for a rembg session — remembers how it was created."""
+
+    def __init__(self, session_name: str, **options) -> None:
+        self.session_name = session_name
+        self.options = options
+
+
+def fake_remove(data: np.ndarray, session: FakeSession = None, only_mask: bool = False, **kwargs) -> np.ndarray:
+    """Stand-in for ``rembg.remove`` — keeps bright pixels as foreground."""
+    return np.where(data[..., :3].mean(axis=2) > 127, 255, 0).astype(np.uint8)
+
+
+def _rembg_model_roots() -> list:
+    """Directories rembg 2.0.85 accepts a ``model_path`` in (``rembg_home`` and ``legacy_home``)."""
+    legacy = os.path.expanduser(
+        os.getenv("U2NET_HOME", os.path.join(os.getenv("XDG_DATA_HOME", "~"), ".u2net")),
+    )
+    if os.getenv("U2NET_HOME"):
+        home = legacy
+    else:
+        xdg = os.getenv("XDG_DATA_HOME")
+        home = os.path.expanduser(
+            os.getenv("REMBG_HOME", os.path.join(xdg, "rembg") if xdg else os.path.join("~", ".rembg")),
+        )
+    return [os.path.abspath(home), os.path.abspath(legacy)]
+
+
+def validate_model_path(model_path: str) -> str:
+    """rembg's ``BaseSession.validate_model_path`` (mirrored when rembg is not installed)."""
+    try:
+        from rembg.sessions.base import BaseSession
+    except ImportError:
+        pass
+    else:
+        return BaseSession.validate_model_path(model_path=model_path)
+    path = os.path.abspath(os.path.expanduser(model_path))
+    roots = _rembg_model_roots()
+    if not any(path == root or path.startswith(root + os.sep) for root in roots):
+        raise ValueError(f"model_path must be within the models directory: {roots[0]}")
+    return path
+
+
+@pytest.fixture
+def created_sessions(monkeypatch) -> list:
+    """Replace the lazy rembg imports with stand-ins; return created sessions."""
+    sessions = []
+
+    def fake_new_session(session_name: str, **options) -> FakeSession:
+        # Custom sessions check their model file like rembg's do
+        if "model_path" in options:
+            validate_model_path(options["model_path"])
+        sessions.append(FakeSession(session_name, **options))
+        return sessions[-1]
+
+    monkeypatch.setattr(backends, "_rembg_remove", fake_remove)
+    monkeypatch.setattr(backends, "_rembg_new_session", fake_new_session)
+    return sessions
+
+
+@pytest.fixture
+def half_white() -> np.ndarray:
+    """Left half black, right half white."""
+    array = np.zeros((20, 40, 3), dtype=np.uint8)
+    array[:, 20:] = 255
+    return array
+
+
+class TestFakeBackend:
+    """Deterministic backend tests."""
+
+    def test_bright_pixels_are_foreground(self, half_white: np.ndarray) -> None:
+        mask = FakeBackend().predict_mask(half_white)
+        assert mask.shape == (20, 40) and mask.dtype == np.uint8
+        assert mask[:, :20].max() == 0 and mask[:, 20:].min() == 255
+
+    def test_deterministic(self, half_white: np.ndarray) -> None:
+        first, second = FakeBackend().predict_mask(half_white), FakeBackend().predict_mask(half_white)
+        np.testing.assert_array_equal(first, second)
+
+    def test_batches_in_one_call(self, half_white: np.ndarray) -> None:
+        backend = FakeBackend()
+        masks = backend.predict_masks([half_white, half_white[:10]])
+        assert backend.calls == 1
+        assert backend.input_shapes == [(20, 40, 3), (10, 40, 3)]
+        assert [m.shape for m in masks] == [(20, 40), (10, 40)]
+
+
+class TestKeyingBackend:
+    """Colour keying backend tests."""
+
+    def test_keys_white_background(self) -> None:
+        array = np.full((30, 40, 3), 255, dtype=np.uint8)
+        array[10:20, 10:30] = (200, 30, 30)
+        mask = KeyingBackend().predict_mask(array)
+        assert mask[0, 0] == 0 and mask[15, 20] == 255
+
+    def test_capabilities(self) -> None:
+        assert KeyingBackend().capabilities() == {
+            "supports_batch": False, "only_mask": True, "full_resolution": True, "needs_model": False,
+        }
+
+
+class TestRembgBackend:
+    """Session pool tests with local model files."""
+
+    def test_sessions_pooled_per_model(self, created_sessions: list, half_white: np.ndarray) -> None:
+        backend = RembgBackend()
+        assert backend.get_session("u2net") is backend.get_session("u2net")
+        backend.predict_mask(half_white, "fast")
+        assert [s.session_name for s in created_sessions] == ["u2net", "u2netp"]
+        assert backend.loaded_models == ["u2net", "u2netp"]
+        backend.close()
+        assert backend.loaded_models == []
+
+    def test_tier_shares_session_with_model(self, created_sessions: list) -> None:
+        backend = RembgBackend()
+        assert backend.get_session("best") is backend.get_session("isnet-general-use")
+        assert len(created_sessions) == 1
+
+    def test_local_model_file(self, created_sessions: list, tmp_path, monkeypatch) -> None:
+        monkeypatch.delenv("U2NET_HOME", raising=False)
+        (tmp_path / "silueta.onnx").write_bytes(b"onnx")
+        backend = RembgBackend(ModelRegistry(str(tmp_path), local_only=True))
+        session = backend.get_session("silueta")
+        assert session.session_name == "u2net_custom"
+        assert session.options == {"model_path": os.path.join(str(tmp_path), "silueta.onnx")}
+        assert "U2NET_HOME" not in os.environ
+        with pytest.raises(FileNotFoundError):
+            backend.get_session("u2net")
+
+    def test_registered_model_outside_model_dir(self, created_sessions: list, tmp_path, monkeypatch) -> None:
+        monkeypatch.delenv("U2NET_HOME", raising=False)
+        elsewhere = tmp_path / "elsewhere"
+        elsewhere.mkdir()
+        (elsewhere / "products.onnx").write_bytes(b"onnx")
+        registry = ModelRegistry(str(tmp_path / "models"))
+        registry.register("products", str(elsewhere / "products.onnx"), family="isnet")
+        session = RembgBackend(registry).get_session("products")
+        assert session.session_name == "dis_custom"
+        assert "U2NET_HOME" not in os.environ
+
+    def test_model_path_check(self, tmp_path, monkeypatch) -> None:
+        # Guards the stand-in: a path outside rembg's model directories is refused
+        monkeypatch.setenv("U2NET_HOME", str(tmp_path / "home"))
+        with pytest.raises(ValueError):
+            validate_model_path(str(tmp_path / "elsewhere" / "m.onnx"))
+        assert validate_model_path(str(tmp_path / "home" / "m.onnx")) == str(tmp_path / "home" / "m.onnx")
+
+    def test_model_dir_scoped_to_session_creation(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.delenv("U2NET_HOME", raising=False)
+        seen = []
+
+        def recording_new_session(session_name: str, **options) -> FakeSession:
+            seen.append(os.environ.get("U2NET_HOME"))
+            return FakeSession(session_name, **options)
+
+        monkeypatch.setattr(backends, "_rembg_new_session", recording_new_session)
+        RembgBackend(ModelRegistry(str(tmp_path))).get_session("u2net")
+        assert seen == [str(tmp_path)]
+        assert "U2NET_HOME" not in os.environ
+
+    def test_warm_up(self, created_sessions: list) -> None:
+        backend = RembgBackend()
+        backend.warm_up(["u2netp"], dummy_inference=True)
+        assert backend.loaded_models == ["u2netp"]
+
+
+class TestRegistry:
+    """Backend registry tests."""
+
+    def test_builtin_names(self) -> None:
+        assert {BACKEND_REMBG, BACKEND_KEYING, BACKEND_FAKE} <= set(backend_names())
+        assert isinstance(create_backend(BACKEND_FAKE), FakeBackend)
+
+    def test_unknown_backend(self) -> None:
+        with pytest.raises(ValueError):
+            create_backend("sam")
+
+    def test_register_backend(self, monkeypatch) -> None:
+        monkeypatch.setattr(backends, "_FACTORIES", dict(backends._FACTORIES))
+
+        class EverythingBackend(MaskBackend):
+            name = "everything"
+
+            def predict_mask(self, array, model_name=None):
+                return np.full(array.shape[:2], 255, dtype=np.uint8)
+
+        register_backend("everything", EverythingBackend)
+        assert "everything" in backend_names()
+        backend = create_backend("everything")
+        assert backend.predict_masks([np.zeros((2, 3, 3), dtype=np.uint8)])[0].min() == 255
+
+    @pytest.mark.parametrize("output, expected", [
+        (np.full((2, 2), 7, dtype=np.uint8), 7),
+        (np.dstack([np.zeros((2, 2, 3), dtype=np.uint8), np.full((2, 2), 9, dtype=np.uint8)]), 9),
+        (np.full((2, 2, 3), 5, dtype=np.uint8), 5),
+    ])
+    def test_mask_from_output(self, output: np.ndarray, expected: int) -> None:
+        mask = mask_from_output(output)
+        assert mask.shape == (2, 2) and mask[0, 0] == expected
@@ -0,0 +1,163 @@
+"""BatchPipeline unit tests — stage flow, errors, bounded queues, cancel."""
+
+import threading
+import time
+
+from core.batch_pipeline import BatchPipeline, StageStats
+
+
+def collect(pipeline: BatchPipeline, items) -> list:
+    """Run the pipeline and return (item, result, error) tuples."""
+    results = []
+    pipeline.run(items, lambda item, result, error: results.append((item, result, error)))
+    return results
+
+
+class TestPipelineFlow:
+    """Basic flow tests."""
+
+    def test_stages_applied_in_order(self) -> None:
+        pipeline = BatchPipeline(lambda x: x + 1, lambda x: x * 10, lambda x: f"<{x}>")
+        results = collect(pipeline, range(5))
+        assert sorted(results) == [(i, f"<{(i + 1) * 10}>", None) for i in range(5)]
+
+    def test_multiple_workers(self) -> None:
+        pipeline = BatchPipeline(
+            lambda x: x, lambda x: x, lambda x: x,
+            decode_workers=3, infer_workers=2, encode_workers=4,
+        )
+        results = collect(pipeline, range(50))
+        assert sorted(r[1] for r in results) == list(range(50))
+
+    def test_empty_input(self) -> None:
+        pipeline = BatchPipeline(lambda x: x, lambda x: x, lambda x: x)
+        assert collect(pipeline, []) == []
+
+    def test_error_skips_later_stages(self) -> None:
+        encoded = []
+
+        def infer(x: int) -> int:
+            if x == 2:
+                raise ValueError("bad image")
+            return x
+
+        def encode(x: int) -> int:
+            encoded.append(x)
+            return x
+
+        results = dict((item, error) for item, _, error in collect(
+            BatchPipeline(lambda x: x, infer, encode), range(4),
+        ))
+        assert results[2] == "bad image"
+        assert results[0] is None
+        assert 2 not in encoded
+
+
+class TestPipelineStats:
+    """Stage statistics tests."""
+
+    def test_stats_per_stage(self) -> None:
+        pipeline = BatchPipeline(lambda x: x, lambda x: time.sleep(0.01) or x, lambda x: x)
+        stats = pipeline.run(range(5), lambda *args: None)
+        assert set(stats) == {"decode", "infer", "encode"}
+        assert all(s.items == 5 for s in stats.values())
+        assert stats["infer"].busy_time >= 0.05
+        assert stats["infer"].utilization > stats["decode"].utilization
+
+    def test_utilization_bounds(self) -> None:
+        stats = StageStats("infer", workers=2)
+        assert stats.utilization == 0.0
+        stats.wall_time = 1.0
+        stats.busy_time = 1.0
+        assert stats.utilization == 0.5
+        assert stats.to_dict()["utilization"] == 0.5
+
+
+class TestPipelineBounds:
+    """Bounded queue and cancellation tests."""
+
+    def test_in_flight_items_bounded(self) -> None:
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+
+        def decode(x: int) -> int:
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            return x
+
+        def encode(x: int) -> int:
+            time.sleep(0.005)
+            with lock:
+                state["in_flight"] -= 1
+            return x
+
+        pipeline = BatchPipeline(decode, lambda x: x, encode, queue_depth=2)
+        assert len(collect(pipeline, range(40))) == 40
+        # Two queues of depth 2 plus one item held by each stage worker
+        assert state["peak"] <= 2 * 2 + 3
+
+    def test_cancel_stops_feeding(self) -> None:
+        cancel = threading.Event()
+
+        def infer(x: int) -> int:
+            if x == 3:
+                cancel.set()
+            return x
+
+        pipeline = BatchPipeline(lambda x: x, infer, lambda x: x, queue_depth=1, cancel_event=cancel)
+        results = collect(pipeline, range(1000))
+        assert len(results) < 10
+
+
+class TestBatchedInfer:
+    """Batched infer stage tests."""
+
+    def test_items_grouped_up_to_batch_size(self) -> None:
+        calls = []
+
+        def infer_batch(items: list) -> list:
+            calls.append(len(items))
+            time.sleep(0.01)
+            return [x * 2 for x in items]
+
+        pipeline = BatchPipeline(
+            lambda x: x, lambda x: x * 2, lambda x: x,
+            queue_depth=8, infer_batch=infer_batch, infer_batch_size=4,
+        )
+        results = collect(pipeline, range(20))
+        assert sorted(r[1] for r in results) == [x * 2 for x in range(20)]
+        assert max(calls) <= 4
+        assert len(calls) < 20
+        report = pipeline.stats["infer"].batch_report()
+        assert sum(size * r["batches"] for size, r in report.items()) == 20
+        assert all(r["throughput"] > 0 for r in report.values())
+        assert "batch_sizes" in pipeline.stats["infer"].to_dict()
+
+    def test_batch_failure_retries_items(self) -> None:
+        def infer(x: int) -> int:
+            if x == 3:
+                raise ValueError("bad image")
+            return x
+
+        def infer_batch(items: list) -> list:
+            return [infer(x) for x in items]
+
+        pipeline = BatchPipeline(
+            lambda x: x, infer, lambda x: x,
+            queue_depth=8, infer_batch=infer_batch, infer_batch_size=8,
+        )
+        errors = {item: error for item, _, error in collect(pipeline, range(8))}
+        assert errors[3] == "bad image"
+        assert [item for item, error in errors.items() if error] == [3]
+        # The failed batch is not a call of its own; each retry is one of size 1
+        assert pipeline.stats["infer"].batch_report()[1]["batches"] == 8
+        assert set(pipeline.stats["infer"].batch_report()) == {1}
+
+    def test_batch_size_one_uses_single_infer(self) -> None:
+        pipeline = BatchPipeline(
+            lambda x: x, lambda x: x + 1, lambda x: x,
+            infer_batch=lambda items: 1 / 0, infer_batch_size=1,
+        )
+        assert sorted(r[1] for r in collect(pipeline, range(3))) == [1, 2, 3]
+        assert pipeline.stats["infer"].batches == {}
@@ -0,0 +1,305 @@
+"""Command-line interface tests — input expansion, writers and the batch summary."""
+
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import cli
+import core.backends as backends
+from core.export_manager import ExportManager
+from utils.logger import configure_console
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeSession:
+    """Stand-in for a rembg session."""
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+
+
+def fake_remove(data: np.ndarray, session: FakeSession = None, only_mask: bool = False, **kwargs) -> np.ndarray:
+    """Stand-in for ``rembg.remove`` — keeps bright pixels as foreground."""
+    return np.where(data[..., :3].mean(axis=2) > 127, 255, 0).astype(np.uint8)
+
+
+@pytest.fixture(autouse=True)
+def log_stream(monkeypatch) -> io.StringIO:
+    """Give the CLI's log redirection a stream that outlives the test, then undo it."""
+    stream = io.StringIO()
+    monkeypatch.setattr(sys, "stderr", stream)
+    yield stream
+    configure_console(sys.__stdout__, logging.INFO)
+
+
+@pytest.fixture
+def fake_rembg(monkeypatch) -> None:
+    monkeypatch.setattr(backends, "_rembg_remove", fake_remove)
+    monkeypatch.setattr(backends, "_rembg_new_session", FakeSession)
+
+
+@pytest.fixture
+def images(tmp_path) -> str:
+    """Directory with two images, a text file and a subdirectory with one image."""
+    root = tmp_path / "in"
+    (root / "sub").mkdir(parents=True)
+    for path in (root / "a.png", root / "b.jpg", root / "sub" / "c.png"):
+        Image.new("RGB", (16, 12), (255, 255, 255)).save(str(path))
+    (root / "notes.txt").write_text("x")
+    return str(root)
+
+
+def run_cli(capsys, *argv: str) -> tuple:
+    code = cli.main(list(argv))
+    return code, json.loads(capsys.readouterr().out)
+
+
+class TestCollectInputs:
+    """Input expansion tests."""
+
+    def test_directory(self, images: str) -> None:
+        paths = cli.collect_inputs([images])
+        assert [os.path.basename(p) for p in paths] == ["a.png", "b.jpg"]
+
+    def test_directory_recursive(self, images: str) -> None:
+        paths = cli.collect_inputs([images], recursive=True)
+        assert [os.path.basename(p) for p in paths] == ["a.png", "b.jpg", "c.png"]
+
+    def test_glob(self, images: str) -> None:
+        paths = cli.collect_inputs([os.path.join(images, "**", "*.png")])
+        assert sorted(os.path.basename(p) for p in paths) == ["a.png", "c.png"]
+
+    def test_missing_file_kept(self, tmp_path) -> None:
+        missing = str(tmp_path / "missing.png")
+        assert cli.collect_inputs([missing]) == [missing]
+
+    def test_duplicates_dropped(self, images: str) -> None:
+        a = os.path.join(images, "a.png")
+        assert cli.collect_inputs([a, images]) == [a, os.path.join(images, "b.jpg")]
+
+
+class TestWriter:
+    """Output writer tests."""
+
+    def test_format(self, tmp_path) -> None:
+        write = cli.make_writer(str(tmp_path), ExportManager(), "webp", 80)
+        out = write(Image.new("RGBA", (4, 4)), "/x/photo.jpg")
+        assert out == os.path.join(str(tmp_path), "photo_nobg.webp")
+        assert Image.open(out).format == "WEBP"
+
+    def test_preset(self, tmp_path) -> None:
+        write = cli.make_writer(str(tmp_path), ExportManager(), preset="thumbnail")
+        out = write(Image.new("RGBA", (600, 300)), "/x/photo.png")
+        assert out.endswith("photo_nobg.jpeg")
+        assert max(Image.open(out).size) == 256
+
+    def test_failure_raises(self, tmp_path) -> None:
+        blocker = tmp_path / "file"
+        blocker.write_text("x")
+        write = cli.make_writer(str(blocker), ExportManager())
+        with pytest.raises(OSError):
+            write(Image.new("RGBA", (4, 4)), "photo.png")
+
+
+class TestBatchCommand:
+    """End-to-end batch command tests."""
+
+    def test_summary(self, fake_rembg: None, images: str, tmp_path, capsys) -> None:
+        out = str(tmp_path / "out")
+        code, summary = run_cli(capsys, "batch", images, "-o", out, "--no-cache", "--format", "jpeg")
+        assert code == cli.EXIT_OK
+        assert summary["total"] == summary["succeeded"] == 2
+        assert summary["failed"] == 0
+        assert summary["format"] == "jpeg"
+        assert summary["throughput"] > 0
+        assert set(summary["stages"]) == {"decode", "infer", "encode"}
+        assert summary["timing"]["count"] == 2
+        assert set(summary["timing"]["stages"]["infer"]) >= {"p50", "p90", "p99", "megapixels_per_second"}
+        for entry in summary["files"]:
+            assert entry["output_path"].endswith("_nobg.jpeg")
+            assert set(entry["timings"]) == {"decode", "infer", "encode"}
+        assert sorted(os.listdir(out)) == ["a_nobg.jpeg", "b_nobg.jpeg"]
+
+    def test_failure_exit_code(self, fake_rembg: None, images: str, tmp_path, capsys) -> None:
+        missing = str(tmp_path / "missing.png")
+        code, summary = run_cli(
+            capsys, "batch", images, missing, "-o", str(tmp_path / "out"), "--no-cache", "-q",
+        )
+        assert code == cli.EXIT_FAILURES
+        assert summary["failed"] == 1
+        failed = [f for f in summary["files"] if f["error"]]
+        assert failed[0]["input_path"] == missing
+
+    def test_memory_budget(self, fake_rembg: None, images: str, tmp_path, capsys) -> None:
+        code, summary = run_cli(
+            capsys, "batch", images, "-o", str(tmp_path / "out"), "--no-cache", "--memory-budget-mb", "64",
+        )
+        assert code == cli.EXIT_OK
+        assert summary["admission"]["budget"] == 64 * 1024 * 1024
+        assert summary["admission"]["admitted"] == 2
+        _, plain = run_cli(capsys, "batch", images, "-o", str(tmp_path / "out"), "--no-cache")
+        assert plain["admission"] is None
+
+    def test_triage(self, fake_rembg: None, images: str, tmp_path, capsys) -> None:
+        code, summary = run_cli(capsys, "batch", images, "-o", str(tmp_path / "out"), "--no-cache", "--triage")
+        assert code == cli.EXIT_OK
+        # The white test images have a flat border
+        assert summary["triage"] == {"passthrough": 0, "color_key": 2, "model": 0}
+        assert {f["route"] for f in summary["files"]} == {"color_key"}
+
+    def test_keying_backend(self, images: str, tmp_path, capsys) -> None:
+        # No rembg stand-in: the keying backend never loads the model
+        code, summary = run_cli(capsys, "batch", images, "-o", str(tmp_path / "out"), "--no-cache",
+                                "--backend", "keying")
+        assert code == cli.EXIT_OK
+        assert summary["backend"] == "keying"
+        assert summary["succeeded"] == 2
+
+    def test_worker_processes(self, images: str, tmp_path, capsys) -> None:
+        out = str(tmp_path / "out")
+        code, summary = run_cli(capsys, "batch", images, "-o", out, "--no-cache", "--backend", "keying",
+                                "--processes", "2", "--task-timeout", "60", "--max-tasks-per-worker", "1")
+        assert code == cli.EXIT_OK
+        assert summary["succeeded"] == 2 and "warm_up" not in summary
+        assert summary["timing"]["count"] == 2
+        assert sorted(os.listdir(out)) == ["a_nobg.png", "b_nobg.png"]
+
+    def test_worker_processes_png_only(self, images: str, tmp_path) -> None:
+        with pytest.raises(SystemExit) as exc:
+            cli.main(["batch", images, "-o", str(tmp_path), "--processes", "2", "--format", "webp"])
+        assert exc.value.code == 2
+
+    def test_fake_backend(self, images: str, tmp_path, capsys) -> None:
+        code, summary = run_cli(capsys, "batch", images, "-o", str(tmp_path / "out"), "--no-cache",
+                                "--backend", "fake", "--model", "fast")
+        assert code == cli.EXIT_OK
+        assert summary["backend"] == "fake" and summary["succeeded"] == 2
+
+    def test_local_models_missing(self, fake_rembg: None, images: str, tmp_path, capsys) -> None:
+        # No model file in --model-dir, and --local-models forbids downloading it
+        code, summary = run_cli(capsys, "batch", images, "-o", str(tmp_path / "out"), "--no-cache",
+                                "--local-models", "--model-dir", str(tmp_path))
+        assert code == cli.EXIT_FAILURES
+        assert summary["failed"] == 2
+
+    def test_summary_file(self, fake_rembg: None, images: str, tmp_path, capsys) -> None:
+        path = str(tmp_path / "summary.json")
+        cli.main(["batch", images, "-o", str(tmp_path / "out"), "--cache-dir", str(tmp_path / "cache"),
+                  "--summary", path])
+        assert capsys.readouterr().out == ""
+        with open(path, encoding="utf-8") as f:
+            summary = json.load(f)
+        assert summary["cache"]["hits"] + summary["cache"]["misses"] == 2
+
+    def test_no_inputs(self, tmp_path) -> None:
+        with pytest.raises(SystemExit) as exc:
+            cli.main(["batch", str(tmp_path / "*.png"), "-o", str(tmp_path)])
+        assert exc.value.code == 2
+
+    def test_watch_requires_directory(self, tmp_path) -> None:
+        with pytest.raises(SystemExit):
+            cli.main(["watch", str(tmp_path / "missing"), "-o", str(tmp_path)])
+
+
+class TestHeadless:
+    """The CLI must work without a display."""
+
+    def test_no_tkinter_import(self) -> None:
+        code = "import sys, cli; print('tkinter' in sys.modules, 'rembg' in sys.modules)"
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        assert output.strip() == "False False"
+
+
+class TestServeCommand:
+    """Serve command option tests."""
+
+    def test_serve_options(self) -> None:
+        args = cli.build_parser().parse_args(["serve", "--port", "0", "--queue-size", "3"])
+        assert args.port == 0
+        assert args.queue_size == 3
+        assert args.workers >= 1
+
+
+class TestIncremental:
+    """Incremental batch command tests."""
+
+    def test_rerun_skips(self, fake_rembg: None, images: str, tmp_path, capsys) -> None:
+        out = str(tmp_path / "out")
+        args = ["batch", images, "-o", out, "--no-cache", "--incremental"]
+        _, first = run_cli(capsys, *args)
+        assert first["incremental"]["to_process"] == 2
+
+        code, dry = run_cli(capsys, *args, "--dry-run")
+        assert code == cli.EXIT_OK
+        assert dry["dry_run"] is True
+        assert dry["to_process"] == []
+        assert dry["incremental"]["skipped"] == 2
+        assert dry["incremental"]["time_saved"] > 0
+
+        _, second = run_cli(capsys, *args)
+        assert second["files"] == []
+        assert second["total"] == 2
+
+    def test_format_change_reprocesses(self, fake_rembg: None, images: str, tmp_path, capsys) -> None:
+        out = str(tmp_path / "out")
+        run_cli(capsys, "batch", images, "-o", out, "--no-cache", "--incremental")
+        _, summary = run_cli(capsys, "batch", images, "-o", out, "--no-cache", "--incremental", "--format", "webp")
+        assert summary["incremental"]["to_process"] == 2
+
+
+class TestQueueCommand:
+    """Job store command tests."""
+
+    def test_add_then_work(self, fake_rembg: None, images: str, tmp_path, capsys) -> None:
+        store = str(tmp_path / "jobs.db")
+        out = str(tmp_path / "out")
+        code, queued = run_cli(capsys, "queue", store, images, "-o", out, "--no-work")
+        assert code == cli.EXIT_OK
+        assert queued["added"] == 2
+        assert queued["pending"] == 2
+        assert not os.path.exists(out)
+
+        code, summary = run_cli(capsys, "queue", store, images, "-o", out)
+        assert code == cli.EXIT_OK
+        assert summary["added"] == 0
+        assert summary["worked"]["done"] == summary["done"] == 2
+        assert sorted(os.listdir(out)) == ["a_nobg.png", "b_nobg.png"]
+
+    def test_failed_jobs(self, fake_rembg: None, tmp_path, capsys) -> None:
+        broken = tmp_path / "broken.png"
+        broken.write_bytes(b"junk")
+        store = str(tmp_path / "jobs.db")
+        code, summary = run_cli(capsys, "queue", store, str(broken), "-o", str(tmp_path), "--max-attempts", "1")
+        assert code == cli.EXIT_FAILURES
+        assert summary["failed"] == 1
+
+        _, status = run_cli(capsys, "queue", store, "--retry-failed", "--no-work")
+        assert status["requeued"] == 1
+        assert status["pending"] == 1
+
+    def test_keying_with_triage(self, images: str, tmp_path, capsys) -> None:
+        # No rembg stand-in: keying and triage never load the model
+        code, summary = run_cli(capsys, "queue", str(tmp_path / "jobs.db"), images, "-o", str(tmp_path / "out"),
+                                "--backend", "keying", "--triage")
+        assert code == cli.EXIT_OK
+        assert summary["backend"] == "keying" and summary["done"] == 2
+
+    def test_local_models_missing(self, fake_rembg: None, images: str, tmp_path, capsys) -> None:
+        code, summary = run_cli(capsys, "queue", str(tmp_path / "jobs.db"), images, "-o", str(tmp_path / "out"),
+                                "--max-attempts", "1", "--local-models", "--model-dir", str(tmp_path))
+        assert code == cli.EXIT_FAILURES
+        assert summary["failed"] == 2
+
+    def test_output_required(self, images: str, tmp_path) -> None:
+        with pytest.raises(SystemExit):
+            cli.main(["queue", str(tmp_path / "jobs.db"), images])
@@ -135,3 +135,26 @@ class TestValidation:
 
         config = ConfigManager(config_path=temp_config_path)
         assert config.get("undo_limit") == 20
+
+    def test_invalid_mask_cache_size(self, temp_config_path: str) -> None:
+        with open(temp_config_path, "w") as f:
+            json.dump({"mask_cache_max_mb": 0, "mask_cache_enabled": "yes"}, f)
+
+        config = ConfigManager(config_path=temp_config_path)
+        assert config.get("mask_cache_max_mb") == 1024
+        assert config.get("mask_cache_enabled") is True
+
+    def test_invalid_inference_batch_size(self, temp_config_path: str) -> None:
+        with open(temp_config_path, "w") as f:
+            json.dump({"inference_batch_size": 0}, f)
+
+        config = ConfigManager(config_path=temp_config_path)
+        assert config.get("inference_batch_size") == 1
+
+    def test_warm_up_on_start_is_opt_in(self, temp_config_path: str) -> None:
+        assert ConfigManager(config_path=temp_config_path).get("warm_up_on_start") is False
+        with open(temp_config_path, "w") as f:
+            json.dump({"warm_up_on_start": "sure"}, f)
+
+        config = ConfigManager(config_path=temp_config_path)
+        assert config.get("warm_up_on_start") is False
@@ -0,0 +1,80 @@
+"""Decoding tests — target sizes, JPEG draft decoding and deferred full resolution."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.decoding import can_draft, decode_reduced, fit_size, is_deferred, load_full, open_for_inference
+
+
+@pytest.fixture
+def photo(tmp_path) -> str:
+    """Large JPEG with a horizontal gradient."""
+    gradient = np.tile(np.linspace(0, 255, 1600, dtype=np.uint8), (1200, 1))
+    path = str(tmp_path / "photo.jpg")
+    Image.fromarray(np.dstack([gradient] * 3), "RGB").save(path, quality=90)
+    return path
+
+
+class TestFitSize:
+    """Target size calculation tests."""
+
+    def test_unlimited(self) -> None:
+        assert fit_size((6000, 4000), None) == (6000, 4000)
+
+    def test_downscale_keeps_aspect(self) -> None:
+        assert fit_size((6000, 4000), 1024) == (1024, 683)
+        assert fit_size((4000, 6000), 1024) == (683, 1024)
+
+    def test_small_image_unchanged(self) -> None:
+        assert fit_size((800, 600), 1024) == (800, 600)
+
+
+class TestDecodeReduced:
+    """Reduced-scale decoding tests."""
+
+    def test_jpeg_draft(self, photo: str) -> None:
+        image = Image.open(photo)
+        assert is_deferred(image) and can_draft(image)
+        reduced = decode_reduced(image, 320)
+        assert reduced.size == (320, 240)
+        assert reduced.mode == "RGB"
+        # DCT scaling decoded at 1/4, not at full size
+        assert image.size == (400, 300)
+
+    def test_matches_full_decode(self, photo: str) -> None:
+        reduced = np.asarray(decode_reduced(Image.open(photo), 320), dtype=np.int16)
+        expected = np.asarray(load_full(photo).resize((320, 240), Image.BILINEAR), dtype=np.int16)
+        assert np.abs(reduced - expected).mean() < 3
+
+    def test_png_reduced_after_decode(self, tmp_path) -> None:
+        path = str(tmp_path / "large.png")
+        Image.new("RGB", (1000, 500), (10, 20, 30)).save(path)
+        image = Image.open(path)
+        assert not can_draft(image)
+        reduced = decode_reduced(image, 100)
+        assert reduced.size == (100, 50)
+        assert reduced.getpixel((5, 5)) == (10, 20, 30)
+
+    def test_no_target(self, photo: str) -> None:
+        image = Image.open(photo)
+        assert decode_reduced(image, None) is image
+        assert not is_deferred(image)
+
+
+class TestOpenForInference:
+    """Inference input tests."""
+
+    def test_jpeg_reduced(self, photo: str) -> None:
+        image, reduced = open_for_inference(photo, 320)
+        assert reduced
+        assert image.size == (320, 240)
+
+    def test_full_resolution_needed(self, photo: str, tmp_path) -> None:
+        assert open_for_inference(photo, None)[1] is False
+        assert open_for_inference(photo, 4000)[0].size == (1600, 1200)
+        png = str(tmp_path / "a.png")
+        Image.new("RGB", (800, 600)).save(png)
+        image, reduced = open_for_inference(png, 320)
+        assert not reduced
+        assert image.size == (800, 600)
@@ -351,3 +351,76 @@ class TestResize:
     def test_resize_no_image(self) -> None:
         editor = ImageEditor()
         assert not editor.resize(50, 50)
+
+
+class TestMaskPropagation:
+    """Alpha mask tracking tests."""
+
+    @pytest.fixture
+    def masked_editor(self) -> ImageEditor:
+        """100x50 image whose mask keeps only the left 30 columns."""
+        editor = ImageEditor(Image.new("RGB", (100, 50), (0, 255, 0)))
+        mask = Image.new("L", (100, 50), 0)
+        mask.paste(255, (0, 0, 30, 50))
+        editor.mask = mask
+        return editor
+
+    def test_mask_size_must_match(self, editor: ImageEditor) -> None:
+        with pytest.raises(ValueError):
+            editor.mask = Image.new("L", (10, 10))
+
+    def test_new_image_clears_mask(self, masked_editor: ImageEditor) -> None:
+        masked_editor.image = Image.new("RGB", (100, 50))
+        assert masked_editor.mask is None
+
+    def test_flip_horizontal(self, masked_editor: ImageEditor) -> None:
+        masked_editor.flip_horizontal()
+        assert masked_editor.mask.getpixel((99, 0)) == 255
+        assert masked_editor.mask.getpixel((0, 0)) == 0
+
+    def test_flip_vertical(self, masked_editor: ImageEditor) -> None:
+        masked_editor.flip_vertical()
+        assert masked_editor.mask.getpixel((0, 49)) == 255
+
+    def test_rotate(self, masked_editor: ImageEditor) -> None:
+        masked_editor.rotate(90)
+        assert masked_editor.mask.size == masked_editor.image.size == (50, 100)
+        # The kept left strip is now at the bottom
+        assert masked_editor.mask.getpixel((25, 95)) == 255
+        assert masked_editor.mask.getpixel((25, 5)) == 0
+
+    def test_crop(self, masked_editor: ImageEditor) -> None:
+        masked_editor.crop(20, 0, 60, 50)
+        assert masked_editor.mask.size == (40, 50)
+        assert masked_editor.mask.getpixel((5, 10)) == 255
+        assert masked_editor.mask.getpixel((15, 10)) == 0
+
+    def test_resize(self, masked_editor: ImageEditor) -> None:
+        masked_editor.resize(50, 50, maintain_aspect=True)
+        assert masked_editor.mask.size == masked_editor.image.size == (50, 25)
+        masked_editor.resize(200, 40, maintain_aspect=False)
+        assert masked_editor.mask.size == (200, 40)
+
+    def test_colour_edits_keep_mask(self, masked_editor: ImageEditor) -> None:
+        mask = masked_editor.mask
+        masked_editor.adjust_brightness(1.5)
+        masked_editor.apply_blur()
+        masked_editor.apply_grayscale()
+        masked_editor.add_watermark("x")
+        assert masked_editor.mask is mask
+
+    def test_undo_redo_restore_mask(self, masked_editor: ImageEditor) -> None:
+        original = masked_editor.mask
+        masked_editor.crop(0, 0, 10, 10)
+        assert masked_editor.mask.size == (10, 10)
+        masked_editor.undo()
+        assert masked_editor.mask is original
+        masked_editor.redo()
+        assert masked_editor.mask.size == (10, 10)
+
+    def test_undo_to_state_without_mask(self) -> None:
+        editor = ImageEditor(Image.new("RGB", (20, 20)))
+        editor.flip_horizontal()
+        editor.mask = Image.new("L", (20, 20), 255)
+        editor.undo()
+        assert editor.mask is None
@@ -0,0 +1,1192 @@
+"""ImageProcessor unit tests — session pool, warm-up, removal, batch."""
+
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import core.backends as backends
+from core.admission import estimate_memory
+from core.image_processor import ImageProcessor, default_worker_count
+from core.mask_cache import MaskCache
+from core.timing import TimingRecord
+
+
+class FakeSession:
+    """Stand-in for a rembg session — records how often it is used."""
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+        self.calls = 0
+        self.input_shapes = []
+
+
+def fake_remove(
+    data: np.ndarray, session: FakeSession = None, only_mask: bool = False, **kwargs,
+) -> np.ndarray:
+    """Stand-in for ``rembg.remove`` — keeps bright pixels as foreground."""
+    session.calls += 1
+    session.input_shapes.append(data.shape)
+    rgb = data[..., :3]
+    alpha = np.where(rgb.mean(axis=2) > 127, 255, 0).astype(np.uint8)
+    if only_mask:
+        return alpha
+    return np.dstack([rgb, alpha])
+
+
+@pytest.fixture
+def created_sessions(monkeypatch) -> list:
+    """Replace the lazy rembg imports with stand-ins; return created sessions."""
+    sessions = []
+
+    def fake_new_session(model_name: str) -> FakeSession:
+        session = FakeSession(model_name)
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(backends, "_rembg_remove", fake_remove)
+    monkeypatch.setattr(backends, "_rembg_new_session", fake_new_session)
+    return sessions
+
+
+@pytest.fixture
+def processor(created_sessions: list) -> ImageProcessor:
+    proc = ImageProcessor()
+    yield proc
+    proc.close()
+
+
+@pytest.fixture
+def sample_image() -> Image.Image:
+    """Left half black, right half white."""
+    img = Image.new("RGB", (40, 20), (0, 0, 0))
+    img.paste((255, 255, 255), (20, 0, 40, 20))
+    return img
+
+
+@pytest.fixture
+def batch_files(sample_image: Image.Image, tmp_path) -> list:
+    """Five input images on disk."""
+    paths = []
+    for i in range(5):
+        path = str(tmp_path / f"img{i}.png")
+        sample_image.save(path)
+        paths.append(path)
+    return paths
+
+
+def run_batch(processor: ImageProcessor, file_paths: list, output_dir: str, **kwargs) -> dict:
+    """Run batch_process to completion and collect its callbacks."""
+    done = threading.Event()
+    report = {"progress": [], "errors": [], "complete": None}
+
+    def on_complete(success: int, total: int) -> None:
+        report["complete"] = (success, total)
+        done.set()
+
+    kwargs.setdefault("on_progress", lambda cur, total, name: report["progress"].append(cur))
+    processor.batch_process(
+        file_paths, output_dir,
+        on_complete=on_complete,
+        on_error=lambda name, msg: report["errors"].append((name, msg)),
+        **kwargs,
+    )
+    assert done.wait(timeout=30)
+    return report
+
+
+def wait_running(handle, timeout: float = 5.0) -> None:
+    """Block until a scheduler job has started."""
+    deadline = time.monotonic() + timeout
+    while handle.status == "queued":
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+fork_only = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="stand-in session is only inherited by forked workers",
+)
+
+
+class TestSessionPool:
+    """Session pool tests."""
+
+    def test_session_created_once(self, processor: ImageProcessor, created_sessions: list) -> None:
+        first = processor.get_session()
+        second = processor.get_session()
+        assert first is second
+        assert len(created_sessions) == 1
+
+    def test_sessions_keyed_by_model(self, processor: ImageProcessor, created_sessions: list) -> None:
+        processor.get_session("u2net")
+        processor.get_session("u2netp")
+        assert sorted(processor.loaded_models) == ["u2net", "u2netp"]
+        assert len(created_sessions) == 2
+
+    def test_warm_up(self, processor: ImageProcessor, created_sessions: list) -> None:
+        assert processor.warm_up(["u2net", "silueta"])
+        assert [s.model_name for s in created_sessions] == ["u2net", "silueta"]
+
+    def test_warm_up_failure(self, monkeypatch) -> None:
+        def broken_session(model_name: str) -> None:
+            raise RuntimeError("model file missing")
+
+        monkeypatch.setattr(backends, "_rembg_remove", fake_remove)
+        monkeypatch.setattr(backends, "_rembg_new_session", broken_session)
+        assert not ImageProcessor().warm_up()
+
+    def test_warm_up_dummy_inference(self, processor: ImageProcessor, created_sessions: list) -> None:
+        assert processor.warm_up(dummy_inference=True)
+        assert created_sessions[0].calls == 1
+
+    def test_warm_up_async(self, processor: ImageProcessor, created_sessions: list) -> None:
+        done = []
+        thread = processor.warm_up_async(on_done=lambda ok, elapsed: done.append(ok))
+        assert processor.wait_until_ready(timeout=5)
+        assert not thread.is_alive()
+        assert done == [True]
+        assert processor.loaded_models == ["u2net"]
+        assert created_sessions[0].calls == 1
+
+    def test_request_waits_for_warm_up(self, monkeypatch, sample_image: Image.Image) -> None:
+        release = threading.Event()
+        sessions = []
+
+        def slow_new_session(model_name: str) -> FakeSession:
+            release.wait(timeout=10)
+            sessions.append(FakeSession(model_name))
+            return sessions[-1]
+
+        monkeypatch.setattr(backends, "_rembg_remove", fake_remove)
+        monkeypatch.setattr(backends, "_rembg_new_session", slow_new_session)
+        proc = ImageProcessor()
+        proc.warm_up_async()
+        assert proc.warm_up_async() is proc.warm_up_async()
+        assert not proc.wait_until_ready(timeout=0.05)
+        handle = proc.remove_background_async(sample_image, lambda r: None)
+        release.set()
+        assert handle.result(timeout=5) is not None
+        assert len(sessions) == 1
+        # Dummy inference plus the real request
+        assert sessions[0].calls == 2
+        proc.close()
+
+    def test_close_releases_sessions(self, processor: ImageProcessor, created_sessions: list) -> None:
+        processor.warm_up()
+        processor.close()
+        assert processor.loaded_models == []
+        processor.get_session()
+        assert len(created_sessions) == 2
+
+
+class TestRemoveBackground:
+    """Background removal tests."""
+
+    def test_result_is_rgba(self, processor: ImageProcessor, sample_image: Image.Image) -> None:
+        result = processor.remove_background(sample_image)
+        assert result is not None
+        assert result.mode == "RGBA"
+        assert result.size == sample_image.size
+        assert result.getpixel((5, 5))[3] == 0
+        assert result.getpixel((35, 5))[3] == 255
+
+    def test_reuses_session(
+        self, processor: ImageProcessor, sample_image: Image.Image, created_sessions: list,
+    ) -> None:
+        for _ in range(3):
+            processor.remove_background(sample_image)
+        assert len(created_sessions) == 1
+        assert created_sessions[0].calls == 3
+
+    def test_model_override(
+        self, processor: ImageProcessor, sample_image: Image.Image, created_sessions: list,
+    ) -> None:
+        processor.remove_background(sample_image, model_name="isnet-general-use")
+        assert created_sessions[0].model_name == "isnet-general-use"
+
+    def test_low_res_inference(
+        self, processor: ImageProcessor, sample_image: Image.Image, created_sessions: list,
+    ) -> None:
+        big = sample_image.resize((400, 200), Image.NEAREST)
+        result = processor.remove_background(big, max_inference_side=40)
+        assert created_sessions[0].input_shapes == [(20, 40, 3)]
+        assert result.size == (400, 200)
+        assert result.mode == "RGBA"
+        assert result.getpixel((50, 100))[3] == 0
+        assert result.getpixel((350, 100)) == (255, 255, 255, 255)
+
+    def test_low_res_skipped_for_small_images(
+        self, processor: ImageProcessor, sample_image: Image.Image, created_sessions: list,
+    ) -> None:
+        processor.remove_background(sample_image, max_inference_side=1024)
+        assert created_sessions[0].input_shapes == [(20, 40, 3)]
+
+    def test_async(self, processor: ImageProcessor, sample_image: Image.Image) -> None:
+        results = []
+        handle = processor.remove_background_async(sample_image, results.append)
+        assert handle.wait(timeout=5)
+        assert handle.status == "done"
+        assert len(results) == 1
+        assert results[0].mode == "RGBA"
+        assert handle.result() is results[0]
+
+    def test_concurrent_calls_allowed(self, processor: ImageProcessor, sample_image: Image.Image) -> None:
+        handles = [processor.remove_background_async(sample_image, lambda r: None) for _ in range(3)]
+        assert all(h.wait(timeout=5) for h in handles)
+        assert all(h.result() is not None for h in handles)
+
+    def test_cancel_event_per_call(self, processor: ImageProcessor, sample_image: Image.Image) -> None:
+        cancelled = threading.Event()
+        cancelled.set()
+        assert processor.remove_background(sample_image, cancel_event=cancelled) is None
+        assert processor.remove_background(sample_image) is not None
+        assert not processor.is_processing
+
+
+class TestTiming:
+    """Per-stage timing record tests."""
+
+    def test_remove_background_stages(self, processor: ImageProcessor, sample_image: Image.Image) -> None:
+        timing = TimingRecord()
+        big = sample_image.resize((400, 200))
+        processor.remove_background(big, max_inference_side=40, timing=timing)
+        assert list(timing.durations) == ["convert", "infer", "mask", "composite"]
+        assert timing.pixels == {"convert": 80000, "infer": 800, "mask": 80000, "composite": 80000}
+        assert processor.last_timing is timing
+        assert processor.timing_stats.count == 1
+
+    def test_cache_stage(self, created_sessions: list, sample_image: Image.Image, tmp_path) -> None:
+        proc = ImageProcessor(mask_cache=MaskCache(str(tmp_path)))
+        proc.remove_background(sample_image)
+        proc.remove_background(sample_image)
+        assert list(proc.last_timing.durations) == ["cache", "composite"]
+        assert proc.timing_stats.stage_stats("cache")["count"] == 2
+        assert proc.timing_stats.stage_stats("infer")["count"] == 1
+        proc.close()
+
+    def test_failures_not_recorded(self, processor: ImageProcessor, sample_image: Image.Image) -> None:
+        assert processor.remove_background(sample_image, backend="magic") is None
+        assert processor.last_timing is None and processor.timing_stats.count == 0
+
+    def test_async_timing(self, processor: ImageProcessor, sample_image: Image.Image) -> None:
+        timing = TimingRecord()
+        handle = processor.remove_background_async(sample_image, lambda r: None, timing=timing)
+        assert handle.wait(timeout=5)
+        assert "infer" in timing.durations
+
+    def test_batch_results(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        results = list(processor.iter_process(batch_files, str(tmp_path), inference_batch_size=2))
+        assert results[0].timing.pixels == {"decode": 800, "infer": 800, "encode": 800}
+        assert results[0].to_dict()["pixels"] == {"decode": 800, "infer": 800, "encode": 800}
+        stats = processor.last_batch_timing
+        assert stats.count == 5
+        assert set(stats.stages()) == {"decode", "infer", "encode"}
+        assert stats.stage_stats("infer")["p50"] <= stats.stage_stats("infer")["max"]
+
+    def test_batch_timing_bounded(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        # Streams may be endless: only a window of recent samples is kept
+        list(processor.iter_process(batch_files * 3, str(tmp_path)))
+        stats = processor.last_batch_timing
+        assert stats.max_samples is not None
+        assert stats.count == 15
+
+    @fork_only
+    def test_process_pool(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        run_batch(processor, batch_files, str(tmp_path), use_processes=True)
+        assert processor.last_batch_timing.count == 5
+        assert processor.last_batch_timing.stage_stats("encode")["megapixels_per_second"] > 0
+
+
+class TestBatchProcess:
+    """Batch processing tests."""
+
+    def test_batch_shares_session(
+        self, processor: ImageProcessor, sample_image: Image.Image, created_sessions: list, tmp_path,
+    ) -> None:
+        paths = []
+        for i in range(3):
+            path = str(tmp_path / f"img{i}.png")
+            sample_image.save(path)
+            paths.append(path)
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+
+        done = threading.Event()
+        summary = []
+
+        def on_complete(success: int, total: int) -> None:
+            summary.append((success, total))
+            done.set()
+
+        processor.batch_process(paths, str(out_dir), on_complete=on_complete)
+        assert done.wait(timeout=10)
+        assert summary == [(3, 3)]
+        assert len(created_sessions) == 1
+        assert created_sessions[0].calls == 3
+        assert sorted(os.listdir(out_dir)) == ["img0_nobg.png", "img1_nobg.png", "img2_nobg.png"]
+
+    def test_batch_reports_errors(self, processor: ImageProcessor, tmp_path) -> None:
+        done = threading.Event()
+        errors = []
+        processor.batch_process(
+            [str(tmp_path / "missing.png")], str(tmp_path),
+            on_complete=lambda s, t: done.set(),
+            on_error=lambda name, msg: errors.append(name),
+        )
+        assert done.wait(timeout=10)
+        assert errors == ["missing.png"]
+
+    def test_batch_records_stage_stats(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        report = run_batch(processor, batch_files, str(tmp_path), encode_workers=3, queue_depth=1)
+        assert report["complete"] == (5, 5)
+        stats = processor.last_batch_stats
+        assert [name for name in stats] == ["decode", "infer", "encode"]
+        assert stats["encode"].workers == 3
+        assert all(s.items == 5 for s in stats.values())
+
+    def test_batch_low_res_inference(
+        self, processor: ImageProcessor, batch_files: list, created_sessions: list, tmp_path,
+    ) -> None:
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        report = run_batch(processor, batch_files, str(out_dir), max_inference_side=20)
+        assert report["complete"] == (5, 5)
+        assert set(created_sessions[0].input_shapes) == {(10, 20, 3)}
+        assert Image.open(out_dir / "img0_nobg.png").size == (40, 20)
+
+    def test_batch_cancel(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        report = run_batch(
+            processor, batch_files * 6, str(tmp_path),
+            on_progress=lambda cur, total, name: processor.cancel(), queue_depth=1,
+        )
+        # Only items already inside the pipeline can still finish
+        assert 1 <= report["complete"][0] < 10
+        assert report["errors"] == []
+
+
+class FakeBatchSession(FakeSession):
+    """Stand-in session with a ``predict_batch`` hook."""
+
+    def __init__(self, model_name: str) -> None:
+        super().__init__(model_name)
+        self.batch_sizes = []
+
+    def predict_batch(self, arrays: list) -> list:
+        self.batch_sizes.append(len(arrays))
+        assert len({a.shape for a in arrays}) == 1
+        return [np.where(a[..., :3].mean(axis=2) > 127, 255, 0).astype(np.uint8) for a in arrays]
+
+
+class FakeInput:
+    def __init__(self, shape: tuple) -> None:
+        self.name = "input.1"
+        self.shape = shape
+
+
+class FakeInnerSession:
+    """Stand-in ONNX session — predicts the normalized input's brightness."""
+
+    def __init__(self, batch_dim) -> None:
+        self.batch_dim = batch_dim
+        self.runs = []
+
+    def get_inputs(self) -> list:
+        return [FakeInput((self.batch_dim, 3, 320, 320))]
+
+    def run(self, outputs, feed: dict) -> list:
+        tensor = feed["input.1"]
+        self.runs.append(tensor.shape)
+        return [tensor.mean(axis=1, keepdims=True)]
+
+
+class FakeOnnxSession(FakeSession):
+    """Stand-in rembg session exposing ``normalize`` and ``inner_session``."""
+
+    def __init__(self, model_name: str, batch_dim="batch") -> None:
+        super().__init__(model_name)
+        self.inner_session = FakeInnerSession(batch_dim)
+
+    def normalize(self, img: Image.Image, mean, std, size) -> dict:
+        arr = np.asarray(img.convert("RGB").resize(size), dtype=np.float32) / 255.0
+        return {"input.1": arr.transpose(2, 0, 1)[np.newaxis]}
+
+
+class TestIncrementalBatch:
+    """Incremental (skip up-to-date outputs) batch tests."""
+
+    def run_dry(self, processor: ImageProcessor, file_paths: list, output_dir: str, **kwargs):
+        handle = processor.batch_process(file_paths, output_dir, dry_run=True, **kwargs)
+        assert handle.wait(10)
+        return processor.last_incremental_plan
+
+    def test_second_run_skips(
+        self, processor: ImageProcessor, batch_files: list, created_sessions: list, tmp_path,
+    ) -> None:
+        out_dir = str(tmp_path / "out")
+        os.mkdir(out_dir)
+        assert run_batch(processor, batch_files, out_dir, incremental=True)["complete"] == (5, 5)
+        calls = created_sessions[0].calls
+
+        report = run_batch(processor, batch_files, out_dir, incremental=True)
+        assert report["complete"] == (0, 0)
+        assert created_sessions[0].calls == calls
+        plan = processor.last_incremental_plan
+        assert plan.to_dict()["skipped"] == 5
+        assert plan.time_saved > 0
+
+    def test_changed_input_and_missing_output(
+        self, processor: ImageProcessor, batch_files: list, tmp_path,
+    ) -> None:
+        out_dir = str(tmp_path / "out")
+        os.mkdir(out_dir)
+        run_batch(processor, batch_files, out_dir, incremental=True)
+        Image.new("RGB", (8, 8), (255, 255, 255)).save(batch_files[0])
+        os.remove(os.path.join(out_dir, "img1_nobg.png"))
+
+        plan = self.run_dry(processor, batch_files, out_dir)
+        assert plan.todo == batch_files[:2]
+        report = run_batch(processor, batch_files, out_dir, incremental=True)
+        assert report["complete"] == (2, 2)
+
+    def test_settings_change_reprocesses(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        out_dir = str(tmp_path / "out")
+        os.mkdir(out_dir)
+        run_batch(processor, batch_files, out_dir, incremental=True)
+        assert len(self.run_dry(processor, batch_files, out_dir).todo) == 0
+        assert len(self.run_dry(processor, batch_files, out_dir, max_inference_side=16).todo) == 5
+        assert len(self.run_dry(processor, batch_files, out_dir, model_name="isnet-general-use").todo) == 5
+
+    def test_batch_settings(self, processor: ImageProcessor) -> None:
+        assert processor.batch_settings("fast", format="webp") == {
+            "model": "u2netp", "format": "webp", "max_inference_side": None, "tile_size": None,
+        }
+        keying = processor.batch_settings(backend="keying")
+        assert keying["backend"] == "keying" and keying["keyer"] == repr(processor.keyer)
+        triage = processor.batch_settings(use_triage=True)
+        assert triage["triage"] is True and "keyer" in triage
+        assert "triage" not in processor.batch_settings()
+
+    def test_triage_change_reprocesses(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        out_dir = str(tmp_path / "out")
+        os.mkdir(out_dir)
+        run_batch(processor, batch_files, out_dir, incremental=True)
+        assert len(self.run_dry(processor, batch_files, out_dir, use_triage=True).todo) == 5
+
+    def test_dry_run_writes_nothing(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        out_dir = str(tmp_path / "out")
+        os.mkdir(out_dir)
+        plan = self.run_dry(processor, batch_files, out_dir)
+        assert plan.to_dict() == {"total": 5, "to_process": 5, "skipped": 0, "time_saved": 0.0}
+        assert os.listdir(out_dir) == []
+
+
+class TestBatchedInference:
+    """Multi-image inference tests."""
+
+    @pytest.fixture
+    def batch_session(self, monkeypatch) -> FakeBatchSession:
+        session = FakeBatchSession("u2net")
+        monkeypatch.setattr(backends, "_rembg_remove", fake_remove)
+        monkeypatch.setattr(backends, "_rembg_new_session", lambda name: session)
+        return session
+
+    def test_compute_masks_single_call(
+        self, batch_session: FakeBatchSession, sample_image: Image.Image,
+    ) -> None:
+        proc = ImageProcessor()
+        masks = proc.compute_masks([sample_image] * 3)
+        assert batch_session.batch_sizes == [3]
+        assert batch_session.calls == 0
+        assert all(m.tobytes() == masks[0].tobytes() for m in masks)
+        assert masks[0].getpixel((5, 5)) == 0 and masks[0].getpixel((30, 5)) == 255
+
+    def test_groups_by_input_shape(self, batch_session: FakeBatchSession, sample_image: Image.Image) -> None:
+        other = sample_image.resize((20, 20))
+        masks = ImageProcessor().compute_masks([sample_image, other, sample_image])
+        assert sorted(batch_session.batch_sizes) == [1, 2]
+        assert [m.size for m in masks] == [(40, 20), (20, 20), (40, 20)]
+
+    def test_single_image_skips_batching(
+        self, batch_session: FakeBatchSession, sample_image: Image.Image,
+    ) -> None:
+        ImageProcessor().compute_mask(sample_image)
+        assert batch_session.batch_sizes == []
+        assert batch_session.calls == 1
+
+    def test_cached_images_not_batched(
+        self, batch_session: FakeBatchSession, sample_image: Image.Image, tmp_path,
+    ) -> None:
+        proc = ImageProcessor(mask_cache=MaskCache(str(tmp_path)))
+        proc.compute_mask(sample_image)
+        proc.compute_masks([sample_image, sample_image.rotate(180), Image.new("RGB", (40, 20), (255, 255, 255))])
+        assert batch_session.batch_sizes == [2]
+
+    def test_onnx_batch_axis(self, monkeypatch, sample_image: Image.Image) -> None:
+        session = FakeOnnxSession("u2net")
+        monkeypatch.setattr(backends, "_rembg_new_session", lambda name: session)
+        masks = ImageProcessor().compute_masks([sample_image, sample_image.resize((64, 64))])
+        assert session.inner_session.runs == [(2, 3, 320, 320)]
+        assert [m.size for m in masks] == [(40, 20), (64, 64)]
+        assert masks[0].getpixel((5, 5)) < 20 and masks[0].getpixel((35, 5)) > 235
+
+    def test_fixed_batch_axis_falls_back(self, monkeypatch, sample_image: Image.Image) -> None:
+        session = FakeOnnxSession("u2net", batch_dim=1)
+        monkeypatch.setattr(backends, "_rembg_remove", fake_remove)
+        monkeypatch.setattr(backends, "_rembg_new_session", lambda name: session)
+        ImageProcessor().compute_masks([sample_image] * 3)
+        assert session.inner_session.runs == []
+        assert session.calls == 3
+
+    def test_iter_process_batches(
+        self, batch_session: FakeBatchSession, batch_files: list, tmp_path,
+    ) -> None:
+        proc = ImageProcessor()
+        results = list(proc.iter_process(batch_files * 4, str(tmp_path), inference_batch_size=4))
+        assert len(results) == 20 and all(r.ok for r in results)
+        assert max(batch_session.batch_sizes) <= 4
+        report = proc.last_batch_stats["infer"].batch_report()
+        assert sum(size * r["batches"] for size, r in report.items()) == 20
+
+
+    def test_failed_batch_timed_once(
+        self, batch_session: FakeBatchSession, batch_files: list, monkeypatch, tmp_path,
+    ) -> None:
+        proc = ImageProcessor()
+        compute_masks = proc.compute_masks
+
+        def broken_batch(images, *args, **kwargs):
+            if len(images) > 1:
+                raise RuntimeError("batch axis mismatch")
+            return compute_masks(images, *args, **kwargs)
+
+        monkeypatch.setattr(proc, "compute_masks", broken_batch)
+        results = list(proc.iter_process(batch_files, str(tmp_path), inference_batch_size=5))
+        assert all(r.ok for r in results)
+        # Only the one-by-one retry recorded the stage
+        assert all(r.timing.pixels["infer"] == 40 * 20 for r in results)
+        assert set(proc.last_batch_stats["infer"].batch_report()) == {1}
+
+
+class TestAnimation:
+    """Animated image tests."""
+
+    @pytest.fixture
+    def spin_gif(self, tmp_path) -> str:
+        """Six frames: three nearly identical, then three with the subject moved."""
+        frames = []
+        for i, x in enumerate((0, 0, 0, 20, 20, 20)):
+            frame = Image.new("RGB", (40, 20), (0, 0, 0))
+            frame.paste((255, 255, 255), (x, 0, x + 20, 20))
+            # A one-pixel flicker keeps the GIF writer from merging the frames
+            frame.putpixel((i, 19), (60, 60, 60))
+            frames.append(frame)
+        path = str(tmp_path / "spin.gif")
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=[40, 50, 60, 70, 80, 90], loop=0)
+        return path
+
+    def test_reuses_masks(self, processor: ImageProcessor, spin_gif: str, created_sessions: list) -> None:
+        with Image.open(spin_gif) as img:
+            result = processor.remove_background_animated(img)
+        assert created_sessions[0].calls == 2
+        assert (result.inferred_frames, result.reused_frames) == (2, 4)
+        assert result.durations == [40, 50, 60, 70, 80, 90]
+        assert result.frames[0].getpixel((5, 5))[3] == 255
+        assert result.frames[5].getpixel((5, 5))[3] == 0
+        assert result.frames[5].getpixel((30, 5))[3] == 255
+
+    def test_zero_threshold_infers_all(
+        self, processor: ImageProcessor, spin_gif: str, created_sessions: list,
+    ) -> None:
+        with Image.open(spin_gif) as img:
+            result = processor.remove_background_animated(img, reuse_threshold=0, workers=3)
+        assert result.inferred_frames == 6
+        assert created_sessions[0].calls == 6
+
+    def test_saved_animation(self, processor: ImageProcessor, spin_gif: str, tmp_path) -> None:
+        with Image.open(spin_gif) as img:
+            path = processor.remove_background_animated(img).save(str(tmp_path / "out.png"))
+        with Image.open(path) as out:
+            assert out.n_frames == 6
+            out.seek(3)
+            assert out.info["duration"] == 70
+
+    def test_cancelled(self, processor: ImageProcessor, spin_gif: str) -> None:
+        cancel = threading.Event()
+        cancel.set()
+        with Image.open(spin_gif) as img:
+            assert processor.remove_background_animated(img, cancel_event=cancel) is None
+
+
+class TestJobIsolation:
+    """Interactive and batch jobs run and cancel independently."""
+
+    @pytest.fixture
+    def gated_remove(self, monkeypatch) -> threading.Event:
+        """Make inference on batch files block until the returned event is set."""
+        release = threading.Event()
+
+        def slow_remove(data: np.ndarray, session: FakeSession = None, **kwargs) -> np.ndarray:
+            if data.shape[:2] == (20, 40):
+                release.wait(timeout=10)
+            return fake_remove(data, session, **kwargs)
+
+        monkeypatch.setattr(backends, "_rembg_remove", slow_remove)
+        return release
+
+    def test_interactive_runs_during_batch(
+        self, processor: ImageProcessor, batch_files: list, gated_remove: threading.Event, tmp_path,
+    ) -> None:
+        batch = processor.batch_process(batch_files, str(tmp_path))
+        wait_running(batch)
+        small = Image.new("RGB", (8, 8), (255, 255, 255))
+        handle = processor.remove_background_async(small, lambda r: None)
+        assert handle.wait(timeout=5)
+        assert handle.result() is not None
+        assert batch.status == "running"
+        gated_remove.set()
+        assert batch.result(timeout=10) == 5
+
+    def test_cancel_interactive_keeps_batch(
+        self, processor: ImageProcessor, batch_files: list, gated_remove: threading.Event, tmp_path,
+    ) -> None:
+        batch = processor.batch_process(batch_files, str(tmp_path))
+        wait_running(batch)
+        errors = []
+        handle = processor.remove_background_async(Image.new("RGB", (40, 20)), lambda r: None, on_error=errors.append)
+        handle.cancel()
+        gated_remove.set()
+        assert handle.wait(timeout=5)
+        assert handle.status == "cancelled"
+        assert errors == ["Processing was cancelled."]
+        assert batch.result(timeout=10) == 5
+        assert batch.status == "done"
+
+    def test_cancel_batch_handle(
+        self, processor: ImageProcessor, batch_files: list, gated_remove: threading.Event, tmp_path,
+    ) -> None:
+        batch = processor.batch_process(batch_files * 4, str(tmp_path), queue_depth=1)
+        wait_running(batch)
+        batch.cancel()
+        gated_remove.set()
+        assert batch.result(timeout=10) < 20
+        assert batch.status == "cancelled"
+        assert not processor.is_processing
+
+
+class TestMasks:
+    """compute_mask / apply_mask tests."""
+
+    def test_compute_mask(self, processor: ImageProcessor, sample_image: Image.Image) -> None:
+        mask = processor.compute_mask(sample_image)
+        assert mask.mode == "L"
+        assert mask.size == sample_image.size
+        assert mask.getpixel((5, 5)) == 0
+        assert mask.getpixel((35, 5)) == 255
+
+    def test_compute_mask_low_res(
+        self, processor: ImageProcessor, sample_image: Image.Image, created_sessions: list,
+    ) -> None:
+        big = sample_image.resize((400, 200), Image.NEAREST)
+        mask = processor.compute_mask(big, max_inference_side=40)
+        assert created_sessions[0].input_shapes == [(20, 40, 3)]
+        assert mask.size == (400, 200)
+
+    def test_apply_mask_transparent(self) -> None:
+        image = Image.new("RGB", (4, 4), (10, 20, 30))
+        mask = Image.new("L", (4, 4), 128)
+        result = ImageProcessor.apply_mask(image, mask)
+        assert result.mode == "RGBA"
+        assert result.getpixel((0, 0)) == (10, 20, 30, 128)
+
+    def test_apply_mask_color_background(self) -> None:
+        image = Image.new("RGB", (4, 4), (255, 0, 0))
+        mask = Image.new("L", (4, 4), 0)
+        mask.paste(255, (0, 0, 2, 4))
+        result = ImageProcessor.apply_mask(image, mask, background=(0, 0, 255))
+        assert result.mode == "RGB"
+        assert result.getpixel((0, 0)) == (255, 0, 0)
+        assert result.getpixel((3, 0)) == (0, 0, 255)
+
+    def test_apply_mask_blends_partial_alpha(self) -> None:
+        image = Image.new("RGB", (2, 2), (200, 200, 200))
+        mask = Image.new("L", (2, 2), 51)
+        result = ImageProcessor.apply_mask(image, mask, background=(0, 0, 0))
+        assert result.getpixel((0, 0)) == (40, 40, 40)
+
+    def test_apply_mask_image_background(self) -> None:
+        image = Image.new("RGB", (4, 4), (255, 255, 255))
+        background = Image.new("RGB", (8, 8), (0, 255, 0))
+        result = ImageProcessor.apply_mask(image, Image.new("L", (4, 4), 0), background=background)
+        assert result.size == (4, 4)
+        assert result.getpixel((1, 1)) == (0, 255, 0)
+
+    def test_apply_mask_keeps_existing_alpha(self) -> None:
+        image = Image.new("RGBA", (2, 2), (1, 2, 3, 128))
+        result = ImageProcessor.apply_mask(image, Image.new("L", (2, 2), 255))
+        assert result.getpixel((0, 0))[3] == 128
+
+    def test_apply_mask_resizes_mask(self) -> None:
+        image = Image.new("RGB", (10, 10))
+        result = ImageProcessor.apply_mask(image, Image.new("L", (5, 5), 255))
+        assert result.getpixel((9, 9))[3] == 255
+
+    def test_recomposite_matches_remove_background(
+        self, processor: ImageProcessor, sample_image: Image.Image,
+    ) -> None:
+        mask = processor.compute_mask(sample_image)
+        direct = processor.remove_background(sample_image)
+        assert ImageProcessor.apply_mask(sample_image, mask).tobytes() == direct.tobytes()
+
+
+class TestTiledInference:
+    """Tiled inference tests."""
+
+    @pytest.fixture
+    def large_image(self) -> Image.Image:
+        """Black canvas with a white rectangle crossing several tiles."""
+        img = Image.new("RGB", (300, 200), (0, 0, 0))
+        img.paste((255, 255, 255), (60, 40, 250, 170))
+        return img
+
+    def test_tiles_bound_model_input(
+        self, processor: ImageProcessor, large_image: Image.Image, created_sessions: list,
+    ) -> None:
+        processor.compute_mask(large_image, tile_size=128, tile_overlap=32)
+        shapes = created_sessions[0].input_shapes
+        # One global pass plus 3x2 tiles
+        assert len(shapes) == 7
+        assert all(max(shape[:2]) <= 128 for shape in shapes[1:])
+
+    def test_matches_untiled_mask(
+        self, processor: ImageProcessor, large_image: Image.Image,
+    ) -> None:
+        tiled = processor.compute_mask(large_image, tile_size=128, tile_overlap=32)
+        plain = processor.compute_mask(large_image)
+        assert tiled.size == large_image.size
+        assert tiled.tobytes() == plain.tobytes()
+
+    def test_small_image_not_tiled(
+        self, processor: ImageProcessor, sample_image: Image.Image, created_sessions: list,
+    ) -> None:
+        processor.compute_mask(sample_image, tile_size=128)
+        assert created_sessions[0].calls == 1
+
+    def test_remove_background_tiled(
+        self, processor: ImageProcessor, large_image: Image.Image,
+    ) -> None:
+        result = processor.remove_background(large_image, tile_size=128)
+        assert result.getpixel((10, 10))[3] == 0
+        assert result.getpixel((150, 100))[3] == 255
+
+    def test_batch_tiled(
+        self, processor: ImageProcessor, large_image: Image.Image, created_sessions: list, tmp_path,
+    ) -> None:
+        path = str(tmp_path / "large.png")
+        large_image.save(path)
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        report = run_batch(processor, [path], str(out_dir), tile_size=128)
+        assert report["complete"] == (1, 1)
+        assert all(max(shape[:2]) <= 128 for shape in created_sessions[0].input_shapes[1:])
+
+
+class TestMaskCache:
+    """Mask cache integration tests."""
+
+    @pytest.fixture
+    def cached_processor(self, created_sessions: list, tmp_path) -> ImageProcessor:
+        return ImageProcessor(mask_cache=MaskCache(str(tmp_path / "cache")))
+
+    def test_second_call_skips_model(
+        self, cached_processor: ImageProcessor, sample_image: Image.Image, created_sessions: list,
+    ) -> None:
+        first = cached_processor.remove_background(sample_image)
+        second = cached_processor.remove_background(sample_image.copy())
+        assert created_sessions[0].calls == 1
+        assert first.tobytes() == second.tobytes()
+        stats = cached_processor.mask_cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_settings_are_part_of_key(
+        self, cached_processor: ImageProcessor, sample_image: Image.Image, created_sessions: list,
+    ) -> None:
+        cached_processor.compute_mask(sample_image)
+        cached_processor.compute_mask(sample_image, max_inference_side=20)
+        cached_processor.compute_mask(sample_image, model_name="u2netp")
+        assert sum(s.calls for s in created_sessions) == 3
+
+    def test_disk_tier_shared_between_processors(
+        self, created_sessions: list, sample_image: Image.Image, tmp_path,
+    ) -> None:
+        ImageProcessor(mask_cache=MaskCache(str(tmp_path))).compute_mask(sample_image)
+        ImageProcessor(mask_cache=MaskCache(str(tmp_path))).compute_mask(sample_image)
+        assert sum(s.calls for s in created_sessions) == 1
+
+
+class TestIterProcess:
+    """Streaming batch API tests."""
+
+    def test_yields_structured_results(
+        self, processor: ImageProcessor, batch_files: list, tmp_path,
+    ) -> None:
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        results = list(processor.iter_process(iter(batch_files), str(out_dir)))
+        assert len(results) == 5
+        assert all(r.ok for r in results)
+        assert sorted(r.input_path for r in results) == batch_files
+        assert all(os.path.exists(r.output_path) for r in results)
+        assert set(results[0].timings) == {"decode", "infer", "encode"}
+        assert results[0].to_dict()["error"] is None
+
+    def test_jpeg_decoded_at_inference_scale(
+        self, processor: ImageProcessor, created_sessions: list, sample_image: Image.Image, tmp_path,
+    ) -> None:
+        path = str(tmp_path / "photo.jpg")
+        sample_image.resize((800, 400)).save(path, quality=95)
+        result = next(processor.iter_process([path], str(tmp_path), max_inference_side=100))
+        assert result.ok
+        assert created_sessions[0].input_shapes[-1][:2] == (50, 100)
+        output = Image.open(result.output_path)
+        assert output.size == (800, 400)
+        assert output.getpixel((100, 200))[3] == 0
+        assert output.getpixel((700, 200))[3] == 255
+
+    def test_ordered_delivery(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        inputs = batch_files * 4
+        results = list(processor.iter_process(inputs, str(tmp_path), ordered=True, encode_workers=4))
+        assert [r.input_path for r in results] == inputs
+
+    def test_error_result(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        missing = str(tmp_path / "missing.png")
+        results = list(processor.iter_process([batch_files[0], missing], str(tmp_path), ordered=True))
+        assert results[0].ok
+        assert not results[1].ok
+        assert results[1].output_path is None
+        assert "missing.png" in repr(results[1])
+
+    def test_inputs_pulled_lazily(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        pulled = []
+
+        def endless():
+            while True:
+                pulled.append(1)
+                yield batch_files[0]
+
+        stream = processor.iter_process(endless(), str(tmp_path), read_ahead=2)
+        for _, result in zip(range(10), stream):
+            assert result.ok
+        stream.close()
+        # Read-ahead is bounded by the pipeline queues, not the input size
+        assert len(pulled) < 40
+
+    def test_cancel_stops_stream(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        count = 0
+        for _ in processor.iter_process(batch_files * 20, str(tmp_path), read_ahead=1):
+            count += 1
+            processor.cancel()
+        assert count < 20
+
+
+class TestProcessPool:
+    """Multi-process batch tests."""
+
+    def test_default_worker_count(self, monkeypatch) -> None:
+        monkeypatch.setattr(os, "cpu_count", lambda: 32)
+        assert default_worker_count(4) == 8
+        assert default_worker_count(64) == 1
+
+    def test_default_worker_count_unknown_cpus(self, monkeypatch) -> None:
+        monkeypatch.setattr(os, "cpu_count", lambda: None)
+        assert default_worker_count() == 1
+
+    @fork_only
+    def test_process_pool_batch(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        report = run_batch(processor, batch_files, str(out_dir), use_processes=True, workers=2)
+        assert report["complete"] == (5, 5)
+        assert sorted(report["progress"]) == [1, 2, 3, 4, 5]
+        assert len(os.listdir(out_dir)) == 5
+
+    @fork_only
+    def test_process_pool_reports_errors(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        files = batch_files[:2] + [str(tmp_path / "missing.png")]
+        report = run_batch(processor, files, str(tmp_path), use_processes=True, workers=2)
+        assert report["complete"] == (2, 3)
+        assert [name for name, _ in report["errors"]] == ["missing.png"]
+
+    @fork_only
+    def test_process_pool_cancel_drains_in_flight(
+        self, processor: ImageProcessor, batch_files: list, tmp_path,
+    ) -> None:
+        def on_progress(current: int, total: int, name: str) -> None:
+            processor.cancel()
+
+        report = run_batch(
+            processor, batch_files, str(tmp_path),
+            use_processes=True, workers=1, on_progress=on_progress,
+        )
+        # One worker runs one file at a time; it finishes, nothing new starts
+        assert report["complete"] == (1, 5)
+
+    @fork_only
+    def test_hung_file_times_out(self, monkeypatch, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        def hanging_remove(data: np.ndarray, session: FakeSession = None, **kwargs) -> np.ndarray:
+            if data.shape[:2] == (7, 7):
+                time.sleep(30)
+            return fake_remove(data, session, **kwargs)
+
+        monkeypatch.setattr(backends, "_rembg_remove", hanging_remove)
+        hung = str(tmp_path / "hung.png")
+        Image.new("RGB", (7, 7)).save(hung)
+        report = run_batch(processor, [hung] + batch_files, str(tmp_path), workers=2, task_timeout=1.0)
+        assert report["complete"] == (5, 6)
+        assert report["errors"] == [("hung.png", "timeout: timed out after 1s")]
+
+    @fork_only
+    def test_crash_isolated(self, monkeypatch, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        def crashing_remove(data: np.ndarray, session: FakeSession = None, **kwargs) -> np.ndarray:
+            if data.shape[:2] == (7, 7):
+                os._exit(70)  # Dies like a native crash: no exception, no reply
+            return fake_remove(data, session, **kwargs)
+
+        monkeypatch.setattr(backends, "_rembg_remove", crashing_remove)
+        bad = str(tmp_path / "bad.png")
+        Image.new("RGB", (7, 7)).save(bad)
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        files = batch_files[:2] + [bad] + batch_files[2:]
+        report = run_batch(processor, files, str(out_dir), use_processes=True, workers=1)
+        assert report["complete"] == (5, 6)
+        assert report["errors"] == [("bad.png", "crash: worker crashed (exit code 70)")]
+        assert len(os.listdir(out_dir)) == 5
+
+    @fork_only
+    def test_workers_recycled(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        report = run_batch(processor, batch_files, str(tmp_path), workers=1, max_tasks_per_worker=2)
+        assert report["complete"] == (5, 5)
+
+
+class TestMemoryAdmission:
+    """Memory-budgeted batch tests."""
+
+    def test_budget_bounds_in_flight(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        per_image = estimate_memory(batch_files[0])
+        results = list(processor.iter_process(
+            batch_files, str(tmp_path), decode_workers=2, encode_workers=2, memory_budget=per_image * 2,
+        ))
+        assert all(r.ok for r in results)
+        stats = processor.last_admission_stats
+        assert stats["admitted"] == 5
+        assert stats["peak"] <= per_image * 2
+        assert stats["in_use"] == 0
+
+    def test_oversized_image_processed(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        results = list(processor.iter_process(batch_files, str(tmp_path), memory_budget=1))
+        assert all(r.ok for r in results)
+        assert processor.last_admission_stats["peak"] == estimate_memory(batch_files[0])
+
+    def test_batch_process_budget(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        report = run_batch(processor, batch_files, str(tmp_path), memory_budget=10 ** 9)
+        assert report["complete"] == (5, 5)
+        assert processor.last_admission_stats["waits"] == 0
+
+    @fork_only
+    def test_process_pool_budget(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        per_image = estimate_memory(batch_files[0])
+        report = run_batch(
+            processor, batch_files, str(tmp_path), use_processes=True, workers=3, memory_budget=per_image,
+        )
+        assert report["complete"] == (5, 5)
+        stats = processor.last_admission_stats
+        assert stats["peak"] == per_image
+        assert stats["waits"] >= 1
+
+
+class TestTriageRouting:
+    """Triage routing tests for batch runs."""
+
+    @pytest.fixture
+    def mixed_files(self, sample_image: Image.Image, tmp_path) -> dict:
+        """One transparent cut-out, one flat-background packshot and one busy photo."""
+        cutout = sample_image.convert("RGBA")
+        cutout.putalpha(sample_image.convert("L"))
+        packshot = Image.new("RGB", (40, 20), (255, 255, 255))
+        packshot.paste((20, 20, 200), (10, 5, 30, 15))
+        rng = np.random.default_rng(0)
+        photo = Image.fromarray(rng.integers(0, 256, (20, 40, 3), dtype=np.uint8), "RGB")
+        paths = {}
+        for name, image in (("cutout", cutout), ("packshot", packshot), ("photo", photo)):
+            paths[name] = str(tmp_path / f"{name}.png")
+            image.save(paths[name])
+        return paths
+
+    def test_iter_process_routes(
+        self, processor: ImageProcessor, created_sessions: list, mixed_files: dict, tmp_path,
+    ) -> None:
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        results = {
+            os.path.basename(r.input_path): r
+            for r in processor.iter_process(mixed_files.values(), str(out_dir), use_triage=True)
+        }
+        assert {name: r.route for name, r in results.items()} == {
+            "cutout.png": "passthrough", "packshot.png": "color_key", "photo.png": "model",
+        }
+        assert processor.last_triage_counts == {"passthrough": 1, "color_key": 1, "model": 1}
+        # Only the photo reached the model
+        assert created_sessions[0].calls == 1
+        cutout = Image.open(results["cutout.png"].output_path)
+        assert cutout.getchannel("A").tobytes() == Image.open(mixed_files["cutout"]).getchannel("A").tobytes()
+        packshot = Image.open(results["packshot.png"].output_path)
+        assert packshot.getpixel((2, 2))[3] == 0
+        assert packshot.getpixel((20, 10))[3] == 255
+        assert "triage" in results["photo.png"].timings
+
+    def test_without_triage(self, processor: ImageProcessor, mixed_files: dict, tmp_path) -> None:
+        results = list(processor.iter_process(mixed_files.values(), str(tmp_path)))
+        assert all(r.route is None for r in results)
+        assert processor.last_triage_counts is None
+
+    def test_batched_inference(self, processor: ImageProcessor, mixed_files: dict, tmp_path) -> None:
+        results = list(processor.iter_process(
+            list(mixed_files.values()) * 2, str(tmp_path), use_triage=True, inference_batch_size=4,
+        ))
+        assert all(r.ok for r in results)
+        assert processor.last_triage_counts == {"passthrough": 2, "color_key": 2, "model": 2}
+
+    @fork_only
+    def test_process_pool_routes(self, processor: ImageProcessor, mixed_files: dict, tmp_path) -> None:
+        report = run_batch(processor, list(mixed_files.values()), str(tmp_path), use_processes=True, use_triage=True)
+        assert report["complete"] == (3, 3)
+        assert processor.last_triage_counts == {"passthrough": 1, "color_key": 1, "model": 1}
+
+
+class TestKeyingBackend:
+    """Colour keying backend tests."""
+
+    GREEN = (0, 177, 64)
+
+    @pytest.fixture
+    def greenscreen(self) -> Image.Image:
+        """A red box with a green cast on a green screen."""
+        image = Image.new("RGB", (40, 20), self.GREEN)
+        image.paste((140, 170, 150), (10, 5, 30, 15))
+        return image
+
+    @pytest.fixture
+    def greenscreen_files(self, greenscreen: Image.Image, tmp_path) -> list:
+        paths = []
+        for i in range(3):
+            path = str(tmp_path / f"green{i}.png")
+            greenscreen.save(path)
+            paths.append(path)
+        return paths
+
+    def test_remove_background(
+        self, processor: ImageProcessor, created_sessions: list, greenscreen: Image.Image,
+    ) -> None:
+        result = processor.remove_background(greenscreen, backend="keying")
+        assert result.getpixel((2, 2))[3] == 0
+        r, g, b, a = result.getpixel((20, 10))
+        assert a == 255
+        assert g <= max(r, b) + 16  # Spill suppressed
+        assert not created_sessions  # The model was never loaded
+
+    def test_compute_mask_skips_cache(self, created_sessions: list, greenscreen: Image.Image, tmp_path) -> None:
+        cache = MaskCache(str(tmp_path / "cache"))
+        proc = ImageProcessor(mask_cache=cache)
+        mask = proc.compute_mask(greenscreen, backend="keying")
+        assert mask.getpixel((2, 2)) == 0 and mask.getpixel((20, 10)) == 255
+        assert cache.stats()["misses"] == 0
+        proc.close()
+
+    def test_unknown_backend(self, processor: ImageProcessor, greenscreen: Image.Image) -> None:
+        with pytest.raises(ValueError, match="Unknown backend"):
+            processor.compute_mask(greenscreen, backend="magic")
+        assert processor.remove_background(greenscreen, backend="magic") is None
+
+    def test_iter_process(
+        self, processor: ImageProcessor, created_sessions: list, greenscreen_files: list, tmp_path,
+    ) -> None:
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        results = list(processor.iter_process(
+            greenscreen_files, str(out_dir), backend="keying", max_inference_side=8, inference_batch_size=2,
+        ))
+        assert all(r.ok for r in results)
+        output = Image.open(results[0].output_path)
+        # Keyed at full resolution despite max_inference_side
+        assert output.size == (40, 20)
+        assert output.getpixel((2, 2))[3] == 0 and output.getpixel((20, 10))[3] == 255
+        assert not created_sessions
+
+    def test_batch_process_rejects_unknown_backend(self, processor: ImageProcessor, tmp_path) -> None:
+        with pytest.raises(ValueError):
+            processor.batch_process([], str(tmp_path), backend="magic")
+
+    @fork_only
+    def test_process_pool(self, processor: ImageProcessor, greenscreen_files: list, tmp_path) -> None:
+        report = run_batch(processor, greenscreen_files, str(tmp_path), use_processes=True, backend="keying")
+        assert report["complete"] == (3, 3)
+        output = Image.open(tmp_path / "green0_nobg.png")
+        assert output.getpixel((2, 2))[3] == 0 and output.getpixel((20, 10))[3] == 255
+
+
+class TestBackends:
+    """Pluggable backend and model tier tests."""
+
+    def test_fake_backend(self, processor: ImageProcessor, created_sessions: list, sample_image: Image.Image) -> None:
+        result = processor.remove_background(sample_image, backend="fake")
+        assert result.getpixel((5, 5))[3] == 0 and result.getpixel((30, 5))[3] == 255
+        assert not created_sessions
+
+    def test_fake_backend_batches(self, processor: ImageProcessor, sample_image: Image.Image) -> None:
+        masks = processor.compute_masks([sample_image] * 3, backend="fake")
+        fake = processor.get_backend("fake")
+        assert fake.calls == 1 and len(fake.input_shapes) == 3
+        assert all(m.tobytes() == masks[0].tobytes() for m in masks)
+
+    def test_fake_backend_iter_process(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        results = list(processor.iter_process(batch_files, str(tmp_path), backend="fake", inference_batch_size=2))
+        assert all(r.ok for r in results)
+        assert len(processor.get_backend("fake").input_shapes) == 5
+
+    def test_backend_instances_per_processor(self, processor: ImageProcessor) -> None:
+        assert processor.get_backend("fake") is processor.get_backend("fake")
+        other = ImageProcessor()
+        assert other.get_backend("fake") is not processor.get_backend("fake")
+        assert processor.get_backend("keying").keyer is processor.keyer
+        assert processor.get_backend().registry is processor.registry
+
+    def test_cache_keys_per_backend_and_tier(self, created_sessions: list, sample_image: Image.Image, tmp_path) -> None:
+        proc = ImageProcessor(mask_cache=MaskCache(str(tmp_path)))
+        proc.compute_mask(sample_image, "balanced")
+        proc.compute_mask(sample_image, "u2net")  # Same model as the tier: cache hit
+        proc.compute_mask(sample_image, "u2net", backend="fake")
+        assert proc.mask_cache.stats()["hits"] == 1
+        assert [s.model_name for s in created_sessions] == ["u2net"]
+        proc.close()
+
+    def test_tier_model_name(self, created_sessions: list, sample_image: Image.Image) -> None:
+        proc = ImageProcessor("fast")
+        proc.compute_mask(sample_image)
+        assert proc.loaded_models == ["u2netp"]
+        proc.close()
+
+    def test_warm_up_without_model(self, processor: ImageProcessor, created_sessions: list) -> None:
+        assert processor.warm_up(backend="fake", dummy_inference=True)
+        assert not created_sessions
+        assert not processor.warm_up(backend="magic")
+
+    @fork_only
+    def test_process_pool(self, processor: ImageProcessor, batch_files: list, tmp_path) -> None:
+        report = run_batch(processor, batch_files, str(tmp_path), use_processes=True, backend="fake")
+        assert report["complete"] == (5, 5)
+        assert Image.open(tmp_path / "img0_nobg.png").getpixel((5, 5))[3] == 0
@@ -0,0 +1,91 @@
+"""IsolatedPool tests — timeouts, crashes, out-of-memory and worker recycling."""
+
+import os
+import threading
+import time
+
+import pytest
+
+from core.isolation import FAILURE_CRASH, FAILURE_ERROR, FAILURE_OOM, FAILURE_TIMEOUT, IsolatedPool
+
+
+def task(kind: str, value: int = 0) -> tuple:
+    """Worker task: misbehaves according to ``kind``, else returns ``(value, pid)``."""
+    if kind == "hang":
+        time.sleep(30)
+    elif kind == "exit":
+        os._exit(3)
+    elif kind == "kill":
+        os.kill(os.getpid(), 9)
+    elif kind == "memory":
+        raise MemoryError("cannot allocate")
+    elif kind == "raise":
+        raise ValueError("bad input")
+    return value, os.getpid()
+
+
+def failing_initializer() -> None:
+    raise RuntimeError("no model")
+
+
+def run(pool: IsolatedPool, tasks: list, cancel_event: threading.Event = None) -> list:
+    with pool:
+        return list(pool.imap(tasks, cancel_event))
+
+
+class TestIsolatedPool:
+    """Worker lifecycle tests."""
+
+    def test_results(self) -> None:
+        outcomes = run(IsolatedPool(task, workers=2), [("ok", i) for i in range(6)])
+        assert sorted(o.value[0] for o in outcomes) == list(range(6))
+        assert all(o.ok and o.reason is None for o in outcomes)
+        assert outcomes[0].args[0] == "ok"
+
+    def test_errors_keep_worker(self) -> None:
+        pool = IsolatedPool(task, workers=1)
+        outcomes = run(pool, [("raise",), ("ok", 1)])
+        assert (outcomes[0].reason, outcomes[0].error) == (FAILURE_ERROR, "bad input")
+        assert outcomes[1].ok
+        assert pool.stats()["spawned"] == 1
+
+    def test_timeout_replaces_worker(self) -> None:
+        pool = IsolatedPool(task, workers=1, task_timeout=0.5)
+        started = time.monotonic()
+        outcomes = run(pool, [("hang",), ("ok", 1)])
+        assert time.monotonic() - started < 10
+        assert outcomes[0].reason == FAILURE_TIMEOUT
+        assert outcomes[0].error == "timed out after 0.5s"
+        assert outcomes[1].ok
+        assert pool.stats() == {"spawned": 2, "timeouts": 1, "crashes": 0, "recycled": 0}
+
+    @pytest.mark.parametrize("kind, reason", [("exit", FAILURE_CRASH), ("kill", FAILURE_OOM), ("memory", FAILURE_OOM)])
+    def test_failure_reasons(self, kind: str, reason: str) -> None:
+        outcomes = run(IsolatedPool(task, workers=1), [("ok", 1), (kind,), ("ok", 2)])
+        assert [o.reason for o in outcomes] == [None, reason, None]
+
+    def test_crash_message(self) -> None:
+        outcome = run(IsolatedPool(task), [("exit",)])[0]
+        assert outcome.error == "worker crashed (exit code 3)"
+
+    def test_recycling(self) -> None:
+        pool = IsolatedPool(task, workers=1, max_tasks_per_worker=2)
+        outcomes = run(pool, [("ok", i) for i in range(5)])
+        pids = [o.value[1] for o in outcomes]
+        assert len(set(pids)) == 3
+        assert pids[0] == pids[1] != pids[2]
+        assert pool.stats()["recycled"] == 2
+
+    def test_cancel_stops_dispatch(self) -> None:
+        cancel = threading.Event()
+        pool = IsolatedPool(task, workers=1)
+        outcomes = []
+        with pool:
+            for outcome in pool.imap([("ok", i) for i in range(5)], cancel):
+                outcomes.append(outcome)
+                cancel.set()
+        assert len(outcomes) == 1
+
+    def test_initializer_failure(self) -> None:
+        with pytest.raises(RuntimeError, match="no model"):
+            run(IsolatedPool(task, initializer=failing_initializer), [("ok",)])
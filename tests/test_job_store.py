@@ -0,0 +1,224 @@
+"""JobStore / StoreWorker tests — leases, retries, resume and worker processes."""
+
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import core.backends as backends
+from core.image_processor import ImageProcessor
+from core.job_store import (
+    LEASE_EXPIRED_ERROR, STORE_DONE, STORE_FAILED, STORE_PENDING, STORE_RUNNING, JobStore, StoreWorker,
+    run_store_workers,
+)
+
+
+class FakeSession:
+    """Stand-in for a rembg session."""
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+
+
+def fake_remove(data: np.ndarray, session: FakeSession = None, only_mask: bool = False, **kwargs) -> np.ndarray:
+    """Stand-in for ``rembg.remove`` — keeps bright pixels as foreground."""
+    return np.where(data[..., :3].mean(axis=2) > 127, 255, 0).astype(np.uint8)
+
+
+@pytest.fixture
+def processor(monkeypatch) -> ImageProcessor:
+    monkeypatch.setattr(backends, "_rembg_remove", fake_remove)
+    monkeypatch.setattr(backends, "_rembg_new_session", FakeSession)
+    proc = ImageProcessor()
+    yield proc
+    proc.close()
+
+
+@pytest.fixture
+def store(tmp_path) -> JobStore:
+    job_store = JobStore(str(tmp_path / "jobs.db"), lease_seconds=30, retry_backoff=0)
+    yield job_store
+    job_store.close()
+
+
+@pytest.fixture
+def inputs(tmp_path) -> list:
+    paths = []
+    for i in range(6):
+        path = str(tmp_path / f"img{i}.png")
+        Image.new("RGB", (12, 8), (255, 255, 255)).save(path)
+        paths.append(path)
+    return paths
+
+
+fork_only = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="stand-in session is only inherited by forked workers",
+)
+
+
+class TestJobStore:
+    """Queue operation tests."""
+
+    def test_add_ignores_duplicates(self, store: JobStore, inputs: list, tmp_path) -> None:
+        assert store.add(inputs, str(tmp_path / "out")) == 6
+        assert store.add(inputs[:3], str(tmp_path / "out")) == 0
+        assert store.add(inputs[:1], str(tmp_path / "other")) == 1
+        assert store.counts()[STORE_PENDING] == 7
+
+    def test_claim_leases(self, store: JobStore, inputs: list, tmp_path) -> None:
+        store.add(inputs, str(tmp_path))
+        first = store.claim("a", limit=4)
+        second = store.claim("b", limit=4)
+        assert [j.job_id for j in first] == [1, 2, 3, 4]
+        assert [j.job_id for j in second] == [5, 6]
+        assert store.claim("c") == []
+        assert all(j.status == STORE_RUNNING and j.attempts == 1 for j in first)
+
+    def test_expired_lease_reclaimed(self, tmp_path, inputs: list) -> None:
+        store = JobStore(str(tmp_path / "jobs.db"), lease_seconds=0.05, retry_backoff=0)
+        store.add(inputs[:1], str(tmp_path))
+        job = store.claim("crashed")[0]
+        assert store.claim("other") == []
+        time.sleep(0.1)
+        reclaimed = store.claim("other")
+        assert [j.job_id for j in reclaimed] == [job.job_id]
+        assert reclaimed[0].attempts == 2
+        # The crashed worker lost its lease
+        assert not store.complete(job.job_id, "crashed", "x.png")
+        assert store.complete(job.job_id, "other", "x.png", {"infer": 0.5})
+
+    def test_expired_leases_back_off_then_fail(self, tmp_path, inputs: list) -> None:
+        store = JobStore(str(tmp_path / "jobs.db"), lease_seconds=0.05, max_attempts=2, retry_backoff=0.2)
+        store.add(inputs[:1], str(tmp_path))
+        store.claim("crashed")
+        time.sleep(0.1)
+        # The expired attempt backs off like a reported failure
+        assert store.claim("other") == []
+        pending = store.jobs(STORE_PENDING)[0]
+        assert pending.error == LEASE_EXPIRED_ERROR and pending.attempts == 1
+        time.sleep(0.25)
+        assert store.claim("crashed")[0].attempts == 2
+        time.sleep(0.1)
+        # Out of attempts: failed instead of being reclaimed forever
+        assert store.claim("other") == []
+        failed = store.jobs(STORE_FAILED)
+        assert [j.error for j in failed] == [LEASE_EXPIRED_ERROR]
+
+    def test_extend_leases(self, tmp_path, inputs: list) -> None:
+        store = JobStore(str(tmp_path / "jobs.db"), lease_seconds=0.2)
+        store.add(inputs[:1], str(tmp_path))
+        job = store.claim("a")[0]
+        for _ in range(3):
+            time.sleep(0.1)
+            assert store.extend_leases("a", [job.job_id]) == 1
+        assert store.claim("b") == []
+
+    def test_retry_with_backoff(self, tmp_path, inputs: list) -> None:
+        store = JobStore(str(tmp_path / "jobs.db"), max_attempts=2, retry_backoff=0.1)
+        store.add(inputs[:1], str(tmp_path))
+        job = store.claim("a")[0]
+        assert store.fail(job.job_id, "a", "boom") == STORE_PENDING
+        assert store.claim("a") == []  # Still backing off
+        time.sleep(0.15)
+        job = store.claim("a")[0]
+        assert store.fail(job.job_id, "a", "boom again") == STORE_FAILED
+        failed = store.jobs(STORE_FAILED)
+        assert failed[0].error == "boom again"
+        assert store.retry_failed() == 1
+        assert store.claim("a")[0].attempts == 1
+
+    def test_release_keeps_attempts(self, store: JobStore, inputs: list, tmp_path) -> None:
+        store.add(inputs[:2], str(tmp_path))
+        store.claim("a", limit=2)
+        assert store.release("a") == 2
+        assert all(j.attempts == 0 for j in store.jobs(STORE_PENDING))
+
+    def test_stats(self, store: JobStore, inputs: list, tmp_path) -> None:
+        store.add(inputs[:2], str(tmp_path))
+        for job in store.claim("a", limit=2):
+            store.complete(job.job_id, "a", "out.png", {"decode": 0.1, "infer": 0.3})
+        stats = store.stats()
+        assert stats[STORE_DONE] == 2
+        assert stats["avg_elapsed"] == pytest.approx(0.4)
+        done = store.jobs(STORE_DONE)[0]
+        assert done.timings == {"decode": 0.1, "infer": 0.3}
+
+
+class TestStoreWorker:
+    """Worker loop tests."""
+
+    def test_drains_store(self, store: JobStore, processor: ImageProcessor, inputs: list, tmp_path) -> None:
+        out_dir = str(tmp_path / "out")
+        store.add(inputs, out_dir)
+        counts = StoreWorker(store, processor, worker_id="w1", poll_interval=0.01).run()
+        assert counts == {STORE_DONE: 6, STORE_FAILED: 0, "retried": 0}
+        assert store.counts() == {STORE_PENDING: 0, STORE_RUNNING: 0, STORE_DONE: 6, STORE_FAILED: 0}
+        assert len(os.listdir(out_dir)) == 6
+        job = store.jobs(STORE_DONE)[0]
+        assert job.output_path == os.path.join(out_dir, "img0_nobg.png")
+        assert set(job.timings) == {"decode", "infer", "encode"}
+
+    def test_same_input_for_two_output_dirs(
+        self, store: JobStore, processor: ImageProcessor, inputs: list, tmp_path,
+    ) -> None:
+        first, second = str(tmp_path / "first"), str(tmp_path / "second")
+        store.add(inputs[:1], first)
+        store.add(inputs[:1], second)
+        counts = StoreWorker(store, processor, claim_size=2, poll_interval=0.01).run()
+        assert counts[STORE_DONE] == 2
+        outputs = {job.output_dir: job.output_path for job in store.jobs(STORE_DONE)}
+        assert outputs == {
+            first: os.path.join(first, "img0_nobg.png"),
+            second: os.path.join(second, "img0_nobg.png"),
+        }
+        assert all(os.path.isfile(path) for path in outputs.values())
+
+    def test_broken_input_retried_then_failed(self, tmp_path, processor: ImageProcessor, inputs: list) -> None:
+        store = JobStore(str(tmp_path / "jobs.db"), max_attempts=2, retry_backoff=0)
+        broken = str(tmp_path / "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+        store.add(inputs[:2] + [broken], str(tmp_path / "out"))
+        counts = StoreWorker(store, processor, poll_interval=0.01).run()
+        assert counts == {STORE_DONE: 2, STORE_FAILED: 1, "retried": 1}
+        failed = store.jobs(STORE_FAILED)
+        assert [j.input_path for j in failed] == [broken]
+        assert failed[0].attempts == 2
+
+    def test_resumes_after_crash(self, tmp_path, processor: ImageProcessor, inputs: list) -> None:
+        path = str(tmp_path / "jobs.db")
+        crashed = JobStore(path, lease_seconds=0.05, retry_backoff=0)
+        crashed.add(inputs, str(tmp_path / "out"))
+        # A previous run finished two jobs and died holding two leases
+        for job in crashed.claim("dead", limit=2):
+            crashed.complete(job.job_id, "dead", "old.png")
+        crashed.claim("dead", limit=2)
+        time.sleep(0.1)
+
+        counts = StoreWorker(JobStore(path, lease_seconds=0.05, retry_backoff=0), processor, poll_interval=0.01).run()
+        assert counts[STORE_DONE] == 4
+        assert crashed.counts()[STORE_DONE] == 6
+
+    def test_cancel_releases_jobs(self, store: JobStore, processor: ImageProcessor, inputs: list, tmp_path) -> None:
+        store.add(inputs, str(tmp_path / "out"))
+        cancel = threading.Event()
+        cancel.set()
+        StoreWorker(store, processor).run(cancel)
+        counts = store.counts()
+        assert counts[STORE_RUNNING] == 0
+        assert counts[STORE_PENDING] + counts[STORE_DONE] == 6
+        assert all(j.attempts == 0 for j in store.jobs(STORE_PENDING))
+
+    @fork_only
+    def test_worker_processes(self, store: JobStore, processor: ImageProcessor, inputs: list, tmp_path) -> None:
+        store.add(inputs, str(tmp_path / "out"))
+        counts = run_store_workers(store.path, processes=2, claim_size=1, poll_interval=0.01)
+        assert counts[STORE_DONE] == 6
+        assert store.counts()[STORE_DONE] == 6
+        owners = {j.output_path for j in store.jobs(STORE_DONE)}
+        assert len(owners) == 6
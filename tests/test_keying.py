@@ -0,0 +1,151 @@
+"""Keying tests — Lab conversion, ramp, flood fill and spill suppression."""
+
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import core.keying as keying
+from core.keying import ChromaKeyer, border_connected, detect_background, lab_distance, srgb_to_lab
+
+GREEN = (0, 177, 64)
+
+
+def packshot(background: tuple = (255, 255, 255), size: tuple = (80, 60)) -> Image.Image:
+    """A red box on a flat background."""
+    image = Image.new("RGB", size, background)
+    image.paste((200, 30, 30), (20, 15, 60, 45))
+    return image
+
+
+class TestLab:
+    """Colour conversion tests."""
+
+    @pytest.mark.parametrize("rgb, lab", [
+        ((255, 255, 255), (100.0, 0.0, 0.0)),
+        ((0, 0, 0), (0.0, 0.0, 0.0)),
+        ((255, 0, 0), (53.24, 80.09, 67.20)),
+        ((0, 255, 0), (87.73, -86.18, 83.18)),
+        ((0, 0, 255), (32.30, 79.19, -107.86)),
+    ])
+    def test_reference_colours(self, rgb: tuple, lab: tuple) -> None:
+        np.testing.assert_allclose(srgb_to_lab(np.array(rgb, dtype=np.uint8)), lab, atol=0.05)
+
+    def test_distance_shape_and_zero(self) -> None:
+        rgb = np.asarray(packshot())
+        distance = lab_distance(rgb, (255, 255, 255))
+        assert distance.shape == (60, 80)
+        assert distance[0, 0] == pytest.approx(0.0, abs=1e-3)
+        assert distance[30, 40] > 50
+
+    def test_chunked_matches_whole(self, monkeypatch) -> None:
+        rng = np.random.default_rng(0)
+        rgb = rng.integers(0, 256, (37, 29, 3), dtype=np.uint8)
+        whole = lab_distance(rgb, GREEN)
+        monkeypatch.setattr(keying, "_CHUNK_PIXELS", 50)
+        np.testing.assert_allclose(lab_distance(rgb, GREEN), whole, rtol=1e-6)
+
+
+class TestFloodFill:
+    """Border-connected region tests."""
+
+    def test_enclosed_region_not_reached(self) -> None:
+        candidate = np.ones((50, 50), dtype=bool)
+        candidate[10, 10:40] = candidate[39, 10:40] = False
+        candidate[10:40, 10] = candidate[10:40, 39] = False
+        reached = border_connected(candidate)
+        assert reached[0, 0] and reached[45, 45]
+        assert not reached[20, 20]
+        assert not reached[10, 20]  # Blocked pixels are never reached
+
+    def test_winding_path(self) -> None:
+        # A spiral corridor needs several row/column passes to fill
+        candidate = np.ones((50, 50), dtype=bool)
+        candidate[10, 5:45] = False
+        candidate[10:40, 45] = False
+        candidate[40, 5:46] = False
+        candidate[15:41, 5] = False
+        candidate[15, 5:40] = False
+        candidate[15:36, 40] = False
+        assert border_connected(candidate)[20, 20]
+
+    def test_wall_splits_image(self) -> None:
+        candidate = np.ones((6, 6), dtype=bool)
+        candidate[:, 3] = False
+        reached = border_connected(candidate)
+        assert reached[:, :3].all() and reached[:, 4:].all()
+        assert not reached[:, 3].any()
+
+    def test_nothing_blocked(self) -> None:
+        assert border_connected(np.ones((4, 5), dtype=bool)).all()
+
+
+class TestChromaKeyer:
+    """Mask and spill suppression tests."""
+
+    def test_detects_background(self) -> None:
+        assert detect_background(packshot(GREEN)) == GREEN
+
+    def test_mask(self) -> None:
+        mask = ChromaKeyer().compute_mask(packshot())
+        assert mask.mode == "L" and mask.size == (80, 60)
+        assert mask.getpixel((2, 2)) == 0
+        assert mask.getpixel((40, 30)) == 255
+
+    def test_soft_ramp(self) -> None:
+        image = Image.new("RGB", (3, 1))
+        image.putdata([(255, 255, 255), (255, 255, 230), (0, 0, 0)])
+        keyer = ChromaKeyer((255, 255, 255), tolerance=5, softness=20, flood_fill=False)
+        delta = float(lab_distance(np.asarray(image), (255, 255, 255))[0, 1])
+        assert 5 < delta < 25  # Inside the ramp
+        expected = [0, round((delta - 5) / 20 * 255), 255]
+        assert [keyer.compute_mask(image).getpixel((x, 0)) for x in range(3)] == expected
+
+    def test_flood_fill_keeps_enclosed_key_colour(self) -> None:
+        image = packshot()
+        image.paste((255, 255, 255), (35, 25, 45, 35))  # White label inside the product
+        assert ChromaKeyer().compute_mask(image).getpixel((40, 30)) == 255
+        assert ChromaKeyer(flood_fill=False).compute_mask(image).getpixel((40, 30)) == 0
+
+    def test_configured_background(self) -> None:
+        mask = ChromaKeyer(GREEN).compute_mask(packshot())
+        # White is far from the configured green: nothing is keyed
+        assert mask.getpixel((2, 2)) == 255
+
+    def test_chroma_spill(self) -> None:
+        image = packshot(GREEN)
+        image.paste((120, 200, 110), (30, 20, 50, 40))  # Green cast on the product
+        keyer = ChromaKeyer(spill=1.0)
+        mask = keyer.compute_mask(image)
+        r, g, b = keyer.suppress_spill(image, mask).getpixel((40, 30))
+        assert g == max(r, b) == 120
+        assert keyer.suppress_spill(image, mask).getpixel((25, 20)) == (200, 30, 30)
+
+    def test_neutral_spill_unmixes_edges(self) -> None:
+        image = Image.new("RGB", (2, 1))
+        # 50 % red over white
+        image.putdata([(255, 255, 255), (228, 143, 143)])
+        mask = Image.new("L", (2, 1))
+        mask.putdata([0, 128])
+        result = ChromaKeyer((255, 255, 255), spill=1.0).suppress_spill(image, mask)
+        r, g, b = result.getpixel((1, 0))
+        assert r > 195 and g < 40 and b < 40
+
+    def test_spill_off_returns_image(self) -> None:
+        image = packshot(GREEN)
+        keyer = ChromaKeyer(spill=0)
+        assert keyer.suppress_spill(image, keyer.compute_mask(image)) is image
+
+    def test_spill_keeps_alpha(self) -> None:
+        image = packshot(GREEN).convert("RGBA")
+        keyer = ChromaKeyer()
+        assert keyer.suppress_spill(image, keyer.compute_mask(image)).mode == "RGBA"
+
+    def test_throughput(self) -> None:
+        # Generous floor: the engine runs at well over 10 MP/s on one core
+        image = packshot(GREEN, size=(2000, 1500))
+        keyer = ChromaKeyer()
+        started = time.perf_counter()
+        keyer.compute_mask(image)
+        assert 3.0 / (time.perf_counter() - started) > 2.0
@@ -1,8 +1,10 @@
 """Logger singleton tests."""
 
+import io
 import logging
+import sys
 
-from utils.logger import setup_logger, _loggers
+from utils.logger import configure_console, setup_logger, _loggers
 
 
 class TestLoggerSingleton:
@@ -45,3 +47,28 @@ class TestLoggerSingleton:
         lgr = setup_logger(name)
         assert name in _loggers
         assert _loggers[name] is lgr
+
+
+class TestConfigureConsole:
+    """Console redirection tests."""
+
+    def test_redirects_existing_and_new_loggers(self) -> None:
+        existing = setup_logger("test_console_existing")
+        stream = io.StringIO()
+        configure_console(stream, logging.WARNING)
+        try:
+            created = setup_logger("test_console_new")
+            existing.info("hidden")
+            existing.warning("shown-existing")
+            created.warning("shown-new")
+            output = stream.getvalue()
+            assert "hidden" not in output
+            assert "shown-existing" in output
+            assert "shown-new" in output
+            # The shared file handler keeps its stream
+            assert all(
+                not isinstance(h, logging.FileHandler) or h.stream is not stream
+                for h in existing.handlers
+            )
+        finally:
+            configure_console(sys.__stdout__, logging.INFO)
@@ -0,0 +1,113 @@
+"""BuildManifest unit tests — fingerprints, skip plans and persistence."""
+
+import os
+
+import pytest
+
+from core.manifest import MANIFEST_FILENAME, BuildManifest, file_digest, settings_key
+
+
+@pytest.fixture
+def build(tmp_path) -> tuple:
+    """An input file, its output path and the output directory."""
+    src = tmp_path / "photo.jpg"
+    src.write_bytes(b"pixels")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    out = out_dir / "photo_nobg.png"
+    out.write_bytes(b"result")
+    return str(src), str(out), str(out_dir)
+
+
+SETTINGS = settings_key({"model": "u2net", "format": "png"})
+
+
+class TestSettingsKey:
+    """Settings fingerprint tests."""
+
+    def test_order_independent(self) -> None:
+        assert settings_key({"a": 1, "b": 2}) == settings_key({"b": 2, "a": 1})
+
+    def test_value_sensitive(self) -> None:
+        assert settings_key({"model": "u2net"}) != settings_key({"model": "isnet-general-use"})
+
+
+class TestUpToDate:
+    """Up-to-date check tests."""
+
+    def test_unknown_output(self, build: tuple) -> None:
+        src, out, out_dir = build
+        assert not BuildManifest.for_directory(out_dir).is_up_to_date(src, out, SETTINGS)
+
+    def test_recorded_output(self, build: tuple) -> None:
+        src, out, out_dir = build
+        manifest = BuildManifest.for_directory(out_dir)
+        manifest.record(src, out, SETTINGS, elapsed=1.5)
+        assert manifest.is_up_to_date(src, out, SETTINGS)
+        assert manifest.elapsed(out) == 1.5
+
+    def test_other_settings(self, build: tuple) -> None:
+        src, out, out_dir = build
+        manifest = BuildManifest.for_directory(out_dir)
+        manifest.record(src, out, SETTINGS)
+        assert not manifest.is_up_to_date(src, out, settings_key({"model": "u2netp", "format": "png"}))
+
+    def test_modified_input(self, build: tuple) -> None:
+        src, out, out_dir = build
+        manifest = BuildManifest.for_directory(out_dir)
+        manifest.record(src, out, SETTINGS)
+        with open(src, "wb") as f:
+            f.write(b"other pixels")
+        assert not manifest.is_up_to_date(src, out, SETTINGS)
+
+    def test_deleted_output(self, build: tuple) -> None:
+        src, out, out_dir = build
+        manifest = BuildManifest.for_directory(out_dir)
+        manifest.record(src, out, SETTINGS)
+        os.remove(out)
+        assert not manifest.is_up_to_date(src, out, SETTINGS)
+
+    def test_touched_input(self, build: tuple) -> None:
+        src, out, out_dir = build
+        plain = BuildManifest.for_directory(out_dir)
+        plain.record(src, out, SETTINGS)
+        hashed = BuildManifest(os.path.join(out_dir, "hashed.json"), content_hash=True)
+        hashed.record(src, out, SETTINGS)
+        stat = os.stat(src)
+        os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+
+        assert not plain.is_up_to_date(src, out, SETTINGS)
+        assert hashed.is_up_to_date(src, out, SETTINGS)
+        assert hashed.get(out)["mtime_ns"] == os.stat(src).st_mtime_ns
+        assert hashed.get(out)["sha256"] == file_digest(src)
+
+
+class TestPlanAndStorage:
+    """Plan and persistence tests."""
+
+    def test_plan(self, build: tuple, tmp_path) -> None:
+        src, out, out_dir = build
+        other = str(tmp_path / "new.jpg")
+        with open(other, "wb") as f:
+            f.write(b"x")
+        manifest = BuildManifest.for_directory(out_dir)
+        manifest.record(src, out, SETTINGS, elapsed=2.0)
+        plan = manifest.plan([(src, out), (other, os.path.join(out_dir, "new_nobg.png"))], SETTINGS)
+        assert plan.todo == [other]
+        assert plan.skipped == [src]
+        assert plan.to_dict() == {"total": 2, "to_process": 1, "skipped": 1, "time_saved": 2.0}
+
+    def test_save_and_reload(self, build: tuple) -> None:
+        src, out, out_dir = build
+        manifest = BuildManifest.for_directory(out_dir)
+        manifest.record(src, out, SETTINGS)
+        manifest.save()
+        assert os.path.exists(os.path.join(out_dir, MANIFEST_FILENAME))
+        assert not os.path.exists(os.path.join(out_dir, MANIFEST_FILENAME + ".tmp"))
+        assert BuildManifest.for_directory(out_dir).is_up_to_date(src, out, SETTINGS)
+
+    def test_corrupt_file_ignored(self, build: tuple) -> None:
+        _, _, out_dir = build
+        with open(os.path.join(out_dir, MANIFEST_FILENAME), "w") as f:
+            f.write("{not json")
+        assert len(BuildManifest.for_directory(out_dir)) == 0
@@ -0,0 +1,109 @@
+"""MaskCache unit tests — keys, memory LRU, disk store, eviction, stats."""
+
+import os
+
+import pytest
+from PIL import Image
+
+import core.mask_cache as mask_cache
+from core.mask_cache import MaskCache
+
+
+@pytest.fixture
+def cache(tmp_path) -> MaskCache:
+    return MaskCache(str(tmp_path / "cache"))
+
+
+def make_mask(value: int, size: int = 10) -> Image.Image:
+    return Image.new("L", (size, size), value)
+
+
+class TestMakeKey:
+    """Cache key tests."""
+
+    def test_same_pixels_same_key(self) -> None:
+        a = Image.new("RGB", (8, 8), (1, 2, 3))
+        b = Image.new("RGB", (8, 8), (1, 2, 3))
+        assert MaskCache.make_key(a, "u2net") == MaskCache.make_key(b, "u2net")
+
+    def test_pixels_change_key(self) -> None:
+        a = Image.new("RGB", (8, 8), (1, 2, 3))
+        b = Image.new("RGB", (8, 8), (1, 2, 4))
+        assert MaskCache.make_key(a, "u2net") != MaskCache.make_key(b, "u2net")
+
+    def test_model_and_settings_change_key(self) -> None:
+        img = Image.new("RGB", (8, 8))
+        base = MaskCache.make_key(img, "u2net")
+        assert MaskCache.make_key(img, "u2netp") != base
+        assert MaskCache.make_key(img, "u2net", max_inference_side=512) != base
+
+
+    @pytest.mark.parametrize("mode", ["RGB", "RGBA", "L", "1"])
+    def test_hashed_in_strips(self, monkeypatch, mode: str) -> None:
+        img = Image.effect_noise((13, 40), 64).convert(mode)
+        whole = MaskCache.make_key(img, "u2net")
+        # Strips of a few rows hash to the same key as a single strip
+        monkeypatch.setattr(mask_cache, "_HASH_CHUNK_BYTES", 50)
+        assert MaskCache.make_key(img, "u2net") == whole
+
+
+class TestMemoryTier:
+    """In-memory LRU tests."""
+
+    def test_miss_then_hit(self) -> None:
+        cache = MaskCache(cache_dir=None)
+        assert cache.get("k") is None
+        cache.put("k", make_mask(7))
+        assert cache.get("k").getpixel((0, 0)) == 7
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_bounded_by_bytes(self) -> None:
+        cache = MaskCache(cache_dir=None, max_memory_bytes=250)
+        for key in "abc":
+            cache.put(key, make_mask(1))
+        # Each mask is 100 bytes — only the two most recent fit
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        assert cache.stats()["memory_bytes"] <= 250
+
+    def test_lru_order_refreshed_on_get(self) -> None:
+        cache = MaskCache(cache_dir=None, max_memory_bytes=250)
+        cache.put("a", make_mask(1))
+        cache.put("b", make_mask(2))
+        cache.get("a")
+        cache.put("c", make_mask(3))
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+
+
+class TestDiskTier:
+    """On-disk store tests."""
+
+    def test_survives_new_instance(self, tmp_path) -> None:
+        MaskCache(str(tmp_path)).put("abcdef", make_mask(42))
+        fresh = MaskCache(str(tmp_path))
+        mask = fresh.get("abcdef")
+        assert mask is not None
+        assert mask.mode == "L"
+        assert mask.getpixel((0, 0)) == 42
+        assert fresh.stats()["disk_hits"] == 1
+
+    def test_disk_eviction(self, tmp_path) -> None:
+        cache = MaskCache(str(tmp_path), max_disk_bytes=400)
+        for i in range(20):
+            cache.put(f"{i:04d}", make_mask(i, size=32))
+        total = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(tmp_path) for name in names
+        )
+        assert total <= 400
+        assert cache.stats()["evictions"] > 0
+
+    def test_clear(self, cache: MaskCache) -> None:
+        cache.put("abcd", make_mask(1))
+        cache.clear()
+        assert cache.get("abcd") is None
+        assert cache.stats()["disk_bytes"] == 0
@@ -0,0 +1,70 @@
+"""Model registry tests — tiers, local files and rembg session arguments."""
+
+import pytest
+
+from core.model_registry import BUILTIN_MODELS, TIERS, ModelRegistry, default_model_dir
+
+
+@pytest.fixture
+def model_dir(tmp_path) -> str:
+    """A model directory holding only ``u2netp.onnx``."""
+    (tmp_path / "u2netp.onnx").write_bytes(b"onnx")
+    return str(tmp_path)
+
+
+class TestModelRegistry:
+    """Lookup and session argument tests."""
+
+    def test_tiers_resolve_to_builtin_models(self) -> None:
+        registry = ModelRegistry()
+        assert registry.resolve("fast") == "u2netp"
+        assert registry.resolve("u2net") == "u2net"
+        assert all(model in BUILTIN_MODELS for model in TIERS.values())
+        assert registry.spec("best").input_side == 1024
+
+    def test_default_dir_follows_u2net_home(self, monkeypatch, tmp_path) -> None:
+        monkeypatch.setenv("U2NET_HOME", str(tmp_path))
+        assert default_model_dir() == str(tmp_path)
+        assert ModelRegistry().model_dir == str(tmp_path)
+
+    def test_available_lists_local_files(self, model_dir: str) -> None:
+        registry = ModelRegistry(model_dir)
+        assert registry.available() == ["u2netp"]
+        assert registry.is_local("fast") and not registry.is_local("u2net")
+        assert registry.model_path("unknown") is None
+
+    def test_builtin_requested_by_name(self, model_dir: str) -> None:
+        assert ModelRegistry(model_dir).session_args("balanced") == ("u2net", {})
+
+    def test_local_only_loads_from_file(self, model_dir: str) -> None:
+        registry = ModelRegistry(model_dir, local_only=True)
+        session_name, options = registry.session_args("fast")
+        assert session_name == "u2net_custom"
+        assert options == {"model_path": registry.model_path("u2netp")}
+        with pytest.raises(FileNotFoundError):
+            registry.session_args("u2net")
+
+    def test_finds_rembg_download_layout(self, model_dir: str, tmp_path) -> None:
+        downloaded = tmp_path / "models" / "u2net" / "u2net.onnx"
+        downloaded.parent.mkdir(parents=True)
+        downloaded.write_bytes(b"onnx")
+        registry = ModelRegistry(model_dir, local_only=True)
+        assert registry.available() == ["u2net", "u2netp"]
+        assert registry.session_args("balanced") == ("u2net_custom", {"model_path": str(downloaded)})
+
+    def test_register_custom_model(self, model_dir: str, tmp_path) -> None:
+        path = tmp_path / "products.onnx"
+        path.write_bytes(b"onnx")
+        registry = ModelRegistry(model_dir)
+        spec = registry.register("products", str(path), family="isnet", input_side=1024)
+        assert spec.file_name == "products.onnx"
+        assert "products" in registry.models() and "products" in registry.available()
+        assert registry.session_args("products") == ("dis_custom", {"model_path": str(path)})
+
+    def test_register_rejects_missing_file_and_family(self, tmp_path) -> None:
+        registry = ModelRegistry(str(tmp_path))
+        with pytest.raises(FileNotFoundError):
+            registry.register("missing", str(tmp_path / "missing.onnx"))
+        (tmp_path / "m.onnx").write_bytes(b"onnx")
+        with pytest.raises(ValueError):
+            registry.register("m", str(tmp_path / "m.onnx"), family="sam")
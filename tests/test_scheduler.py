@@ -0,0 +1,159 @@
+"""JobScheduler unit tests — priorities, background slots, per-job cancel."""
+
+import threading
+
+import pytest
+
+from core.scheduler import (
+    JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_RUNNING, PRIORITY_BATCH, PRIORITY_INTERACTIVE,
+    JobScheduler,
+)
+
+
+@pytest.fixture
+def scheduler() -> JobScheduler:
+    sched = JobScheduler()
+    yield sched
+    sched.shutdown(join=True)
+
+
+def blocker(release: threading.Event, started: threading.Event = None):
+    """Job function that runs until ``release`` is set."""
+    def _job(handle) -> str:
+        if started:
+            started.set()
+        release.wait(timeout=10)
+        return handle.name
+    return _job
+
+
+class TestJobHandle:
+    """Job handle tests."""
+
+    def test_result_and_status(self, scheduler: JobScheduler) -> None:
+        handle = scheduler.submit(lambda h: 42, name="answer")
+        assert handle.result(timeout=5) == 42
+        assert handle.status == JOB_DONE
+        assert handle.started_at is not None and handle.finished_at >= handle.started_at
+
+    def test_failure(self, scheduler: JobScheduler) -> None:
+        def boom(handle) -> None:
+            raise ValueError("bad image")
+
+        handle = scheduler.submit(boom)
+        with pytest.raises(ValueError):
+            handle.result(timeout=5)
+        assert handle.status == JOB_FAILED
+
+    def test_cancel_running_job(self, scheduler: JobScheduler) -> None:
+        started = threading.Event()
+
+        def cooperative(handle) -> str:
+            started.set()
+            handle.cancel_event.wait(timeout=10)
+            return "stopped"
+
+        handle = scheduler.submit(cooperative)
+        assert started.wait(timeout=5)
+        assert handle.status == JOB_RUNNING
+        assert handle.cancel()
+        assert handle.result(timeout=5) == "stopped"
+        assert handle.status == JOB_CANCELLED
+        assert not handle.cancel()
+
+    def test_cancel_queued_job(self) -> None:
+        scheduler = JobScheduler(workers=1)
+        release = threading.Event()
+        first = scheduler.submit(blocker(release))
+        second = scheduler.submit(blocker(release))
+        assert second.cancel()
+        assert second.wait(timeout=1)
+        assert second.status == JOB_CANCELLED
+        release.set()
+        assert first.result(timeout=5) == first.name
+        scheduler.shutdown(join=True)
+
+
+class TestPriorities:
+    """Priority and background slot tests."""
+
+    def test_interactive_not_blocked_by_batch(self, scheduler: JobScheduler) -> None:
+        release = threading.Event()
+        batch = scheduler.submit(blocker(release), PRIORITY_BATCH)
+        interactive = scheduler.submit(lambda h: "fast", PRIORITY_INTERACTIVE)
+        assert interactive.result(timeout=5) == "fast"
+        assert not batch.done()
+        release.set()
+        batch.result(timeout=5)
+
+    def test_batches_limited_to_background_slots(self, scheduler: JobScheduler) -> None:
+        release = threading.Event()
+        started = threading.Event()
+        first = scheduler.submit(blocker(release, started), PRIORITY_BATCH)
+        second = scheduler.submit(blocker(release), PRIORITY_BATCH)
+        assert started.wait(timeout=5)
+        assert scheduler.stats()["queued"] == 1
+        assert second.status == "queued"
+        release.set()
+        assert second.result(timeout=5) == second.name
+        assert first.done()
+
+    def test_priority_order(self) -> None:
+        scheduler = JobScheduler(workers=1)
+        release = threading.Event()
+        order = []
+        scheduler.submit(blocker(release), PRIORITY_INTERACTIVE)
+        handles = [
+            scheduler.submit(lambda h: order.append("batch"), PRIORITY_BATCH),
+            scheduler.submit(lambda h: order.append("interactive"), PRIORITY_INTERACTIVE),
+        ]
+        release.set()
+        for handle in handles:
+            handle.result(timeout=5)
+        assert order == ["interactive", "batch"]
+        scheduler.shutdown(join=True)
+
+
+class TestSchedulerLifecycle:
+    """cancel_all / shutdown / stats tests."""
+
+    def test_cancel_all(self, scheduler: JobScheduler) -> None:
+        release = threading.Event()
+        handles = [scheduler.submit(blocker(release)) for _ in range(3)]
+        assert scheduler.cancel_all() == 3
+        release.set()
+        assert all(h.wait(timeout=5) for h in handles)
+        assert all(h.status == JOB_CANCELLED for h in handles)
+        assert scheduler.jobs() == []
+
+    def test_submit_after_shutdown(self, scheduler: JobScheduler) -> None:
+        scheduler.shutdown()
+        with pytest.raises(RuntimeError):
+            scheduler.submit(lambda h: None)
+
+    def test_shutdown_runs_queued_batch_jobs(self) -> None:
+        sched = JobScheduler(workers=2, background_slots=1)
+        release, started = threading.Event(), threading.Event()
+
+        def exits(handle) -> None:
+            started.set()
+            release.wait(timeout=10)
+            raise SystemExit(1)
+
+        first = sched.submit(exits, PRIORITY_BATCH)
+        assert started.wait(timeout=5)
+        queued = [sched.submit(lambda h, i=i: i, PRIORITY_BATCH) for i in range(3)]
+        sched.shutdown(cancel=False)
+        release.set()
+        # The slot is freed even by a job that escapes ``Exception``
+        with pytest.raises(SystemExit):
+            first.result(timeout=5)
+        assert [h.result(timeout=5) for h in queued] == [0, 1, 2]
+        sched.shutdown(join=True)
+
+    def test_stats(self, scheduler: JobScheduler) -> None:
+        scheduler.submit(lambda h: None).result(timeout=5)
+        stats = scheduler.stats()
+        assert stats["submitted"] == 1
+        assert stats[JOB_DONE] == 1
+        assert stats["running"] == stats["queued"] == 0
@@ -0,0 +1,192 @@
+"""HTTP service tests — run on localhost with a stand-in segmentation backend."""
+
+import io
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import core.backends as backends
+from core.image_processor import ImageProcessor
+from core.service import BackgroundRemovalService, QueueFullError, WorkerPool
+
+
+class FakeSession:
+    """Stand-in for a rembg session."""
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+
+
+@pytest.fixture
+def gate(monkeypatch) -> threading.Event:
+    """Stand-in backend that keeps bright pixels; inference blocks while the gate is closed."""
+    opened = threading.Event()
+    opened.set()
+
+    def fake_remove(data: np.ndarray, session: FakeSession = None, only_mask: bool = False, **kwargs) -> np.ndarray:
+        if data.shape[0] > 1:  # Warm-up runs on a tiny dummy image
+            opened.wait(5)
+        return np.where(data[..., :3].mean(axis=2) > 127, 255, 0).astype(np.uint8)
+
+    monkeypatch.setattr(backends, "_rembg_remove", fake_remove)
+    monkeypatch.setattr(backends, "_rembg_new_session", FakeSession)
+    return opened
+
+
+def make_service(workers: int = 1, queue_size: int = 4, **kwargs) -> BackgroundRemovalService:
+    pool = WorkerPool(workers, queue_size, processor_factory=ImageProcessor)
+    service = BackgroundRemovalService("127.0.0.1", 0, pool=pool, **kwargs)
+    service.start()
+    deadline = time.monotonic() + 5
+    while service.pool.ready_workers < workers and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return service
+
+
+@pytest.fixture
+def service(gate: threading.Event) -> BackgroundRemovalService:
+    svc = make_service()
+    yield svc
+    gate.set()
+    svc.shutdown()
+
+
+def png_bytes(size: tuple = (20, 10)) -> bytes:
+    """Left half black, right half white."""
+    img = Image.new("RGB", size, (0, 0, 0))
+    img.paste((255, 255, 255), (size[0] // 2, 0, size[0], size[1]))
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def request(service: BackgroundRemovalService, path: str, body: bytes = None) -> tuple:
+    """Send a request; return ``(status, headers, body)`` for any status."""
+    req = urllib.request.Request(service.url + path, data=body, method="POST" if body is not None else "GET")
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestEndpoints:
+    """Endpoint tests."""
+
+    def test_health(self, service: BackgroundRemovalService) -> None:
+        status, _, body = request(service, "/health")
+        assert status == 200
+        assert json.loads(body) == {"status": "ok", "ready_workers": 1, "workers": 1}
+
+    def test_remove_png(self, service: BackgroundRemovalService) -> None:
+        status, headers, body = request(service, "/remove", png_bytes())
+        assert status == 200
+        assert headers["Content-Type"] == "image/png"
+        assert float(headers["X-Processing-Time"]) >= 0
+        result = Image.open(io.BytesIO(body))
+        assert result.mode == "RGBA"
+        assert result.getpixel((2, 5))[3] == 0
+        assert result.getpixel((15, 5))[3] == 255
+
+    def test_mask_webp(self, service: BackgroundRemovalService) -> None:
+        status, headers, body = request(service, "/mask?format=webp", png_bytes())
+        assert status == 200
+        assert headers["Content-Type"] == "image/webp"
+        mask = Image.open(io.BytesIO(body)).convert("L")
+        assert mask.getpixel((2, 5)) == 0
+        assert mask.getpixel((15, 5)) == 255
+
+    def test_max_side(self, service: BackgroundRemovalService) -> None:
+        status, _, body = request(service, "/remove?max_side=16", png_bytes((64, 32)))
+        assert status == 200
+        assert Image.open(io.BytesIO(body)).size == (64, 32)
+
+    @pytest.mark.parametrize("path, body, expected", [
+        ("/remove", b"not an image", 400),
+        ("/remove?format=gif", None, 400),
+        ("/remove?quality=abc", None, 400),
+        ("/remove?max_side=1", None, 400),
+        ("/unknown", None, 404),
+    ])
+    def test_bad_requests(self, service: BackgroundRemovalService, path: str, body: bytes, expected: int) -> None:
+        status, _, payload = request(service, path, body if body is not None else png_bytes())
+        assert status == expected
+        assert "error" in json.loads(payload)
+
+    def test_upload_too_large(self, gate: threading.Event) -> None:
+        service = make_service(max_body_bytes=100)
+        try:
+            status, _, _ = request(service, "/remove", png_bytes((200, 200)))
+            assert status == 413
+        finally:
+            service.shutdown()
+
+    def test_metrics(self, service: BackgroundRemovalService) -> None:
+        request(service, "/remove", png_bytes())
+        request(service, "/remove", b"junk")
+        status, _, body = request(service, "/metrics")
+        metrics = json.loads(body)
+        assert status == 200
+        assert metrics["responses"] == {"200": 1, "400": 1}
+        assert metrics["latency"]["p50"] is not None
+        assert metrics["queue_capacity"] == 4
+        assert metrics["busy_workers"] == 0
+
+
+class TestBackpressure:
+    """Bounded queue tests."""
+
+    def test_full_queue_rejected(self, gate: threading.Event) -> None:
+        service = make_service(workers=1, queue_size=1)
+        results = []
+
+        def send() -> None:
+            results.append(request(service, "/remove", png_bytes()))
+
+        try:
+            gate.clear()
+            running = threading.Thread(target=send)
+            running.start()
+            assert wait_for(lambda: service.pool.stats()["busy_workers"] == 1)
+            queued = threading.Thread(target=send)
+            queued.start()
+            assert wait_for(lambda: service.pool.stats()["queue_depth"] == 1)
+
+            status, headers, _ = request(service, "/remove", png_bytes())
+            assert status == 429
+            assert headers["Retry-After"] == "1"
+
+            gate.set()
+            running.join(5)
+            queued.join(5)
+            assert [r[0] for r in results] == [200, 200]
+            assert json.loads(request(service, "/metrics")[2])["rejected"] == 1
+        finally:
+            gate.set()
+            service.shutdown()
+
+    def test_pool_rejects_when_full(self, gate: threading.Event) -> None:
+        pool = WorkerPool(workers=1, queue_size=1, processor_factory=ImageProcessor)
+        image = Image.new("RGB", (8, 8))
+        # Not started: nothing drains the queue
+        pool.submit(image)
+        with pytest.raises(QueueFullError):
+            pool.submit(image)
+        pool.close()
+        with pytest.raises(RuntimeError):
+            pool.submit(image)
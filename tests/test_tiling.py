@@ -0,0 +1,65 @@
+"""Tiling unit tests — tile grid coverage and feathered blending."""
+
+import numpy as np
+import pytest
+
+from core.tiling import blend_tile, compute_tiles
+
+
+def coverage(width: int, height: int, tiles: list) -> np.ndarray:
+    counts = np.zeros((height, width), dtype=np.int32)
+    for (left, top, right, bottom), _, _ in tiles:
+        counts[top:bottom, left:right] += 1
+    return counts
+
+
+class TestComputeTiles:
+    """Tile grid tests."""
+
+    def test_small_image_single_tile(self) -> None:
+        assert compute_tiles(300, 200, tile_size=512) == [((0, 0, 300, 200), 0, 0)]
+
+    @pytest.mark.parametrize("width,height", [(1000, 700), (1024, 1024), (2500, 513)])
+    def test_tiles_cover_image(self, width: int, height: int) -> None:
+        tiles = compute_tiles(width, height, tile_size=512, overlap=64)
+        assert coverage(width, height, tiles).min() >= 1
+        for (left, top, right, bottom), _, _ in tiles:
+            assert right - left <= 512 and bottom - top <= 512
+
+    def test_overlaps_reported(self) -> None:
+        tiles = compute_tiles(1000, 400, tile_size=512, overlap=64)
+        assert [t[1] for t in tiles] == [0, 64, 472]
+        assert all(t[2] == 0 for t in tiles)
+        # The last tile is pushed back so it ends at the image edge
+        assert tiles[-1][0] == (488, 0, 1000, 400)
+
+    def test_raster_order(self) -> None:
+        tiles = compute_tiles(900, 900, tile_size=400, overlap=50)
+        starts = [(box[1], box[0]) for box, _, _ in tiles]
+        assert starts == sorted(starts)
+
+    def test_overlap_clamped(self) -> None:
+        tiles = compute_tiles(1000, 100, tile_size=100, overlap=500)
+        assert max(t[1] for t in tiles) <= 50
+
+
+class TestBlendTile:
+    """Feathered blending tests."""
+
+    def test_constant_masks_are_seamless(self) -> None:
+        tiles = compute_tiles(700, 500, tile_size=256, overlap=64)
+        out = np.zeros((500, 700), dtype=np.uint8)
+        for tile in tiles:
+            (left, top, right, bottom), _, _ = tile
+            blend_tile(out, np.full((bottom - top, right - left), 200, dtype=np.uint8), tile)
+        assert np.all(out == 200)
+
+    def test_overlap_crossfades(self) -> None:
+        out = np.zeros((10, 20), dtype=np.uint8)
+        first, second = compute_tiles(20, 10, tile_size=12, overlap=4)
+        blend_tile(out, np.zeros((10, 12), dtype=np.uint8), first)
+        blend_tile(out, np.full((10, 12), 255, dtype=np.uint8), second)
+        row = out[0]
+        assert row[0] == 0 and row[-1] == 255
+        assert np.all(np.diff(row.astype(int)) >= 0)
+        assert 0 < row[9] < 255
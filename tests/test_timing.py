@@ -0,0 +1,92 @@
+"""Timing record tests — stage durations, pixel counts and percentiles."""
+
+import threading
+
+import pytest
+
+from core.timing import TimingRecord, TimingStats
+
+
+def record(**durations: float) -> TimingRecord:
+    """A record with the given stage durations, each on 1 MP."""
+    timing = TimingRecord()
+    for stage, seconds in durations.items():
+        timing.add(stage, seconds, 1_000_000)
+    return timing
+
+
+class TestTimingRecord:
+    """Per-image record tests."""
+
+    def test_add_accumulates(self) -> None:
+        timing = TimingRecord()
+        timing.add("cache", 0.01, 100)
+        timing.add("infer", 0.5)
+        timing.add("cache", 0.02)
+        assert list(timing.durations) == ["cache", "infer"]
+        assert timing.durations["cache"] == pytest.approx(0.03)
+        assert timing.pixels == {"cache": 100}
+        assert timing.total == pytest.approx(0.53)
+
+    def test_stage_context(self) -> None:
+        timing = TimingRecord()
+        with pytest.raises(RuntimeError):
+            with timing.stage("infer", 50):
+                raise RuntimeError("model failed")
+        assert timing.durations["infer"] >= 0.0
+        assert timing.pixels["infer"] == 50
+
+    def test_to_dict(self) -> None:
+        data = record(convert=0.25, composite=0.5).to_dict()
+        assert data["total"] == 0.75
+        assert data["stages"]["convert"] == {"seconds": 0.25, "pixels": 1_000_000, "megapixels_per_second": 4.0}
+
+    def test_summary(self) -> None:
+        lines = record(convert=0.0123, infer=0.5).summary().splitlines()
+        assert lines[0].split() == ["convert", "12.3", "ms", "(1.00", "MP)"]
+        assert lines[1].startswith("infer")
+
+
+class TestTimingStats:
+    """Aggregation tests."""
+
+    def test_percentiles(self) -> None:
+        stats = TimingStats()
+        for ms in range(1, 101):
+            stats.add(record(infer=ms / 1000))
+        infer = stats.stage_stats("infer")
+        assert infer["count"] == 100
+        assert infer["p50"] == pytest.approx(0.0505, abs=1e-4)
+        assert infer["p99"] == pytest.approx(0.099)
+        assert infer["max"] == 0.1
+        assert infer["megapixels_per_second"] == pytest.approx(100 / 5.05, abs=0.01)
+
+    def test_window(self) -> None:
+        stats = TimingStats(max_samples=3)
+        for seconds in (10.0, 1.0, 1.0, 1.0):
+            stats.add(record(infer=seconds))
+        assert stats.count == 4
+        assert stats.stage_stats("infer")["max"] == 1.0
+
+    def test_stages_in_order(self) -> None:
+        stats = TimingStats()
+        stats.add(record(decode=0.1, infer=0.2))
+        stats.add(record(decode=0.1, triage=0.01, infer=0.0))
+        assert stats.stages() == ["decode", "infer", "triage"]
+        assert stats.stage_stats("encode") == {}
+        assert set(stats.to_dict()["stages"]) == {"decode", "infer", "triage"}
+        assert len(stats.summary().splitlines()) == 3
+
+    def test_thread_safe(self) -> None:
+        stats = TimingStats(max_samples=None)
+
+        def add() -> None:
+            for _ in range(500):
+                stats.add(record(infer=0.001))
+
+        threads = [threading.Thread(target=add) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert stats.count == 2000 and stats.stage_stats("infer")["count"] == 2000
@@ -0,0 +1,85 @@
+"""Triage tests — alpha pass-through and flat-background detection."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.triage import (
+    ROUTE_COLOR_KEY, ROUTE_MODEL, ROUTE_PASSTHROUGH, border_pixels, flat_background,
+    transparent_fraction, triage,
+)
+
+
+def packshot(background: tuple = (255, 255, 255), size: tuple = (80, 60)) -> Image.Image:
+    """A red box on a flat background."""
+    image = Image.new("RGB", size, background)
+    image.paste((200, 30, 30), (20, 15, 60, 45))
+    return image
+
+
+def noisy(size: tuple = (80, 60)) -> Image.Image:
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8), "RGB")
+
+
+class TestTriage:
+    """Routing tests."""
+
+    def test_transparent_passthrough(self) -> None:
+        image = packshot().convert("RGBA")
+        alpha = Image.new("L", image.size, 0)
+        alpha.paste(255, (20, 15, 60, 45))
+        image.putalpha(alpha)
+        decision = triage(image)
+        assert decision.route == ROUTE_PASSTHROUGH
+        assert decision.stats["transparent_fraction"] == pytest.approx(1 - 40 * 30 / (80 * 60))
+
+    def test_opaque_alpha_is_not_real(self) -> None:
+        image = noisy().convert("RGBA")
+        assert transparent_fraction(image) == 0.0
+        assert triage(image).route == ROUTE_MODEL
+
+    def test_palette_transparency(self) -> None:
+        image = Image.new("P", (10, 10), 0)
+        image.info["transparency"] = 0
+        assert transparent_fraction(image) == 1.0
+
+    @pytest.mark.parametrize("background", [(255, 255, 255), (40, 180, 60)])
+    def test_flat_background_keyed(self, background: tuple) -> None:
+        decision = triage(packshot(background))
+        assert decision.route == ROUTE_COLOR_KEY
+        assert decision.background == background
+
+    def test_slight_noise_still_flat(self) -> None:
+        rng = np.random.default_rng(1)
+        pixels = np.asarray(packshot(), dtype=np.int16) - rng.integers(0, 4, (60, 80, 3))
+        colour, stats = flat_background(Image.fromarray(pixels.clip(0, 255).astype(np.uint8)))
+        assert colour is not None
+        assert stats["border_fraction"] == 1.0
+
+    def test_busy_background_needs_model(self) -> None:
+        decision = triage(noisy())
+        assert decision.route == ROUTE_MODEL
+        assert decision.background is None
+
+    def test_object_touching_border_needs_model(self) -> None:
+        image = packshot()
+        image.paste((200, 30, 30), (0, 0, 80, 20))
+        assert triage(image).route == ROUTE_MODEL
+
+
+class TestFlatBackground:
+    """Border analysis tests."""
+
+    def test_border_strips(self) -> None:
+        image = packshot(size=(50, 40))
+        # 2 px strips: two full rows of 50 and two columns of 36 on each side
+        assert border_pixels(image).shape == (2 * 2 * 50 + 2 * 2 * 36, 3)
+
+    def test_tiny_image(self) -> None:
+        assert border_pixels(Image.new("RGB", (1, 1))).shape[1] == 3
+
+    def test_large_white_colour_exact(self) -> None:
+        # float32 accumulation over a long border used to round 255 up to 256
+        colour, _ = flat_background(Image.new("RGB", (4000, 3000), (255, 255, 255)))
+        assert colour == (255, 255, 255)
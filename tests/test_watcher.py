@@ -0,0 +1,194 @@
+"""FolderWatcher unit tests — stable-file detection and continuous processing."""
+
+import os
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import core.backends as backends
+from core.image_processor import ImageProcessor
+from core.watcher import FolderWatcher
+
+
+class FakeSession:
+    """Stand-in for a rembg session."""
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+        self.calls = 0
+
+
+def fake_remove(data: np.ndarray, session: FakeSession = None, only_mask: bool = False, **kwargs) -> np.ndarray:
+    """Stand-in for ``rembg.remove`` — keeps bright pixels as foreground."""
+    session.calls += 1
+    return np.where(data[..., :3].mean(axis=2) > 127, 255, 0).astype(np.uint8)
+
+
+@pytest.fixture
+def created_sessions(monkeypatch) -> list:
+    sessions = []
+
+    def fake_new_session(model_name: str) -> FakeSession:
+        session = FakeSession(model_name)
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(backends, "_rembg_remove", fake_remove)
+    monkeypatch.setattr(backends, "_rembg_new_session", fake_new_session)
+    return sessions
+
+
+@pytest.fixture
+def processor(created_sessions: list) -> ImageProcessor:
+    proc = ImageProcessor()
+    yield proc
+    proc.close()
+
+
+@pytest.fixture
+def dirs(tmp_path) -> tuple:
+    inbox = tmp_path / "inbox"
+    outbox = tmp_path / "outbox"
+    inbox.mkdir()
+    return str(inbox), str(outbox)
+
+
+def drop(directory: str, name: str, size: int = 8) -> str:
+    path = os.path.join(directory, name)
+    Image.new("RGB", (size, size), (255, 255, 255)).save(path)
+    return path
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestScan:
+    """Directory scanning tests."""
+
+    def test_ready_after_stable_polls(self, processor: ImageProcessor, dirs: tuple) -> None:
+        inbox, outbox = dirs
+        watcher = FolderWatcher(processor, inbox, outbox, stable_polls=2)
+        path = drop(inbox, "a.png")
+        assert watcher.scan() == []
+        assert watcher.scan() == [path]
+        assert watcher.scan() == []
+
+    def test_growing_file_waits(self, processor: ImageProcessor, dirs: tuple) -> None:
+        inbox, outbox = dirs
+        watcher = FolderWatcher(processor, inbox, outbox, stable_polls=2)
+        path = os.path.join(inbox, "partial.jpg")
+        with open(path, "wb") as f:
+            f.write(b"x" * 10)
+        watcher.scan()
+        with open(path, "ab") as f:
+            f.write(b"x" * 10)
+        assert watcher.scan() == []
+        assert watcher.scan() == [path]
+
+    def test_empty_file_waits(self, processor: ImageProcessor, dirs: tuple) -> None:
+        inbox, outbox = dirs
+        watcher = FolderWatcher(processor, inbox, outbox, stable_polls=1)
+        open(os.path.join(inbox, "empty.png"), "wb").close()
+        assert watcher.scan() == []
+        assert watcher.stats()["waiting"] == 1
+
+    def test_ignores_other_files(self, processor: ImageProcessor, dirs: tuple) -> None:
+        inbox, _ = dirs
+        watcher = FolderWatcher(processor, inbox, inbox, stable_polls=1)
+        drop(inbox, ".hidden.png")
+        drop(inbox, "photo_nobg.png")
+        with open(os.path.join(inbox, "notes.txt"), "w") as f:
+            f.write("x")
+        os.mkdir(os.path.join(inbox, "sub.png"))
+        assert watcher.scan() == []
+
+    def test_changed_file_requeued(self, processor: ImageProcessor, dirs: tuple) -> None:
+        inbox, outbox = dirs
+        watcher = FolderWatcher(processor, inbox, outbox, stable_polls=1)
+        path = drop(inbox, "a.png")
+        assert watcher.scan() == [path]
+        drop(inbox, "a.png", size=16)
+        assert watcher.scan() == [path]
+
+    def test_redropped_file_requeued(self, processor: ImageProcessor, dirs: tuple) -> None:
+        inbox, outbox = dirs
+        watcher = FolderWatcher(processor, inbox, outbox, stable_polls=1)
+        path = drop(inbox, "a.png")
+        assert watcher.scan() == [path]
+        os.remove(path)
+        assert watcher.scan() == []
+        drop(inbox, "a.png")
+        assert watcher.scan() == [path]
+
+    def test_skip_existing(self, processor: ImageProcessor, dirs: tuple) -> None:
+        inbox, outbox = dirs
+        drop(inbox, "old.png")
+        watcher = FolderWatcher(processor, inbox, outbox, stable_polls=1, process_existing=False)
+        new = drop(inbox, "new.png")
+        assert watcher.scan() == [new]
+
+    def test_missing_directory(self, processor: ImageProcessor, tmp_path) -> None:
+        watcher = FolderWatcher(processor, str(tmp_path / "nope"), str(tmp_path / "out"))
+        assert watcher.scan() == []
+
+
+class TestWatching:
+    """Continuous processing tests."""
+
+    def test_processes_drops(self, processor: ImageProcessor, created_sessions: list, dirs: tuple) -> None:
+        inbox, outbox = dirs
+        results = []
+        watcher = FolderWatcher(
+            processor, inbox, outbox, poll_interval=0.02, stable_polls=2, on_result=results.append,
+        )
+        drop(inbox, "first.png")
+        watcher.start()
+        try:
+            assert wait_for(lambda: len(results) == 1)
+            drop(inbox, "second.png")
+            assert wait_for(lambda: len(results) == 2)
+        finally:
+            assert watcher.stop(timeout=5)
+
+        assert all(r.ok for r in results)
+        assert os.path.exists(os.path.join(outbox, "first_nobg.png"))
+        assert os.path.exists(os.path.join(outbox, "second_nobg.png"))
+        # One session, loaded before the first drop and kept between arrivals
+        assert len(created_sessions) == 1
+        stats = watcher.stats()
+        assert stats["processed"] == 2
+        assert stats["failed"] == 0
+        assert stats["in_flight"] == 0
+        assert stats["avg_latency"] is not None
+
+    def test_failed_file_counted(self, processor: ImageProcessor, dirs: tuple) -> None:
+        inbox, outbox = dirs
+        results = []
+        watcher = FolderWatcher(processor, inbox, outbox, poll_interval=0.02, stable_polls=1,
+                                on_result=results.append)
+        with open(os.path.join(inbox, "broken.png"), "wb") as f:
+            f.write(b"not an image")
+        watcher.start()
+        try:
+            assert wait_for(lambda: len(results) == 1)
+        finally:
+            watcher.stop(timeout=5)
+        assert not results[0].ok
+        assert watcher.stats()["failed"] == 1
+
+    def test_stop_when_idle(self, processor: ImageProcessor, dirs: tuple) -> None:
+        inbox, outbox = dirs
+        watcher = FolderWatcher(processor, inbox, outbox, poll_interval=0.02)
+        watcher.start()
+        assert watcher.is_running
+        assert watcher.stop(timeout=5)
+        assert not watcher.is_running
+        assert os.path.isdir(outbox)
@@ -10,12 +10,16 @@ from typing import Optional
 
 from PIL import Image, ImageTk
 
+from core.decoding import decode_reduced, is_deferred
 from core.image_processor import ImageProcessor
+from core.mask_cache import MaskCache
+from core.scheduler import PRIORITY_INTERACTIVE, JobHandle
+from core.timing import TimingRecord
 from core.image_editor import ImageEditor
 from core.export_manager import ExportManager
 from config.config_manager import ConfigManager
 from ui.themes import ThemeManager
-from ui.panels import InputPanel, SettingsPanel, FilterPanel, ActionsPanel, ImageDisplay
+from ui.panels import InputPanel, SettingsPanel, FilterPanel, ActionsPanel, ImageDisplay, ToolTip
 from ui.history_panel import HistoryPanel, ShortcutsPanel
 from ui.dialogs import (
     RotateDialog, FlipDialog, CropDialog, CompareDialog,
@@ -52,7 +56,10 @@ class MainWindow:
 
         # Core components
         self.config = ConfigManager()
-        self.processor = ImageProcessor()
+        mask_cache = None
+        if self.config.get("mask_cache_enabled", True):
+            mask_cache = MaskCache(max_disk_bytes=self.config.get("mask_cache_max_mb", 1024) * 1024 * 1024)
+        self.processor = ImageProcessor(mask_cache=mask_cache)
         self.editor = ImageEditor(undo_limit=self.config.get("undo_limit", 20))
         self.exporter = ExportManager()
 
@@ -75,10 +82,18 @@ class MainWindow:
         self.output_image: Optional[Image.Image] = None
         self._displayed_original = None
         self._displayed_processed = None
+        # (source image, longest side, preview) — reduced decode of a freshly opened file
+        self._preview_cache: Optional[tuple] = None
         self._resize_timer: Optional[str] = None
         self._checkerboard_cache: Optional[ImageTk.PhotoImage] = None
         self._checkerboard_size: tuple = (0, 0)
 
+        # Processing jobs (interactive removal and batch run independently)
+        self._process_job: Optional[JobHandle] = None
+        self._batch_job: Optional[JobHandle] = None
+        # Stage timings of the last displayed removal (status bar tooltip)
+        self._last_timing: Optional[TimingRecord] = None
+
         # Theme and UI
         self._setup_window()
         self.theme = ThemeManager(self.root, self.config.get("theme", "light"))
@@ -86,6 +101,9 @@ class MainWindow:
         self._setup_bindings()
         self._setup_dnd()
 
+        if self.config.get("warm_up_on_start", False):
+            self._start_warm_up()
+
         logger.info("MainWindow started (v%s)", self.VERSION)
 
     def _setup_window(self) -> None:
@@ -188,6 +206,7 @@ class MainWindow:
         batch_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Batch", menu=batch_menu)
         batch_menu.add_command(label="Process Multiple Images...", command=self._batch_process)
+        batch_menu.add_command(label="Process Animation...", command=self._process_animation)
 
     def _create_header(self) -> None:
         """Create the header bar."""
@@ -304,6 +323,7 @@ class MainWindow:
 
         self.time_label = ttk.Label(status, text="", style="Status.TLabel")
         self.time_label.pack(side="right", padx=10)
+        ToolTip(self.time_label, self._timing_tooltip)
 
         self.zoom_label = ttk.Label(status, text="Zoom: 1.0x", style="Status.TLabel")
         self.zoom_label.pack(side="right", padx=10)
@@ -411,7 +431,7 @@ class MainWindow:
             messagebox.showerror("Error", f"Clipboard error:\n{e}")
 
     def _process_image(self) -> None:
-        if self.editor.image is None or self.processor.is_processing:
+        if self.editor.image is None or (self._process_job and not self._process_job.done()):
             return
 
         self.processed_display.show_progress()
@@ -420,26 +440,52 @@ class MainWindow:
         def on_progress(value: float) -> None:
             self.root.after(0, lambda: self.processed_display.set_progress(value * 100))
 
+        source = self.editor.image
+        timing = TimingRecord()
+
         def on_complete(result: Optional[Image.Image]) -> None:
-            self.output_image = result
-            self.root.after(0, self._after_processing)
+            self.root.after(0, lambda: self._after_processing(result, source, timing))
 
         def on_error(msg: str) -> None:
             self.root.after(0, lambda: self.processed_display.hide_progress())
             self.root.after(0, lambda: self.status_text.set(f"❌ {msg}"))
 
-        self.processor.remove_background_async(
-            self.editor.image, on_complete, on_progress, on_error,
+        self._process_job = self.processor.remove_background_async(
+            source, on_complete, on_progress, on_error, timing=timing,
         )
 
+    def _start_warm_up(self) -> None:
+        """Load the AI model in the background so the first removal is fast."""
+        self.status_text.set("Loading AI model in the background...")
+
+        def on_done(ok: bool, elapsed: float) -> None:
+            msg = f"✅ AI model ready ({elapsed:.1f}s)" if ok else "⚠️ AI model could not be preloaded"
+            self.root.after(0, lambda: self.status_text.set(msg))
+
+        self.processor.warm_up_async(on_done=on_done)
+
     def _cancel_processing(self) -> None:
-        """Cancel the current processing job."""
-        if self.processor.is_processing:
-            self.processor.cancel()
+        """Cancel the interactive job, or the batch if no interactive job is running."""
+        if self._process_job and self._process_job.cancel():
             self.status_text.set("⏹️ Processing cancelled")
-
-    def _after_processing(self) -> None:
+        elif self._batch_job and self._batch_job.cancel():
+            self.status_text.set("⏹️ Batch cancelled")
+
+    def _after_processing(
+        self, result: Optional[Image.Image], source: Image.Image, timing: Optional[TimingRecord] = None,
+    ) -> None:
+        """Show a finished removal and attach its mask to the edited image.
+
+        Args:
+            result: The processed image (None on failure).
+            source: The image that was processed.
+            timing: Stage timings of the removal (shown in the status bar tooltip).
+        """
+        self.output_image = result
         self.processed_display.hide_progress()
+        if result is not None and self.editor.image is source:
+            # Edits transform the mask, so later edits are recomposited without the model
+            self.editor.mask = result.getchannel("A")
         if self.output_image:
             self._display_processed()
             self.actions_panel.save_btn.config(state="normal")
@@ -448,11 +494,25 @@ class MainWindow:
                 f"{info['width']}×{info['height']} • {info['mode']}"
             )
             elapsed = self.processor.last_processing_time
+            self._last_timing = timing
             self.time_label.config(text=f"⏱ {elapsed:.1f}s")
             self.status_text.set(f"✅ Background removed! ({elapsed:.1f}s)")
         else:
             self.status_text.set("❌ Processing failed")
 
+    def _timing_tooltip(self) -> str:
+        """Stage breakdown of the last removal, with percentiles of recent removals and the last batch."""
+        parts = []
+        if self._last_timing is not None and self._last_timing.durations:
+            parts.append("Last removal\n" + self._last_timing.summary())
+        recent = self.processor.timing_stats
+        if recent.count > 1:
+            parts.append(f"Recent removals ({recent.count})\n" + recent.summary())
+        batch = self.processor.last_batch_timing
+        if batch is not None and batch.count:
+            parts.append(f"Last batch ({batch.count} images)\n" + batch.summary())
+        return "\n\n".join(parts)
+
     # ==================== DISPLAY ====================
 
     def _display_original(self) -> None:
@@ -462,9 +522,10 @@ class MainWindow:
         cw = max(canvas.winfo_width(), 1)
         ch = max(canvas.winfo_height(), 1)
 
-        img = self.editor.image.copy()
-        w = int(img.width * self.zoom_factor)
-        h = int(img.height * self.zoom_factor)
+        source = self.editor.image
+        w = int(source.width * self.zoom_factor)
+        h = int(source.height * self.zoom_factor)
+        img = self._original_preview(source, max(min(w, cw), min(h, ch)))
 
         if w > cw or h > ch:
             img.thumbnail((cw, ch), Image.LANCZOS)
@@ -475,6 +536,27 @@ class MainWindow:
         self._displayed_original = ImageTk.PhotoImage(img)
         canvas.create_image(cw // 2, ch // 2, image=self._displayed_original)
 
+    def _original_preview(self, source: Image.Image, max_side: int) -> Image.Image:
+        """Return a copy of the original for display, at least ``max_side`` on its longest side.
+
+        While the loaded file has not been decoded yet (no edit or
+        processing needed its pixels), the preview is decoded from the
+        file at screen scale instead of at full resolution.
+        """
+        if not (is_deferred(source) and self._full_input_path):
+            return source.copy()
+        cached = self._preview_cache
+        if cached and cached[0] is source and cached[1] >= max_side:
+            return cached[2].copy()
+        try:
+            with Image.open(self._full_input_path) as file_image:
+                preview = decode_reduced(file_image, max_side, Image.LANCZOS)
+        except OSError as e:
+            logger.warning("Preview decode failed, using full image: %s", e)
+            return source.copy()
+        self._preview_cache = (source, max_side, preview)
+        return preview.copy()
+
     def _display_processed(self) -> None:
         if self.output_image is None:
             return
@@ -527,9 +609,7 @@ class MainWindow:
     def _undo(self) -> None:
         if self.editor.undo():
             self._display_original()
-            self.output_image = None
-            self.processed_display.clear()
-            self.actions_panel.save_btn.config(state="disabled")
+            self._refresh_processed()
             self._update_history_panel()
             self.status_text.set("↩️ Undo successful")
         else:
@@ -538,9 +618,7 @@ class MainWindow:
     def _redo(self) -> None:
         if self.editor.redo():
             self._display_original()
-            self.output_image = None
-            self.processed_display.clear()
-            self.actions_panel.save_btn.config(state="disabled")
+            self._refresh_processed()
             self._update_history_panel()
             self.status_text.set("↪️ Redo successful")
         else:
@@ -557,14 +635,30 @@ class MainWindow:
     # ==================== EDIT COMMANDS ====================
 
     def _after_edit(self, msg: str) -> None:
-        """Common UI update after an editing operation."""
+        """Common UI update after an editing operation.
+
+        Args:
+            msg: Status bar message.
+        """
         self._display_original()
-        self.output_image = None
-        self.processed_display.clear()
-        self.actions_panel.save_btn.config(state="disabled")
+        self._refresh_processed()
         self._update_history_panel()
         self.status_text.set(msg)
 
+    def _refresh_processed(self) -> None:
+        """Recomposite the processed result from the editor's mask, or clear it."""
+        image = self.editor.image
+        mask = self.editor.mask
+        if image is None or mask is None:
+            self.output_image = None
+            self.processed_display.clear()
+            self.actions_panel.save_btn.config(state="disabled")
+            return
+        # The mask already carries any source transparency
+        self.output_image = ImageProcessor.apply_mask(image.convert("RGB"), mask)
+        self._display_processed()
+        self.actions_panel.save_btn.config(state="normal")
+
     def _show_rotate_dialog(self) -> None:
         if self.editor.image is None:
             messagebox.showinfo("Info", "Please load an image first.")
@@ -607,9 +701,7 @@ class MainWindow:
 
     def _apply_watermark(self, text: str, position: str, opacity: int, font_size: int) -> None:
         if self.editor.add_watermark(text, position, opacity, font_size):
-            self._display_original()
-            self._update_history_panel()
-            self.status_text.set(f"Watermark added: '{text}'")
+            self._after_edit(f"Watermark added: '{text}'")
 
     def _select_bg_color(self) -> None:
         color = colorchooser.askcolor(title="Select Background Color")
@@ -770,6 +862,9 @@ class MainWindow:
         )
         if not files:
             return
+        if self._batch_job and not self._batch_job.done():
+            messagebox.showinfo("Info", "A batch is already running.")
+            return
 
         self.processed_display.show_progress()
         self.status_text.set(f"Batch processing {len(files)} images... (Esc to cancel)")
@@ -790,9 +885,74 @@ class MainWindow:
         def on_error(filename: str, error: str) -> None:
             logger.error("Batch error [%s]: %s", filename, error)
 
-        self.processor.batch_process(
+        self._batch_job = self.processor.batch_process(
             list(files), self.output_directory.get(),
             on_progress, on_complete, on_error,
+            inference_batch_size=self.config.get("inference_batch_size", 1),
+        )
+
+    def _process_animation(self) -> None:
+        """Remove the background from every frame of an animated image."""
+        path = filedialog.askopenfilename(
+            title="Select Animated Image",
+            filetypes=[("Animated images", "*.gif *.png *.apng *.webp")],
+            initialdir=os.path.expanduser("~"),
+        )
+        if not path:
+            return
+        if self._process_job and not self._process_job.done():
+            messagebox.showinfo("Info", "Please wait for the current image to finish.")
+            return
+        name = os.path.splitext(os.path.basename(path))[0]
+        save_path = filedialog.asksaveasfilename(
+            title="Save Animation As",
+            defaultextension=".png",
+            filetypes=[("Animated PNG", "*.png"), ("Animated WebP", "*.webp")],
+            initialdir=self.output_directory.get(),
+            initialfile=f"{name}_nobg.png",
+        )
+        if not save_path:
+            return
+
+        self.processed_display.show_progress()
+        self.status_text.set(f"Processing animation: {os.path.basename(path)}... (Esc to cancel)")
+
+        def on_progress(value: float) -> None:
+            self.root.after(0, lambda: self.processed_display.set_progress(value * 100))
+
+        def job(handle: JobHandle) -> Optional[dict]:
+            with Image.open(path) as image:
+                cutout = self.processor.remove_background_animated(
+                    image, on_progress, cancel_event=handle.cancel_event,
+                )
+            if cutout is None:
+                return None
+            cutout.save(save_path)
+            return cutout.to_dict()
+
+        def on_done(future) -> None:
+            stats = None
+            if not future.cancelled() and future.exception() is None:
+                stats = future.result()
+            self.root.after(0, lambda: self._after_animation(stats, save_path))
+
+        self._process_job = self.processor.scheduler.submit(job, PRIORITY_INTERACTIVE, f"animation:{name}")
+        self._process_job.future.add_done_callback(on_done)
+
+    def _after_animation(self, stats: Optional[dict], save_path: str) -> None:
+        """Report a finished animation job.
+
+        Args:
+            stats: Frame statistics of the saved animation (None on failure or cancel).
+            save_path: Output path of the animation.
+        """
+        self.processed_display.hide_progress()
+        if stats is None:
+            self.status_text.set("❌ Animation processing failed or was cancelled")
+            return
+        self.status_text.set(
+            f"✅ Animation saved: {os.path.basename(save_path)} "
+            f"({stats['frames']} frames, {stats['inferred_frames']} inferred)"
         )
 
     # ==================== VIEW ====================
@@ -924,5 +1084,6 @@ class MainWindow:
         self.config.set("quality", self.quality_var.get())
         self.config.set("window_geometry", self.root.geometry())
         self.config.save()
+        self.processor.close()
         logger.info("Application closed.")
         self.root.destroy()
@@ -1,9 +1,9 @@
-"""UI panels — InputPanel, SettingsPanel, ActionsPanel, ImageDisplay, FilterPanel."""
+"""UI panels — InputPanel, SettingsPanel, ActionsPanel, ImageDisplay, FilterPanel, ToolTip."""
 
 import os
 import tkinter as tk
 from tkinter import ttk, filedialog
-from typing import Optional, Callable, TYPE_CHECKING
+from typing import Optional, Callable, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ui.themes import ThemeManager
@@ -275,3 +275,55 @@ class ImageDisplay(ttk.LabelFrame):
         """Clear the canvas."""
         self.canvas.delete("all")
         self.info_var.set("")
+
+
+class ToolTip:
+    """Hover tooltip shown above a widget.
+
+    Attributes:
+        widget: Widget the tooltip belongs to.
+        text: Tooltip text, or a callable returning it when the tooltip
+            is shown (empty text = no tooltip).
+        delay_ms: Hover time before the tooltip appears.
+    """
+
+    def __init__(self, widget: tk.Widget, text: Union[str, Callable[[], str]] = "", delay_ms: int = 500) -> None:
+        self.widget = widget
+        self.text = text
+        self.delay_ms = delay_ms
+        self._window: Optional[tk.Toplevel] = None
+        self._after_id: Optional[str] = None
+        widget.bind("<Enter>", self._schedule, add="+")
+        widget.bind("<Leave>", self._hide, add="+")
+        widget.bind("<ButtonPress>", self._hide, add="+")
+
+    def _schedule(self, _event=None) -> None:
+        self._cancel()
+        self._after_id = self.widget.after(self.delay_ms, self._show)
+
+    def _cancel(self) -> None:
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _show(self) -> None:
+        self._after_id = None
+        text = self.text() if callable(self.text) else self.text
+        if not text or self._window is not None:
+            return
+        self._window = tk.Toplevel(self.widget)
+        self._window.wm_overrideredirect(True)
+        ttk.Label(
+            self._window, text=text, justify="left", font="TkFixedFont", relief="solid", padding=(6, 4),
+        ).pack()
+        # The status bar sits at the bottom of the window, so open upwards
+        self._window.update_idletasks()
+        x = self.widget.winfo_rootx()
+        y = self.widget.winfo_rooty() - self._window.winfo_reqheight() - 4
+        self._window.wm_geometry(f"+{max(0, x)}+{max(0, y)}")
+
+    def _hide(self, _event=None) -> None:
+        self._cancel()
+        if self._window is not None:
+            self._window.destroy()
+            self._window = None
@@ -10,6 +10,9 @@ from functools import wraps
 from PIL import Image
 from PIL.ExifTags import TAGS
 
+# File extensions of the image formats accepted as input
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".tif", ".gif", ".webp")
+
 
 def rgb_to_hex(rgb: Tuple[int, int, int]) -> str:
     """Convert an RGB tuple to a hex color string.
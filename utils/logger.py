@@ -3,7 +3,7 @@
 import os
 import sys
 import logging
-from typing import Dict
+from typing import Dict, Optional
 
 # Logger singleton cache — prevents creating duplicate handlers
 _loggers: Dict[str, logging.Logger] = {}
@@ -20,6 +20,10 @@ _FORMATTER = logging.Formatter(
 # File handler — singleton (shared by all loggers)
 _file_handler = None
 
+# Stream and level of the console handlers
+_console_stream = sys.stdout
+_console_level = logging.INFO
+
 
 def _get_file_handler() -> logging.FileHandler:
     """Return a singleton file handler."""
@@ -57,8 +61,8 @@ def setup_logger(name: str, level: int = logging.DEBUG) -> logging.Logger:
     # Only add handlers if they haven't been added already
     if not logger.handlers:
         # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
+        console_handler = logging.StreamHandler(_console_stream)
+        console_handler.setLevel(_console_level)
         console_handler.setFormatter(_FORMATTER)
 
         logger.addHandler(console_handler)
@@ -69,3 +73,29 @@ def setup_logger(name: str, level: int = logging.DEBUG) -> logging.Logger:
 
     _loggers[name] = logger
     return logger
+
+
+def configure_console(stream=None, level: Optional[int] = None) -> None:
+    """Redirect or filter the console output of all loggers.
+
+    Applies to existing loggers and to loggers created later. Used by
+    the command-line interface to keep stdout free for its own output.
+
+    Args:
+        stream: New console stream (unchanged if None).
+        level: New console level (unchanged if None).
+    """
+    global _console_stream, _console_level
+    if stream is not None:
+        _console_stream = stream
+    if level is not None:
+        _console_level = level
+    for logger in _loggers.values():
+        for handler in logger.handlers:
+            # FileHandler subclasses StreamHandler — only touch the console ones
+            if type(handler) is logging.StreamHandler:
+                try:
+                    handler.setStream(_console_stream)
+                except ValueError:
+                    handler.stream = _console_stream  # Previous stream already closed
+                handler.setLevel(_console_level)